@@ -9,207 +9,1404 @@ Issue: #15
 """
 
 import os
+import sys
+import warnings
 import pandas as pd
 import numpy as np
-from scipy.stats import pearsonr, spearmanr
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score
+# scipy.stats is imported by the functions that use it: it takes longer to
+# import than the rest of this module and most API requests never need it
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from analysis.parallel import (
+    map_chunks,
+    n_chunks_for,
+    resolve_workers,
+    spawn_seeds,
+    split_evenly,
+)
+from delivery_metrics import clean_delivery_logs
+from efficiency_scoring import score_efficiency
 
 # Path configuration
 BASE_DIR = os.path.join(os.path.dirname(__file__), "..", "..")
 DATA_DIR = os.path.join(BASE_DIR, "data")
 EFFICIENCY_FILE = os.path.join(DATA_DIR, "vendor_efficiency_scores.csv")
 WASTE_FILE = os.path.join(DATA_DIR, "cleaned_master_dataset.csv")
+DELIVERY_FILE = os.path.join(DATA_DIR, "Delivery_Logs.csv")
+
+# Efficiency metrics (predictors)
+EFFICIENCY_METRICS = [
+    'efficiency_score',
+    'avg_delivery_time',
+    'on_time_rate',
+    'avg_distance',
+    'deliveries_per_day',
+]
+
+# Waste metrics (targets)
+WASTE_METRICS = [
+    'total_waste_lb',
+    'avg_waste_per_record_lb',
+    'avg_waste_per_serving_lb',
+    'total_waste_cost_usd',
+]
+
+# Correlation methods, in output order
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+# Restaurant metadata columns the analysis can be segmented by
+SEGMENT_COLUMNS = ['cuisine', 'zip_code', 'has_sustainability_program']
+
+# Periods of load_period_metrics: restaurant-days or restaurant-weeks
+PERIOD_FREQUENCIES = ('D', 'W')
+
+
+def _aggregate_waste(waste_df, keys):
+    """
+    Aggregate waste records to one row per group with vectorized group-bys.
+
+    Source columns that are missing from waste_df yield NaN (or 0 delayed
+    deliveries) instead of failing the whole aggregation.
+
+    Args:
+        waste_df (pd.DataFrame): Waste records
+        keys (list): Group-by columns, e.g. ['restaurant'] or ['restaurant', 'period']
+
+    Returns:
+        pd.DataFrame: keys plus total_waste_lb, avg_waste_per_record_lb,
+            waste_record_count, avg_waste_per_serving_lb, total_waste_cost_usd and
+            delayed_deliveries_count
+    """
+    delayed = waste_df['delayed'].eq(True) if 'delayed' in waste_df.columns else False
+    waste_df = waste_df.assign(delayed_flag=delayed)
+
+    spec = {
+        'total_waste_lb': ('quantity_lb', 'sum'),
+        'avg_waste_per_record_lb': ('quantity_lb', 'mean'),
+        'waste_record_count': ('quantity_lb', 'count'),
+        'avg_waste_per_serving_lb': ('waste_per_serving_lb', 'mean'),
+        'total_waste_cost_usd': ('est_cost_usd', 'sum'),
+        'delayed_deliveries_count': ('delayed_flag', 'sum'),
+    }
+    available = {name: agg for name, agg in spec.items() if agg[0] in waste_df.columns}
+    waste_agg = waste_df.groupby(keys).agg(**available)
+    return waste_agg.reindex(columns=list(spec)).reset_index()
 
 
-def load_and_merge_data():
+def load_and_merge_data(verbose=True):
     """
     Load efficiency and waste datasets and merge them on restaurant name.
     
+    Args:
+        verbose (bool): Print progress (the API loads quietly)
+
     Returns:
         pd.DataFrame: Merged dataset with efficiency and waste metrics
     """
-    print("Loading efficiency data...")
+    log = print if verbose else (lambda *args: None)
+    log("Loading efficiency data...")
     efficiency_df = pd.read_csv(EFFICIENCY_FILE)
-    print(f"  Loaded {len(efficiency_df)} restaurants from efficiency file")
+    log(f"  Loaded {len(efficiency_df)} restaurants from efficiency file")
     
-    print("Loading waste data...")
+    log("Loading waste data...")
     waste_df = pd.read_csv(WASTE_FILE)
-    print(f"  Loaded {len(waste_df)} waste records")
+    log(f"  Loaded {len(waste_df)} waste records")
     
     # Aggregate waste data by restaurant
-    # Calculate key waste metrics per restaurant
-    waste_agg = waste_df.groupby('restaurant').agg({
-        'quantity_lb': ['sum', 'mean', 'count'],
-        'waste_per_serving_lb': 'mean',
-        'est_cost_usd': 'sum',
-        'delayed': lambda x: (x == True).sum() if 'delayed' in waste_df.columns else 0
-    }).reset_index()
-    
-    # Flatten column names
-    waste_agg.columns = [
-        'restaurant', 
-        'total_waste_lb', 
-        'avg_waste_per_record_lb', 
-        'waste_record_count',
-        'avg_waste_per_serving_lb',
-        'total_waste_cost_usd',
-        'delayed_deliveries_count'
-    ]
+    waste_agg = _aggregate_waste(waste_df, ['restaurant'])
     
     # Merge efficiency and waste data
     merged_df = pd.merge(efficiency_df, waste_agg, on='restaurant', how='inner')
-    print(f"\nMerged dataset contains {len(merged_df)} restaurants")
+    log(f"\nMerged dataset contains {len(merged_df)} restaurants")
     
     return merged_df
 
 
-def compute_correlations(df):
+def _pearson_matrix(X, Y):
+    """
+    Pearson correlation of every column of X against every column of Y.
+
+    Uses pairwise-complete observations: each (i, j) entry only uses rows where
+    both X[:, i] and Y[:, j] are present. Without missing values the columns are
+    standardized once and the whole matrix is a single product.
+
+    Args:
+        X (np.ndarray): (rows, p) array, NaN for missing
+        Y (np.ndarray): (rows, q) array, NaN for missing
+
+    Returns:
+        tuple: (r, n) arrays of shape (p, q)
+    """
+    present_x, present_y = ~np.isnan(X), ~np.isnan(Y)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if present_x.all() and present_y.all():
+            n_rows = len(X)
+            zx = (X - X.mean(axis=0)) / X.std(axis=0)
+            zy = (Y - Y.mean(axis=0)) / Y.std(axis=0)
+            r = zx.T @ zy / n_rows
+            n = np.full(r.shape, n_rows)
+        else:
+            # Centering on each column's own mean does not change r but keeps the
+            # moment sums below well conditioned.
+            x0 = np.where(present_x, X - np.nanmean(X, axis=0), 0.0)
+            y0 = np.where(present_y, Y - np.nanmean(Y, axis=0), 0.0)
+            mx, my = present_x.astype(float), present_y.astype(float)
+
+            n = mx.T @ my
+            sum_x, sum_y = x0.T @ my, mx.T @ y0
+            cov = x0.T @ y0 - sum_x * sum_y / n
+            var_x = (x0**2).T @ my - sum_x**2 / n
+            var_y = mx.T @ (y0**2) - sum_y**2 / n
+            r = cov / np.sqrt(var_x * var_y)
+            n = n.astype(int)
+
+    return np.clip(r, -1.0, 1.0), n
+
+
+def _rank_columns(values):
+    """Average ranks per column (ties share the mean rank); NaN stays NaN."""
+    return pd.DataFrame(values).rank(axis=0).to_numpy()
+
+
+def _missing_patterns(present):
+    """
+    Group columns by their missing-value pattern.
+
+    Args:
+        present (np.ndarray): (rows, k) boolean mask of present values
+
+    Returns:
+        tuple: (patterns, group) where patterns is a (n_patterns, rows) boolean
+            array and group[k] is the pattern index of column k
+    """
+    keys, patterns, group = {}, [], []
+    for k in range(present.shape[1]):
+        key = np.packbits(present[:, k]).tobytes()
+        if key not in keys:
+            keys[key] = len(patterns)
+            patterns.append(present[:, k])
+        group.append(keys[key])
+    return np.array(patterns).reshape(len(patterns), -1), np.array(group, dtype=int)
+
+
+def _spearman_matrix(X, Y):
+    """
+    Spearman correlation of every column of X against every column of Y.
+
+    Without missing values each column is ranked once. With missing values, ranks
+    must be taken over the rows both columns share: columns are grouped by
+    missing-value pattern and ranked once per pattern combination, or, when
+    patterns are too varied for that to pay off, ranked in (rows x columns)
+    batches one column of the smaller side at a time.
+
+    Returns:
+        tuple: (rho, n) arrays of shape (p, q)
+    """
+    present_x, present_y = ~np.isnan(X), ~np.isnan(Y)
+    if present_x.all() and present_y.all():
+        return _pearson_matrix(_rank_columns(X), _rank_columns(Y))
+
+    x_patterns, x_groups = _missing_patterns(present_x)
+    y_patterns, y_groups = _missing_patterns(present_y)
+    if len(x_patterns) * len(y_patterns) > min(X.shape[1], Y.shape[1]):
+        if X.shape[1] > Y.shape[1]:
+            rho, n = _spearman_by_column(Y, X)
+            return rho.T, n.T
+        return _spearman_by_column(X, Y)
+
+    rho = np.full((X.shape[1], Y.shape[1]), np.nan)
+    n = np.zeros(rho.shape, dtype=int)
+    for gx, x_mask in enumerate(x_patterns):
+        cols_x = np.flatnonzero(x_groups == gx)
+        for gy, y_mask in enumerate(y_patterns):
+            cols_y = np.flatnonzero(y_groups == gy)
+            rows = x_mask & y_mask
+            block_rho, block_n = _pearson_matrix(
+                _rank_columns(X[np.ix_(rows, cols_x)]),
+                _rank_columns(Y[np.ix_(rows, cols_y)]),
+            )
+            rho[np.ix_(cols_x, cols_y)] = block_rho
+            n[np.ix_(cols_x, cols_y)] = block_n
+    return rho, n
+
+
+def _sort_with_ties(values):
+    """
+    Sort each column once and label tie groups.
+
+    Returns:
+        tuple: (order, group) where order sorts each column (NaN last) and group
+            numbers runs of equal sorted values 0, 1, 2, ... per column
+    """
+    order = np.argsort(values, axis=0, kind='stable')
+    sorted_values = np.take_along_axis(values, order, axis=0)
+    group = np.zeros(values.shape, dtype=np.int64)
+    group[1:] = np.cumsum(sorted_values[1:] != sorted_values[:-1], axis=0)
+    return order, group
+
+
+def _masked_ranks(order, group, mask):
+    """
+    Average ranks of pre-sorted columns counting only rows where mask is True.
+
+    Args:
+        order, group (np.ndarray): (rows, k) output of _sort_with_ties
+        mask (np.ndarray): (rows, k) rows to rank, in original row order
+
+    Returns:
+        np.ndarray: (rows, k) ranks in original row order, NaN outside the mask
+    """
+    n_rows, k = mask.shape
+    sorted_mask = np.take_along_axis(mask, order, axis=0)
+    flat = (group + n_rows * np.arange(k)).ravel()
+    counts = np.bincount(flat, weights=sorted_mask.ravel(), minlength=n_rows * k)
+    counts = counts.reshape(k, n_rows).T
+    # Rank of a tie group = rows kept in earlier groups + mean position inside it
+    group_rank = np.cumsum(counts, axis=0) - counts + (counts + 1) / 2
+
+    ranks = np.empty(mask.shape)
+    np.put_along_axis(
+        ranks, order, np.take_along_axis(group_rank, group, axis=0), axis=0
+    )
+    return np.where(mask, ranks, np.nan)
+
+
+def _spearman_by_column(X, Y):
+    """
+    Pairwise-complete Spearman for arbitrary missing patterns.
+
+    Every column is sorted once. Restricting a sorted column to the rows another
+    column shares only needs a cumulative count, so each X column costs a few
+    (rows x q) array passes instead of q separate sorts.
+    """
+    rho = np.full((X.shape[1], Y.shape[1]), np.nan)
+    n = np.zeros(rho.shape, dtype=int)
+    present_x, present_y = ~np.isnan(X), ~np.isnan(Y)
+    y_order, y_group = _sort_with_ties(Y)
+
+    for i in range(X.shape[1]):
+        x = X[:, i : i + 1]
+        joint = present_x[:, i : i + 1] & present_y
+        x_order, x_group = _sort_with_ties(x)
+        x_ranks = _masked_ranks(
+            np.broadcast_to(x_order, joint.shape),
+            np.broadcast_to(x_group, joint.shape),
+            joint,
+        )
+        y_ranks = _masked_ranks(y_order, y_group, joint)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x0 = np.where(joint, x_ranks - np.nanmean(x_ranks, axis=0), 0.0)
+            y0 = np.where(joint, y_ranks - np.nanmean(y_ranks, axis=0), 0.0)
+            rho[i] = (x0 * y0).sum(axis=0) / np.sqrt(
+                (x0**2).sum(axis=0) * (y0**2).sum(axis=0)
+            )
+        n[i] = joint.sum(axis=0)
+    return np.clip(rho, -1.0, 1.0), n
+
+
+def _correlation_p_values(r, n, absorbed_dof=0):
+    """
+    Two-sided p-values for correlations from the t-distribution with n - 2 df
+    (less any degrees of freedom already absorbed, e.g. by fixed effects).
+    """
+    from scipy import stats
+
+    dof = np.maximum(n - 2 - absorbed_dof, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = r * np.sqrt(dof / ((1.0 - r) * (1.0 + r)))
+    p = 2 * stats.t.sf(np.abs(t_stat), dof)
+    return np.where(np.isnan(r), np.nan, p)
+
+
+def compute_correlation_matrices(
+    df,
+    efficiency_metrics=None,
+    waste_metrics=None,
+    absorbed_dof=0,
+    methods=CORRELATION_METHODS,
+):
+    """
+    Compute Pearson and Spearman matrices (with p-values) for all metric pairs at once.
+
+    Args:
+        df (pd.DataFrame): Dataset with efficiency and waste metrics
+        efficiency_metrics (list, optional): Defaults to EFFICIENCY_METRICS
+        waste_metrics (list, optional): Defaults to WASTE_METRICS
+        absorbed_dof (int): Degrees of freedom used up before correlating (e.g.
+            restaurant fixed effects), subtracted for the p-values
+        methods (tuple): Correlations to compute, a subset of CORRELATION_METHODS
+
+    Returns:
+        dict: 'efficiency_metrics' and 'waste_metrics' (the columns found in df) and
+            (n_efficiency, n_waste) arrays 'n' and, per method computed, '<method>'
+            and '<method>_p'
+    """
+    eff = [m for m in (efficiency_metrics or EFFICIENCY_METRICS) if m in df.columns]
+    waste = [m for m in (waste_metrics or WASTE_METRICS) if m in df.columns]
+
+    X = df[eff].to_numpy(dtype=float)
+    Y = df[waste].to_numpy(dtype=float)
+    matrices = {'efficiency_metrics': eff, 'waste_metrics': waste}
+    for method in CORRELATION_METHODS:
+        if method not in methods:
+            continue
+        r, n = _pearson_matrix(X, Y) if method == 'pearson' else _spearman_matrix(X, Y)
+        matrices[method] = r
+        matrices[f'{method}_p'] = _correlation_p_values(r, n, absorbed_dof)
+        matrices['n'] = n
+    return matrices
+
+
+def _correlation_results(matrices):
+    """
+    Turn correlation matrices into the per-pair result dict of compute_correlations().
+
+    Pairs with fewer than 3 complete observations are skipped; only the
+    methods present in matrices are reported.
+    """
+    results = {}
+    for i, eff_metric in enumerate(matrices['efficiency_metrics']):
+        for j, waste_metric in enumerate(matrices['waste_metrics']):
+            n_samples = int(matrices['n'][i, j])
+            if n_samples < 3:
+                continue
+            pair = {}
+            for method in CORRELATION_METHODS:
+                if method in matrices:
+                    pair[f'{method}_correlation'] = matrices[method][i, j]
+                    pair[f'{method}_p_value'] = matrices[f'{method}_p'][i, j]
+            pair['n_samples'] = n_samples
+            results[f"{eff_metric}_vs_{waste_metric}"] = pair
+    return results
+
+
+def compute_correlations(df, verbose=True):
     """
     Compute Pearson and Spearman correlation coefficients between efficiency 
     metrics and waste metrics.
     
     Args:
         df (pd.DataFrame): Merged dataset with efficiency and waste metrics
+        verbose (bool): Print the results
         
     Returns:
         dict: Dictionary containing correlation results
     """
+    results = _correlation_results(compute_correlation_matrices(df))
+    if not verbose:
+        return results
+
     print("\n" + "="*60)
     print("CORRELATION ANALYSIS")
     print("="*60)
     
-    # Define efficiency metrics
-    efficiency_metrics = [
-        'efficiency_score',
-        'avg_delivery_time',
-        'on_time_rate',
-        'avg_distance',
-        'deliveries_per_day'
-    ]
+    for key, values in results.items():
+        eff_metric, waste_metric = key.split('_vs_', 1)
+        print(f"\n{eff_metric} vs {waste_metric}:")
+        print(
+            f"  Pearson correlation:  {values['pearson_correlation']:.4f} "
+            f"(p={values['pearson_p_value']:.4f})"
+        )
+        print(
+            f"  Spearman correlation: {values['spearman_correlation']:.4f} "
+            f"(p={values['spearman_p_value']:.4f})"
+        )
+        print(f"  Sample size: {values['n_samples']}")
     
-    # Define waste metrics
-    waste_metrics = [
-        'total_waste_lb',
-        'avg_waste_per_record_lb',
-        'avg_waste_per_serving_lb',
-        'total_waste_cost_usd'
+    return results
+
+
+def _standardize(values, axis=0):
+    """Z-score along an axis (population std); constant slices become NaN."""
+    centered = values - values.mean(axis=axis, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return centered / values.std(axis=axis, keepdims=True)
+
+
+def _significance_chunk(task):
+    """
+    Run one chunk of permutations and bootstrap replicates (runs in a worker process).
+
+    Returns:
+        tuple: Pearson and Spearman exceedance counts (p, q) for the permutations,
+            and Pearson and Spearman bootstrap replicates (b, p, q)
+    """
+    from scipy import stats
+
+    seed_seq, n_perm, n_boot, X, Y, observed_pearson, observed_spearman = task
+    rng = np.random.default_rng(seed_seq)
+    n_rows = len(X)
+    zx, zy = _standardize(X), _standardize(Y)
+    rank_zx = _standardize(_rank_columns(X))
+    rank_zy = _standardize(_rank_columns(Y))
+
+    # Permutations: shuffling rows of Y leaves its ranks' values unchanged, so both
+    # statistics are a batched product against the permuted standardized columns.
+    perms = rng.permuted(np.tile(np.arange(n_rows), (n_perm, 1)), axis=1)
+    perm_pearson = np.einsum('ip,biq->bpq', zx, zy[perms]) / n_rows
+    perm_spearman = np.einsum('ip,biq->bpq', rank_zx, rank_zy[perms]) / n_rows
+    tol = 1e-12
+    pearson_hits = (np.abs(perm_pearson) >= np.abs(observed_pearson) - tol).sum(axis=0)
+    spearman_hits = (np.abs(perm_spearman) >= np.abs(observed_spearman) - tol).sum(
+        axis=0
+    )
+
+    # Bootstrap: resampled rows must be re-standardized (and re-ranked) per replicate
+    idx = rng.integers(0, n_rows, size=(n_boot, n_rows))
+    bx, by = X[idx], Y[idx]
+    boot_pearson = (
+        np.einsum('bip,biq->bpq', _standardize(bx, 1), _standardize(by, 1)) / n_rows
+    )
+    boot_spearman = (
+        np.einsum(
+            'bip,biq->bpq',
+            _standardize(stats.rankdata(bx, axis=1), 1),
+            _standardize(stats.rankdata(by, axis=1), 1),
+        )
+        / n_rows
+    )
+    return pearson_hits, spearman_hits, boot_pearson, boot_spearman
+
+
+def compute_correlation_significance(
+    df, n_permutations=10000, n_bootstrap=2000, confidence=0.95, n_jobs=1, seed=None
+):
+    """
+    Permutation p-values and bootstrap confidence intervals for every correlation pair.
+
+    With only a handful of restaurants the parametric p-values from
+    compute_correlations() are unreliable. Here permutations and bootstrap
+    resamples are drawn as batched index matrices and every pair is evaluated at
+    once; chunks are spread over a process pool when n_jobs != 1. Only rows with
+    all efficiency and waste metrics present are used, so every pair is tested on
+    the same sample.
+
+    Args:
+        df (pd.DataFrame): Merged dataset with efficiency and waste metrics
+        n_permutations (int): Number of permutations of the waste columns
+        n_bootstrap (int): Number of bootstrap resamples of rows
+        confidence (float): Two-sided confidence level of the intervals
+        n_jobs (int): Worker processes; -1 uses every core
+        seed (int, optional): Seed for reproducible results
+
+    Returns:
+        dict: Per "<efficiency>_vs_<waste>" key: observed correlations, permutation
+            p-values, bootstrap CI bounds and sample counts
+    """
+    eff = [m for m in EFFICIENCY_METRICS if m in df.columns]
+    waste = [m for m in WASTE_METRICS if m in df.columns]
+    data = df[eff + waste].dropna()
+    if len(data) < 3 or not eff or not waste:
+        return {}
+
+    X = data[eff].to_numpy(dtype=float)
+    Y = data[waste].to_numpy(dtype=float)
+    observed_pearson, _ = _pearson_matrix(X, Y)
+    observed_spearman, _ = _spearman_matrix(X, Y)
+
+    # Size chunks so each (replicates x rows x metrics) block stays around 4M entries
+    per_chunk = max(1, 4_000_000 // (len(data) * (len(eff) + len(waste))))
+    n_chunks = n_chunks_for(max(n_permutations, n_bootstrap), per_chunk)
+    perm_sizes = split_evenly(n_permutations, n_chunks)
+    boot_sizes = split_evenly(n_bootstrap, n_chunks)
+    seeds = spawn_seeds(seed, n_chunks)
+    tasks = [
+        (seed_seq, n_perm, n_boot, X, Y, observed_pearson, observed_spearman)
+        for seed_seq, n_perm, n_boot in zip(seeds, perm_sizes, boot_sizes)
     ]
-    
+
+    chunks = map_chunks(_significance_chunk, tasks, n_jobs)
+
+    pearson_hits = sum(chunk[0] for chunk in chunks)
+    spearman_hits = sum(chunk[1] for chunk in chunks)
+    boot_pearson = np.concatenate([chunk[2] for chunk in chunks])
+    boot_spearman = np.concatenate([chunk[3] for chunk in chunks])
+
+    # An undefined observed correlation (e.g. a constant column) never counts a
+    # permutation hit, which would read as the smallest possible p-value; it has
+    # no p-value or interval instead
+    pearson_undefined = np.isnan(observed_pearson)
+    spearman_undefined = np.isnan(observed_spearman)
+    pearson_p = np.where(
+        pearson_undefined, np.nan, (pearson_hits + 1) / (n_permutations + 1)
+    )
+    spearman_p = np.where(
+        spearman_undefined, np.nan, (spearman_hits + 1) / (n_permutations + 1)
+    )
+
+    alpha = (1 - confidence) / 2
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        # All-NaN slices (undefined pairs) are expected and masked below
+        warnings.simplefilter('ignore', RuntimeWarning)
+        pearson_ci = (
+            np.where(
+                pearson_undefined,
+                np.nan,
+                np.nanquantile(boot_pearson, [alpha, 1 - alpha], axis=0),
+            )
+            if n_bootstrap
+            else None
+        )
+        spearman_ci = (
+            np.where(
+                spearman_undefined,
+                np.nan,
+                np.nanquantile(boot_spearman, [alpha, 1 - alpha], axis=0),
+            )
+            if n_bootstrap
+            else None
+        )
+
     results = {}
-    
-    for eff_metric in efficiency_metrics:
-        if eff_metric not in df.columns:
-            continue
-            
-        for waste_metric in waste_metrics:
-            if waste_metric not in df.columns:
-                continue
-            
-            # Extract non-null pairs
-            data = df[[eff_metric, waste_metric]].dropna()
-            if len(data) < 3:
-                continue
-            
-            x = data[eff_metric].values
-            y = data[waste_metric].values
-            
-            # Pearson correlation (linear relationship)
-            pearson_corr, pearson_p = pearsonr(x, y)
-            
-            # Spearman correlation (monotonic relationship)
-            spearman_corr, spearman_p = spearmanr(x, y)
-            
-            key = f"{eff_metric}_vs_{waste_metric}"
-            results[key] = {
-                'pearson_correlation': pearson_corr,
-                'pearson_p_value': pearson_p,
-                'spearman_correlation': spearman_corr,
-                'spearman_p_value': spearman_p,
-                'n_samples': len(data)
+    for i, eff_metric in enumerate(eff):
+        for j, waste_metric in enumerate(waste):
+            results[f"{eff_metric}_vs_{waste_metric}"] = {
+                'pearson_correlation': float(observed_pearson[i, j]),
+                'pearson_permutation_p_value': float(pearson_p[i, j]),
+                'pearson_ci_lower': float(pearson_ci[0, i, j]) if n_bootstrap else None,
+                'pearson_ci_upper': float(pearson_ci[1, i, j]) if n_bootstrap else None,
+                'spearman_correlation': float(observed_spearman[i, j]),
+                'spearman_permutation_p_value': float(spearman_p[i, j]),
+                'spearman_ci_lower': (
+                    float(spearman_ci[0, i, j]) if n_bootstrap else None
+                ),
+                'spearman_ci_upper': (
+                    float(spearman_ci[1, i, j]) if n_bootstrap else None
+                ),
+                'n_samples': len(data),
+                'n_permutations': n_permutations,
+                'n_bootstrap': n_bootstrap,
             }
-            
-            print(f"\n{eff_metric} vs {waste_metric}:")
-            print(f"  Pearson correlation:  {pearson_corr:.4f} (p={pearson_p:.4f})")
-            print(f"  Spearman correlation: {spearman_corr:.4f} (p={spearman_p:.4f})")
-            print(f"  Sample size: {len(data)}")
-    
     return results
 
 
-def perform_regression_analysis(df):
+def _fit_stacked_designs(X, Y, rows, absorbed_dof=0):
+    """
+    Least-squares fits for a stack of independent designs, one SVD per design.
+
+    Each design s uses only the rows flagged in rows[s]; the other rows are
+    padding so designs of different sizes can share one (S, L, ...) array and
+    be solved together by the batched linear algebra routines.
+
+    Args:
+        X (np.ndarray): (S, L, p) predictors, no missing values in used rows
+        Y (np.ndarray): (S, L, t) targets, no missing values in used rows
+        rows (np.ndarray): (S, L) boolean mask of the rows each design uses
+        absorbed_dof (int): See _fit_shared_design
+
+    Returns:
+        dict: The arrays of _fit_shared_design with a leading design axis, plus
+            (S,) 'n_rows'
+    """
+    from scipy import stats
+
+    n_rows = rows.sum(axis=1)
+    weights = rows[:, :, None]
+    x_mean = np.where(weights, X, 0.0).sum(axis=1) / n_rows[:, None]
+    y_mean = np.where(weights, Y, 0.0).sum(axis=1) / n_rows[:, None]
+    # Padding rows are zero after centering and drop out of every product below
+    xc = np.where(weights, X - x_mean[:, None, :], 0.0)
+    yc = np.where(weights, Y - y_mean[:, None, :], 0.0)
+
+    u, sing, vt = np.linalg.svd(xc, full_matrices=False)
+    tol = (
+        sing.max(axis=1, initial=0.0)
+        * np.maximum(n_rows, X.shape[2])
+        * np.finfo(float).eps
+    )
+    keep = sing > tol[:, None]
+    rank = keep.sum(axis=1)
+    inv_sing = np.where(keep, 1.0 / np.where(keep, sing, 1.0), 0.0)
+    vt_t = vt.transpose(0, 2, 1)
+
+    coef = vt_t @ (inv_sing[:, :, None] * (u.transpose(0, 2, 1) @ yc))
+    intercept = y_mean - np.einsum('sp,spt->st', x_mean, coef)
+    rss = ((yc - xc @ coef) ** 2).sum(axis=1)
+    tss = (yc**2).sum(axis=1)
+    df_resid = n_rows - rank - 1 - absorbed_dof
+    has_dof = (df_resid > 0)[:, None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(tss > 0, 1 - rss / tss, np.where(rss > 0, 0.0, 1.0))
+        adjusted_r2 = np.where(
+            has_dof,
+            1 - (1 - r2) * ((n_rows - 1 - absorbed_dof) / df_resid)[:, None],
+            np.nan,
+        )
+        sigma2 = np.where(has_dof, rss / df_resid[:, None], np.nan)
+
+        # Predictors loading on the null space of the design are not identifiable
+        identifiable = ~((np.abs(vt) > 1e-8) & ~keep[:, :, None]).any(axis=1)
+        gram_inv = (vt_t * inv_sing[:, None, :] ** 2) @ vt
+        gram_diag = np.diagonal(gram_inv, axis1=1, axis2=2)
+        std_err = np.sqrt(gram_diag[:, :, None] * sigma2[:, None, :])
+        std_err[~identifiable] = np.nan
+        leverage = 1.0 / n_rows + np.einsum('sp,spq,sq->s', x_mean, gram_inv, x_mean)
+        intercept_std_err = np.sqrt(sigma2 * leverage[:, None])
+        intercept_std_err[~identifiable.all(axis=1)] = np.nan
+        t_stat = coef / std_err
+        intercept_t_stat = intercept / intercept_std_err
+        vif = np.where(identifiable, gram_diag * (xc**2).sum(axis=1), np.inf)
+
+    dof = np.maximum(df_resid, 1)
+    return {
+        'coef': coef,
+        'intercept': intercept,
+        'std_err': std_err,
+        't_stat': t_stat,
+        'p_value': 2 * stats.t.sf(np.abs(t_stat), dof[:, None, None]),
+        'intercept_std_err': intercept_std_err,
+        'intercept_t_stat': intercept_t_stat,
+        'intercept_p_value': 2 * stats.t.sf(np.abs(intercept_t_stat), dof[:, None]),
+        'r2': r2,
+        'adjusted_r2': adjusted_r2,
+        'vif': vif,
+        'rank': rank,
+        'df_resid': df_resid,
+        'n_rows': n_rows,
+    }
+
+
+def _fit_shared_design(X, Y, absorbed_dof=0):
+    """
+    Least-squares fit of every column of Y on the same design X (plus intercept).
+
+    One SVD of the centered design serves all targets and also yields the inverse
+    Gram matrix needed for standard errors and VIFs. Rank-deficient designs get
+    the minimum-norm solution (as LinearRegression does); coefficients that are
+    not identifiable get NaN standard errors and infinite VIFs.
+
+    Args:
+        X (np.ndarray): (rows, p) predictors, no missing values
+        Y (np.ndarray): (rows, t) targets, no missing values
+        absorbed_dof (int): Extra residual degrees of freedom to remove (e.g. for
+            restaurant fixed effects absorbed by demeaning)
+
+    Returns:
+        dict: (p, t) 'coef', 'std_err', 't_stat', 'p_value'; (t,) 'intercept',
+            'intercept_std_err', 'intercept_t_stat', 'intercept_p_value', 'r2',
+            'adjusted_r2'; (p,) 'vif'; scalar 'rank' and 'df_resid'
+    """
+    fit = _fit_stacked_designs(
+        X[None], Y[None], np.ones((1, len(X)), dtype=bool), absorbed_dof
+    )
+    single = {key: value[0] for key, value in fit.items() if key != 'n_rows'}
+    single['rank'] = int(single['rank'])
+    single['df_resid'] = int(single['df_resid'])
+    return single
+
+
+def _regression_result(fit, predictors, k, n_samples):
+    """
+    Result dict for target k of a _fit_shared_design() fit, in the format of
+    fit_regression_batch().
+    """
+
+    def with_intercept(values, intercept_value):
+        named = dict(zip(predictors, values[:, k].tolist()))
+        named['intercept'] = float(intercept_value[k])
+        return named
+
+    return {
+        'coefficients': dict(zip(predictors, fit['coef'][:, k].tolist())),
+        'intercept': float(fit['intercept'][k]),
+        'r2_score': float(fit['r2'][k]),
+        'adjusted_r2_score': float(fit['adjusted_r2'][k]),
+        'std_errors': with_intercept(fit['std_err'], fit['intercept_std_err']),
+        't_stats': with_intercept(fit['t_stat'], fit['intercept_t_stat']),
+        'p_values': with_intercept(fit['p_value'], fit['intercept_p_value']),
+        'vif': dict(zip(predictors, fit['vif'].tolist())),
+        'rank': int(fit['rank']),
+        'n_samples': n_samples,
+    }
+
+
+def fit_regression_batch(df, predictors=None, targets=None, absorbed_dof=0):
+    """
+    Fit all waste targets on the efficiency predictors in one factorization.
+
+    Targets that share the same missing-value pattern are solved together as a
+    multi-output least-squares problem on a single design matrix.
+
+    Args:
+        df (pd.DataFrame): Dataset with efficiency and waste metrics
+        predictors (list, optional): Defaults to EFFICIENCY_METRICS
+        targets (list, optional): Defaults to WASTE_METRICS
+        absorbed_dof (int): Degrees of freedom absorbed before fitting (see
+            _fit_shared_design)
+
+    Returns:
+        dict: Per target: coefficients, intercept, r2_score, adjusted_r2_score,
+            std_errors, t_stats, p_values (each keyed by predictor plus 'intercept'),
+            vif, rank and n_samples
+    """
+    predictors = [p for p in (predictors or EFFICIENCY_METRICS) if p in df.columns]
+    targets = [t for t in (targets or WASTE_METRICS) if t in df.columns]
+    if not predictors or not targets:
+        return {}
+
+    data = df[predictors + targets]
+    data = data[data[predictors].notna().all(axis=1)]
+    target_present = data[targets].notna().to_numpy()
+    patterns, pattern_ids = _missing_patterns(target_present)
+
+    fits = {}
+    for pattern_id, rows in enumerate(patterns):
+        group = [t for t, g in zip(targets, pattern_ids) if g == pattern_id]
+        if rows.sum() < len(predictors) + 2 + absorbed_dof:
+            continue
+
+        fit = _fit_shared_design(
+            data.loc[rows, predictors].to_numpy(dtype=float),
+            data.loc[rows, group].to_numpy(dtype=float),
+            absorbed_dof,
+        )
+        for k, target in enumerate(group):
+            fits[target] = _regression_result(fit, predictors, k, int(rows.sum()))
+
+    # Keep the caller's target order
+    return {t: fits[t] for t in targets if t in fits}
+
+
+def perform_regression_analysis(df, verbose=True):
     """
     Perform linear regression to model how efficiency metrics predict waste generation.
     
     Args:
         df (pd.DataFrame): Merged dataset with efficiency and waste metrics
+        verbose (bool): Print the fitted models
         
     Returns:
         dict: Dictionary containing regression results
     """
+    regression_results = fit_regression_batch(df)
+    if not verbose:
+        return regression_results
+
     print("\n" + "="*60)
     print("REGRESSION ANALYSIS")
     print("="*60)
     
-    regression_results = {}
-    
-    # Define target variables (waste metrics)
-    target_vars = [
-        'total_waste_lb',
-        'avg_waste_per_record_lb',
-        'avg_waste_per_serving_lb',
-        'total_waste_cost_usd'
-    ]
-    
-    # Define predictor variables (efficiency metrics)
-    predictor_vars = [
-        'efficiency_score',
-        'avg_delivery_time',
-        'on_time_rate',
-        'avg_distance',
-        'deliveries_per_day'
-    ]
-    
-    for target in target_vars:
-        if target not in df.columns:
-            continue
-        
-        # Prepare data
-        predictors = [p for p in predictor_vars if p in df.columns]
-        data = df[predictors + [target]].dropna()
-        
-        if len(data) < len(predictors) + 2:
-            continue
-        
-        X = data[predictors].values
-        y = data[target].values
-        
-        # Fit linear regression
-        model = LinearRegression()
-        model.fit(X, y)
-        
-        # Predictions
-        y_pred = model.predict(X)
-        r2 = r2_score(y, y_pred)
-        
-        # Store results
-        regression_results[target] = {
-            'coefficients': dict(zip(predictors, model.coef_)),
-            'intercept': model.intercept_,
-            'r2_score': r2,
-            'n_samples': len(data)
-        }
-        
+    for target, results in regression_results.items():
         print(f"\nPredicting {target} from efficiency metrics:")
-        print(f"  Intercept: {model.intercept_:.4f}")
-        for pred, coef in zip(predictors, model.coef_):
-            print(f"  {pred}: {coef:.4f}")
-        print(f"  R² Score: {r2:.4f}")
-        print(f"  Sample size: {len(data)}")
+        print(f"  Intercept: {results['intercept']:.4f}")
+        for pred, coef in results['coefficients'].items():
+            print(
+                f"  {pred}: {coef:.4f} (se={results['std_errors'][pred]:.4f}, "
+                f"p={results['p_values'][pred]:.4f}, VIF={results['vif'][pred]:.2f})"
+            )
+        print(f"  R² Score: {results['r2_score']:.4f}")
+        print(f"  Adjusted R²: {results['adjusted_r2_score']:.4f}")
+        print(f"  Sample size: {results['n_samples']}")
     
     return regression_results
 
 
+def load_period_metrics(freq='D'):
+    """
+    Aggregate efficiency and waste metrics per restaurant and period, unjoined.
+
+    Efficiency metrics come from the raw Delivery_Logs and waste metrics from the
+    waste dataset, both aggregated per restaurant and day (freq='D') or week
+    (freq='W') with vectorized group-bys. The efficiency score is computed over
+    all restaurant-periods with the standard formula.
+
+    Args:
+        freq (str): 'D' for restaurant-days or 'W' for restaurant-weeks
+
+    Returns:
+        tuple: (efficiency, waste) DataFrames keyed by 'restaurant' and 'period'
+    """
+    if freq not in PERIOD_FREQUENCIES:
+        raise ValueError("freq must be 'D' (daily) or 'W' (weekly)")
+
+    delivery_df = clean_delivery_logs(pd.read_csv(DELIVERY_FILE))
+    delivery_df = delivery_df[delivery_df['date'].notna()]
+    waste_df = pd.read_csv(WASTE_FILE)
+    waste_df['date'] = pd.to_datetime(waste_df['date'], errors='coerce')
+    waste_df = waste_df[waste_df['date'].notna()]
+
+    def period_of(dates):
+        if freq == 'D':
+            return dates.dt.normalize()
+        return dates.dt.to_period('W').dt.start_time
+
+    delivery_df = delivery_df.assign(period=period_of(delivery_df['date']))
+    efficiency = delivery_df.groupby(['restaurant', 'period']).agg(
+        avg_delivery_time=('delivery_time_min', 'mean'),
+        on_time_rate=('on_time', 'mean'),
+        avg_distance=('distance_km', 'mean'),
+        deliveries=('order_id', 'count'),
+    )
+    efficiency['on_time_rate'] *= 100
+    if freq == 'D':
+        efficiency['deliveries_per_day'] = efficiency['deliveries']
+    else:
+        # Average over the days in the week that actually had deliveries
+        active_days = (
+            delivery_df.drop_duplicates(['restaurant', 'period', 'date'])
+            .groupby(['restaurant', 'period'])
+            .size()
+        )
+        efficiency['deliveries_per_day'] = efficiency['deliveries'] / active_days
+    efficiency = score_efficiency(efficiency.drop(columns='deliveries').reset_index())
+
+    waste_agg = _aggregate_waste(
+        waste_df.assign(period=period_of(waste_df['date'])), ['restaurant', 'period']
+    )
+    return efficiency, waste_agg
+
+
+def load_panel_data(freq='D'):
+    """
+    Build a restaurant x period panel of efficiency and waste metrics.
+
+    Args:
+        freq (str): 'D' for restaurant-days or 'W' for restaurant-weeks, see
+            load_period_metrics()
+
+    Returns:
+        pd.DataFrame: One row per restaurant and period present in both sources
+    """
+    efficiency, waste_agg = load_period_metrics(freq)
+    return pd.merge(efficiency, waste_agg, on=['restaurant', 'period'], how='inner')
+
+
+def _demean_within(df, columns, group_col):
+    """Subtract each group's mean from the given columns (within transformation)."""
+    demeaned = df.copy()
+    demeaned[columns] = df[columns] - df.groupby(group_col)[columns].transform('mean')
+    return demeaned
+
+
+def run_panel_analysis(freq='D', fixed_effects=False, panel_df=None):
+    """
+    Run the correlation and regression analysis on a restaurant x period panel.
+
+    With fixed_effects=True every metric is demeaned within restaurant first, so
+    results reflect how a restaurant's waste moves with its own efficiency from
+    period to period rather than differences between restaurants. The degrees of
+    freedom used by the restaurant means are removed from all p-values.
+
+    Args:
+        freq (str): 'D' or 'W', see load_panel_data()
+        fixed_effects (bool): Absorb restaurant fixed effects
+        panel_df (pd.DataFrame, optional): Pre-built panel; loaded when omitted
+
+    Returns:
+        dict: panel, correlations, regressions, n_observations and n_restaurants
+    """
+    panel = load_panel_data(freq) if panel_df is None else panel_df
+    metrics = [m for m in EFFICIENCY_METRICS + WASTE_METRICS if m in panel.columns]
+    n_restaurants = panel['restaurant'].nunique()
+
+    absorbed_dof = 0
+    analysis_df = panel
+    if fixed_effects:
+        analysis_df = _demean_within(panel, metrics, 'restaurant')
+        absorbed_dof = n_restaurants - 1
+
+    return {
+        'panel': panel,
+        'correlations': _correlation_results(
+            compute_correlation_matrices(analysis_df, absorbed_dof=absorbed_dof)
+        ),
+        'regressions': fit_regression_batch(analysis_df, absorbed_dof=absorbed_dof),
+        'n_observations': len(panel),
+        'n_restaurants': n_restaurants,
+    }
+
+
+def _stacked_pearson(X, Y):
+    """
+    Pairwise-complete Pearson correlations for a stack of independent samples.
+
+    Args:
+        X (np.ndarray): (S, L, p) array, NaN for missing values and padding
+        Y (np.ndarray): (S, L, q) array, NaN for missing values and padding
+
+    Returns:
+        tuple: (r, n) arrays of shape (S, p, q)
+    """
+    present_x, present_y = ~np.isnan(X), ~np.isnan(Y)
+    mx, my = present_x.astype(float), present_y.astype(float)
+    x0, y0 = np.where(present_x, X, 0.0), np.where(present_y, Y, 0.0)
+
+    n = mx.transpose(0, 2, 1) @ my
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Center on each segment's column means to keep the moment sums well conditioned
+        x0 = np.where(
+            present_x,
+            x0 - x0.sum(axis=1, keepdims=True) / mx.sum(axis=1, keepdims=True),
+            0.0,
+        )
+        y0 = np.where(
+            present_y,
+            y0 - y0.sum(axis=1, keepdims=True) / my.sum(axis=1, keepdims=True),
+            0.0,
+        )
+        mx_t, x0_t = mx.transpose(0, 2, 1), x0.transpose(0, 2, 1)
+
+        sum_x, sum_y = x0_t @ my, mx_t @ y0
+        cov = x0_t @ y0 - sum_x * sum_y / n
+        var_x = (x0_t**2) @ my - sum_x**2 / n
+        var_y = mx_t @ (y0**2) - sum_y**2 / n
+        r = cov / np.sqrt(var_x * var_y)
+    return np.clip(r, -1.0, 1.0), n.astype(int)
+
+
+def _segment_chunk(task):
+    """
+    Correlation matrices and regression fits for one chunk of segments.
+
+    Every segment in the chunk is padded to the same length so the moment sums,
+    rankings and least-squares fits are evaluated for all of them at once.
+    Segments with missing values get their Spearman matrix recomputed on their
+    own rows, since ranks then depend on which rows each pair shares.
+    """
+    X, Y, min_fit_rows = task
+    pearson, n = _stacked_pearson(X, Y)
+
+    # Ranking within the padded rows of each segment; NaN (padding) stays NaN
+    rank_x = (
+        pd.DataFrame(X.transpose(1, 0, 2).reshape(X.shape[1], -1)).rank().to_numpy()
+    )
+    rank_y = (
+        pd.DataFrame(Y.transpose(1, 0, 2).reshape(Y.shape[1], -1)).rank().to_numpy()
+    )
+    spearman, _ = _stacked_pearson(
+        rank_x.reshape(X.shape[1], X.shape[0], X.shape[2]).transpose(1, 0, 2),
+        rank_y.reshape(Y.shape[1], Y.shape[0], Y.shape[2]).transpose(1, 0, 2),
+    )
+    present_x, present_y = ~np.isnan(X), ~np.isnan(Y)
+    used = present_x.any(axis=2) | present_y.any(axis=2)
+    incomplete = (used[:, :, None] & ~present_x).any(axis=(1, 2)) | (
+        used[:, :, None] & ~present_y
+    ).any(axis=(1, 2))
+    for s in np.flatnonzero(incomplete):
+        spearman[s], _ = _spearman_matrix(X[s, used[s]], Y[s, used[s]])
+
+    # Regressions use each segment's rows with every predictor and target present
+    complete = present_x.all(axis=2) & present_y.all(axis=2)
+    fitted = np.flatnonzero(complete.sum(axis=1) >= min_fit_rows)
+    fit = None
+    if len(fitted):
+        rows = complete[fitted]
+        fit = _fit_stacked_designs(
+            np.where(rows[:, :, None], X[fitted], 0.0),
+            np.where(rows[:, :, None], Y[fitted], 0.0),
+            rows,
+        )
+    matrices = {
+        'pearson': pearson,
+        'pearson_p': _correlation_p_values(pearson, n),
+        'spearman': spearman,
+        'spearman_p': _correlation_p_values(spearman, n),
+        'n': n,
+    }
+    return matrices, fitted, fit
+
+
+def compute_segmented_analysis(
+    df, segment_col='cuisine', efficiency_metrics=None, waste_metrics=None, n_jobs=1
+):
+    """
+    Run the correlation and regression suite separately for every segment.
+
+    Rows are grouped by a metadata column (see SEGMENT_COLUMNS) and segments of
+    similar size are padded into (segments x rows x metrics) blocks, so each block
+    is analyzed in one batched pass instead of one segment at a time. Blocks are
+    spread over a process pool when n_jobs != 1.
+
+    Args:
+        df (pd.DataFrame): Merged dataset with efficiency, waste and metadata columns
+        segment_col (str): Column to segment by; rows where it is missing are dropped
+        efficiency_metrics (list, optional): Defaults to EFFICIENCY_METRICS
+        waste_metrics (list, optional): Defaults to WASTE_METRICS
+        n_jobs (int): Worker processes; -1 uses every core
+
+    Returns:
+        dict: Segment value (as a string) -> 'n_samples', 'correlations' (as
+            returned by compute_correlations) and 'regressions' (as returned by
+            fit_regression_batch, fitted on the segment's complete rows)
+    """
+    if segment_col not in df.columns:
+        raise KeyError(f"Segment column '{segment_col}' not found in data")
+    eff = [m for m in (efficiency_metrics or EFFICIENCY_METRICS) if m in df.columns]
+    waste = [m for m in (waste_metrics or WASTE_METRICS) if m in df.columns]
+    data = df[df[segment_col].notna()]
+    if data.empty or not eff or not waste:
+        return {}
+
+    codes, segments = pd.factorize(data[segment_col], sort=True)
+    row_order = np.argsort(codes, kind='stable')
+    X_sorted = data[eff].to_numpy(dtype=float)[row_order]
+    Y_sorted = data[waste].to_numpy(dtype=float)[row_order]
+    sizes = np.bincount(codes, minlength=len(segments))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    # Pack segments, largest first, into blocks of about 4M padded entries; with
+    # several workers make sure there is at least one block per worker.
+    workers = resolve_workers(n_jobs)
+    by_size = np.argsort(-sizes, kind='stable')
+    budget = 4_000_000 // (len(eff) + len(waste))
+    max_per_block = (
+        n_chunks_for(len(segments), workers) if workers > 1 else len(segments)
+    )
+    blocks, current = [], []
+    for seg in by_size:
+        if current and (
+            (len(current) + 1) * sizes[current[0]] > budget
+            or len(current) >= max_per_block
+        ):
+            blocks.append(current)
+            current = []
+        current.append(seg)
+    blocks.append(current)
+
+    # Padding rows point at an all-NaN row appended after the data
+    X_padded = np.vstack([X_sorted, np.full((1, len(eff)), np.nan)])
+    Y_padded = np.vstack([Y_sorted, np.full((1, len(waste)), np.nan)])
+    tasks = []
+    for block in blocks:
+        block = np.asarray(block)
+        offsets = np.arange(sizes[block[0]])
+        index = np.where(
+            offsets < sizes[block][:, None],
+            starts[block][:, None] + offsets,
+            len(X_sorted),
+        )
+        tasks.append((X_padded[index], Y_padded[index], len(eff) + 2))
+
+    chunks = map_chunks(_segment_chunk, tasks, n_jobs)
+
+    results = {}
+    for block, (matrices, fitted, fit) in zip(blocks, chunks):
+        for s, seg in enumerate(block):
+            segment_matrices = {key: value[s] for key, value in matrices.items()}
+            segment_matrices.update(efficiency_metrics=eff, waste_metrics=waste)
+            results[seg] = {
+                'n_samples': int(sizes[seg]),
+                'correlations': _correlation_results(segment_matrices),
+                'regressions': {},
+            }
+        for k, s in enumerate(fitted):
+            segment_fit = {key: value[k] for key, value in fit.items()}
+            results[block[s]]['regressions'] = {
+                target: _regression_result(
+                    segment_fit, eff, j, int(segment_fit['n_rows'])
+                )
+                for j, target in enumerate(waste)
+            }
+
+    return {str(segments[seg]): results[seg] for seg in range(len(segments))}
+
+
+# Waste columns read in approximate mode; the rest of the master dataset is skipped
+APPROXIMATE_WASTE_COLUMNS = [
+    'restaurant',
+    'date',
+    'quantity_lb',
+    'waste_per_serving_lb',
+    'est_cost_usd',
+    'delayed',
+]
+
+
+def stratified_sample(
+    df,
+    fraction=None,
+    size=None,
+    strata=('restaurant', 'date'),
+    min_per_stratum=2,
+    n_replicates=20,
+    seed=None,
+):
+    """
+    Draw a stratified random sample with proportional allocation.
+
+    Every stratum keeps round(fraction * stratum size) rows, but at least
+    min_per_stratum (or the whole stratum if smaller), so small restaurants and
+    days are never lost. Each sampled row carries its design weight
+    (stratum size / rows sampled from it) and a delete-a-group jackknife group
+    (0 .. n_replicates - 1), balanced within every stratum.
+
+    Args:
+        df (pd.DataFrame): Rows to sample from
+        fraction (float, optional): Share of rows to keep, in (0, 1]
+        size (int, optional): Target sample size instead of a fraction
+        strata (tuple): Columns defining the strata (missing values form their
+            own stratum)
+        min_per_stratum (int): Minimum rows kept per stratum
+        n_replicates (int): Number of jackknife groups
+        seed (int, optional): Seed for reproducible samples
+
+    Returns:
+        pd.DataFrame: Sampled rows plus 'sampling_weight' and 'replicate_group'
+    """
+    if (fraction is None) == (size is None):
+        raise ValueError("Specify exactly one of fraction or size")
+    if size is not None:
+        fraction = size / max(len(df), 1)
+    if not 0 < fraction <= 1:
+        raise ValueError("Sampling fraction must be in (0, 1]")
+
+    rng = np.random.default_rng(seed)
+    # Combined stratum codes from per-column factorizations (NaN gets its own code)
+    codes = np.zeros(len(df), dtype=np.int64)
+    for col in strata:
+        col_codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+        codes = codes * len(uniques) + col_codes
+    codes = pd.factorize(codes)[0]
+    stratum_size = np.bincount(codes)
+    allocated = np.clip(
+        np.rint(fraction * stratum_size),
+        np.minimum(min_per_stratum, stratum_size),
+        stratum_size,
+    )
+
+    # Random order within each stratum (a stable sort of shuffled rows by compact
+    # stratum codes); keep the first `allocated` rows of each
+    shuffled = rng.permutation(len(df))
+    code_dtype = np.uint16 if len(stratum_size) <= np.iinfo(np.uint16).max else np.int64
+    order = shuffled[np.argsort(codes[shuffled].astype(code_dtype), kind='stable')]
+    starts = np.concatenate([[0], np.cumsum(stratum_size)[:-1]])
+    position = np.arange(len(df)) - starts[codes[order]]
+    keep = position < allocated[codes[order]]
+    rows, row_codes, row_position = order[keep], codes[order][keep], position[keep]
+
+    sample = df.iloc[rows].copy()
+    sample['sampling_weight'] = stratum_size[row_codes] / allocated[row_codes]
+    # Consecutive positions go to consecutive groups from a random start per stratum
+    offset = rng.integers(0, n_replicates, len(stratum_size))
+    sample['replicate_group'] = (row_position + offset[row_codes]) % n_replicates
+    return sample
+
+
+def _weighted_waste_sums(sample, restaurants, n_replicates):
+    """
+    Weighted sums behind every waste metric, per restaurant and jackknife group.
+
+    Returns:
+        np.ndarray: (restaurants, groups, 6) sums of w*quantity, w*[quantity
+            present], w*per-serving waste, w*[per-serving present], w*cost and
+            w*delayed
+    """
+
+    def column(name):
+        return (
+            sample[name].to_numpy(dtype=float)
+            if name in sample.columns
+            else np.full(len(sample), np.nan)
+        )
+
+    weight = sample['sampling_weight'].to_numpy(dtype=float)
+    quantity, per_serving, cost = (
+        column('quantity_lb'),
+        column('waste_per_serving_lb'),
+        column('est_cost_usd'),
+    )
+    delayed = (
+        sample['delayed'].eq(True).to_numpy(dtype=float)
+        if 'delayed' in sample.columns
+        else np.zeros(len(sample))
+    )
+    terms = np.column_stack(
+        [
+            weight * np.nan_to_num(quantity),
+            weight * ~np.isnan(quantity),
+            weight * np.nan_to_num(per_serving),
+            weight * ~np.isnan(per_serving),
+            weight * np.nan_to_num(cost),
+            weight * delayed,
+        ]
+    )
+
+    restaurant_codes = pd.Index(restaurants).get_indexer(sample['restaurant'])
+    cells = restaurant_codes * n_replicates + sample['replicate_group'].to_numpy()
+    known = restaurant_codes >= 0
+    sums = np.column_stack(
+        [
+            np.bincount(
+                cells[known],
+                weights=terms[known, j],
+                minlength=len(restaurants) * n_replicates,
+            )
+            for j in range(terms.shape[1])
+        ]
+    ).reshape(len(restaurants), n_replicates, -1)
+    if 'est_cost_usd' not in sample.columns:
+        sums[:, :, 4] = np.nan
+    if 'waste_per_serving_lb' not in sample.columns:
+        sums[:, :, 2] = np.nan
+    return sums
+
+
+def _waste_metrics_from_sums(restaurants, sums):
+    """Per-restaurant waste metrics, as in _aggregate_waste(), from weighted sums."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame(
+            {
+                'restaurant': restaurants,
+                'total_waste_lb': sums[:, 0],
+                'avg_waste_per_record_lb': sums[:, 0] / sums[:, 1],
+                'waste_record_count': sums[:, 1],
+                'avg_waste_per_serving_lb': sums[:, 2] / sums[:, 3],
+                'total_waste_cost_usd': sums[:, 4],
+                'delayed_deliveries_count': sums[:, 5],
+            }
+        )
+
+
+def run_approximate_analysis(
+    fraction=0.1,
+    size=None,
+    n_replicates=20,
+    confidence=0.95,
+    seed=None,
+    efficiency_df=None,
+    waste_df=None,
+):
+    """
+    Run the correlation and regression analysis on a stratified waste sample.
+
+    Waste records are sampled by restaurant and day (see stratified_sample),
+    aggregated with design weights so per-restaurant totals and averages are
+    unbiased estimates of the full-data values, and then analyzed as usual.
+    Standard errors come from a delete-a-group jackknife: the analysis is
+    repeated with each replicate group left out, using per-group partial sums
+    so the sample is only aggregated once. Intervals are estimate ± z * SE.
+    A 10% sample of the master dataset reads only the needed columns and
+    finishes well under a second.
+
+    Args:
+        fraction (float): Share of waste records to sample (ignored if size is set)
+        size (int, optional): Target number of sampled waste records
+        n_replicates (int): Jackknife groups
+        confidence (float): Two-sided confidence level of the intervals
+        seed (int, optional): Seed for reproducible samples
+        efficiency_df (pd.DataFrame, optional): Efficiency scores; read from
+            EFFICIENCY_FILE when omitted
+        waste_df (pd.DataFrame, optional): Waste records; only
+            APPROXIMATE_WASTE_COLUMNS are read from WASTE_FILE when omitted
+
+    Returns:
+        dict: 'correlations' and 'regressions' in the formats of
+            compute_correlations() and fit_regression_batch(), each estimate with
+            '<name>_se', '<name>_ci_lower' and '<name>_ci_upper' alongside, plus
+            sample_size, population_size, sampling_fraction and n_replicates
+    """
+    if efficiency_df is None:
+        efficiency_df = pd.read_csv(EFFICIENCY_FILE)
+    if waste_df is None:
+        waste_df = pd.read_csv(
+            WASTE_FILE, usecols=lambda c: c in APPROXIMATE_WASTE_COLUMNS
+        )
+    waste_df = waste_df.assign(
+        date=pd.to_datetime(waste_df['date'], errors='coerce').dt.normalize()
+    )
+
+    sample = stratified_sample(
+        waste_df, None if size else fraction, size, n_replicates=n_replicates, seed=seed
+    )
+    restaurants = np.array(
+        sorted(set(efficiency_df['restaurant']) & set(sample['restaurant'])),
+        dtype=object,
+    )
+    sums = _weighted_waste_sums(sample, restaurants, n_replicates)
+
+    # Full-sample estimate, then one replicate per left-out group (reweighted by
+    # G / (G - 1))
+    total = sums.sum(axis=1)
+    replicate_sums = [total] + [
+        (total - sums[:, g]) * n_replicates / (n_replicates - 1)
+        for g in range(n_replicates)
+    ]
+    analyses = []
+    for replicate in replicate_sums:
+        merged = pd.merge(
+            efficiency_df,
+            _waste_metrics_from_sums(restaurants, replicate),
+            on='restaurant',
+            how='inner',
+        )
+        analyses.append(
+            (
+                _correlation_results(compute_correlation_matrices(merged)),
+                fit_regression_batch(merged),
+            )
+        )
+
+    from scipy import stats
+
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    # Jackknife variance factor with the finite population correction (1 - f),
+    # so a full census reports zero sampling error
+    sampling_fraction = len(sample) / max(len(waste_df), 1)
+    jackknife_scale = (
+        (n_replicates - 1) / n_replicates * (1 - min(sampling_fraction, 1.0))
+    )
+
+    def with_error(estimate, replicate_values, name, bounds=None):
+        values = np.array(replicate_values, dtype=float)
+        se = float(np.sqrt(jackknife_scale * ((values - values.mean()) ** 2).sum()))
+        lower, upper = estimate - z * se, estimate + z * se
+        if bounds:
+            lower, upper = max(lower, bounds[0]), min(upper, bounds[1])
+        return {
+            name: estimate,
+            f'{name}_se': se,
+            f'{name}_ci_lower': lower,
+            f'{name}_ci_upper': upper,
+        }
+
+    correlations, regressions = analyses[0]
+    replicates = analyses[1:]
+    approx_correlations = {}
+    for key, values in correlations.items():
+        result = dict(values)
+        for name in ('pearson_correlation', 'spearman_correlation'):
+            result.update(
+                with_error(
+                    values[name],
+                    [r[0].get(key, {}).get(name, np.nan) for r in replicates],
+                    name,
+                    bounds=(-1.0, 1.0),
+                )
+            )
+        approx_correlations[key] = result
+
+    approx_regressions = {}
+    for target, fit in regressions.items():
+        result = dict(fit)
+        fits = [r[1].get(target) for r in replicates]
+        for name in ('intercept', 'r2_score'):
+            result.update(
+                with_error(fit[name], [f[name] if f else np.nan for f in fits], name)
+            )
+        for pred, coef in fit['coefficients'].items():
+            error = with_error(
+                coef, [f['coefficients'][pred] if f else np.nan for f in fits], 'coef'
+            )
+            result.setdefault('coefficient_se', {})[pred] = error['coef_se']
+            result.setdefault('coefficient_ci_lower', {})[pred] = error['coef_ci_lower']
+            result.setdefault('coefficient_ci_upper', {})[pred] = error['coef_ci_upper']
+        approx_regressions[target] = result
+
+    return {
+        'correlations': approx_correlations,
+        'regressions': approx_regressions,
+        'sample_size': len(sample),
+        'population_size': len(waste_df),
+        'sampling_fraction': sampling_fraction,
+        'n_replicates': n_replicates,
+        'confidence': confidence,
+    }
+
+
 def get_correlation_summary(correlation_results):
     """
     Get a summary of correlation results as a dictionary suitable for API responses.
@@ -260,6 +1457,25 @@ def main():
     # Perform regression analysis
     regression_results = perform_regression_analysis(merged_df)
     
+    # Repeat both analyses within each metadata segment
+    print("\n" + "=" * 60)
+    print("SEGMENTED ANALYSIS")
+    print("=" * 60)
+    segmented_results = {}
+    for segment_col in SEGMENT_COLUMNS:
+        if segment_col not in merged_df.columns:
+            continue
+        segmented_results[segment_col] = compute_segmented_analysis(
+            merged_df, segment_col
+        )
+        print(f"\nBy {segment_col}:")
+        for segment, values in segmented_results[segment_col].items():
+            print(
+                f"  {segment}: {values['n_samples']} restaurants, "
+                f"{len(values['correlations'])} correlation pairs, "
+                f"{len(values['regressions'])} regression models"
+            )
+
     # Get summary
     summary = get_correlation_summary(correlation_results)
     
@@ -278,6 +1494,7 @@ def main():
         'merged_data': merged_df,
         'correlations': correlation_results,
         'regressions': regression_results,
+        'segments': segmented_results,
         'summary': summary
     }
 
@@ -0,0 +1,236 @@
+"""
+Lagged Efficiency-Waste Correlation
+
+Waste caused by delivery problems can show up days after the deliveries that
+caused it. This module builds daily efficiency and waste series per restaurant
+and correlates them over a range of lags for all restaurants at once, using
+FFT-based cross-correlation, then reports the lag with the strongest
+correlation for each restaurant.
+
+A positive lag k pairs efficiency on day t with waste on day t + k (waste
+trailing efficiency); negative lags pair waste with later efficiency.
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from analysis.correlate_efficiency_waste import (
+    _correlation_p_values,
+    load_period_metrics,
+)
+
+
+def build_daily_series(
+    efficiency_metric="efficiency_score",
+    waste_metric="total_waste_lb",
+    period_metrics=None,
+):
+    """
+    Daily efficiency and waste series per restaurant on one shared calendar.
+
+    Args:
+        efficiency_metric (str): Daily efficiency column (see load_period_metrics)
+        waste_metric (str): Daily waste column (see load_period_metrics)
+        period_metrics (tuple, optional): Pre-loaded (efficiency, waste) daily
+            frames as returned by load_period_metrics('D')
+
+    Returns:
+        tuple: (efficiency, waste) DataFrames indexed by restaurant with one
+            column per calendar day; days without data are NaN
+    """
+    efficiency, waste = (
+        period_metrics if period_metrics is not None else load_period_metrics("D")
+    )
+    for name, frame, metric in (
+        ("efficiency", efficiency, efficiency_metric),
+        ("waste", waste, waste_metric),
+    ):
+        if metric not in frame.columns:
+            raise KeyError(f"Unknown {name} metric '{metric}'")
+
+    restaurants = sorted(set(efficiency["restaurant"]) & set(waste["restaurant"]))
+    periods = pd.concat([efficiency["period"], waste["period"]])
+    days = (
+        pd.date_range(periods.min(), periods.max(), freq="D")
+        if len(periods)
+        else pd.DatetimeIndex([])
+    )
+
+    def to_grid(frame, metric):
+        return frame.pivot_table(
+            index="restaurant", columns="period", values=metric, aggfunc="mean"
+        ).reindex(index=restaurants, columns=days)
+
+    return to_grid(efficiency, efficiency_metric), to_grid(waste, waste_metric)
+
+
+def _cross_sums(a, b, n_fft, lags):
+    """
+    Sums over t of a[:, t] * b[:, t + k] for every row and lag k, via the FFT.
+    """
+    spectrum = np.conj(np.fft.rfft(a, n_fft, axis=1)) * np.fft.rfft(b, n_fft, axis=1)
+    circular = np.fft.irfft(spectrum, n_fft, axis=1)
+    # Negative lags wrap around to the end of the circular result
+    return circular[:, lags % n_fft]
+
+
+def lagged_cross_correlation(efficiency, waste, min_lag=-7, max_lag=7, min_overlap=3):
+    """
+    Pearson correlation between efficiency and lagged waste for every row and lag.
+
+    Each lag uses only the days where both series are observed, so gaps in
+    either series are handled exactly. All moment sums needed for the masked
+    correlations come from six batched cross-correlations computed with real
+    FFTs over the (rows x days) arrays, so the cost is O(rows * days * log days)
+    regardless of the number of lags.
+
+    Args:
+        efficiency (pd.DataFrame or np.ndarray): (rows, days) efficiency series,
+            NaN for missing days
+        waste (pd.DataFrame or np.ndarray): (rows, days) waste series aligned
+            with efficiency
+        min_lag (int): Smallest lag in days
+        max_lag (int): Largest lag in days
+        min_overlap (int): Lags with fewer overlapping days than this are NaN
+
+    Returns:
+        tuple: (lags, r, n) where lags has shape (n_lags,) and r and n have
+            shape (rows, n_lags)
+    """
+    if min_lag > max_lag:
+        raise ValueError("min_lag must not exceed max_lag")
+    X = np.asarray(efficiency, dtype=float)
+    Y = np.asarray(waste, dtype=float)
+    if X.shape != Y.shape:
+        raise ValueError("Efficiency and waste series must have the same shape")
+
+    n_days = X.shape[1]
+    lags = np.arange(min_lag, max_lag + 1)
+    n_fft = 1 << max(2 * n_days - 1, 1).bit_length()
+
+    present_x, present_y = ~np.isnan(X), ~np.isnan(Y)
+    mx, my = present_x.astype(float), present_y.astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Standardize on observed days so the FFT sums stay well conditioned
+        x0 = np.where(
+            present_x,
+            (X - np.nanmean(X, axis=1, keepdims=True))
+            / np.nanstd(X, axis=1, keepdims=True),
+            0.0,
+        )
+        y0 = np.where(
+            present_y,
+            (Y - np.nanmean(Y, axis=1, keepdims=True))
+            / np.nanstd(Y, axis=1, keepdims=True),
+            0.0,
+        )
+    x0, y0 = np.nan_to_num(x0), np.nan_to_num(y0)
+
+    n = np.rint(_cross_sums(mx, my, n_fft, lags))
+    sum_x = _cross_sums(x0, my, n_fft, lags)
+    sum_y = _cross_sums(mx, y0, n_fft, lags)
+    sum_xy = _cross_sums(x0, y0, n_fft, lags)
+    sum_xx = _cross_sums(x0**2, my, n_fft, lags)
+    sum_yy = _cross_sums(mx, y0**2, n_fft, lags)
+
+    # Lags beyond the series length have no overlapping days at all
+    out_of_range = np.abs(lags) >= n_days
+    n[:, out_of_range] = 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_xy - sum_x * sum_y / n
+        var_x = sum_xx - sum_x**2 / n
+        var_y = sum_yy - sum_y**2 / n
+        # FFT round-off leaves ~1e-15 noise where a series is constant on the overlap
+        degenerate = (var_x <= 1e-9 * np.maximum(n, 1)) | (
+            var_y <= 1e-9 * np.maximum(n, 1)
+        )
+        r = cov / np.sqrt(var_x * var_y)
+    r[degenerate | (n < max(min_overlap, 3))] = np.nan
+    return lags, np.clip(r, -1.0, 1.0), n.astype(int)
+
+
+def find_peak_lags(restaurants, lags, r, n):
+    """
+    Strongest (largest |r|) lag per restaurant.
+
+    The p-value is the usual t-test for the peak correlation on its overlapping
+    days; it is not adjusted for having searched over several lags.
+
+    Returns:
+        pd.DataFrame: restaurant, peak_lag, peak_correlation, n_overlap, p_value
+            and lag_gain (peak |r| minus |r| at lag 0, NaN when lag 0 is not in
+            the range); restaurants without any valid lag get NaN
+    """
+    valid = ~np.isnan(r).all(axis=1)
+    best = np.argmax(np.where(np.isnan(r), -np.inf, np.abs(r)), axis=1)
+    rows = np.arange(len(r))
+    peak_r = np.where(valid, r[rows, best], np.nan)
+    peak_n = np.where(valid, n[rows, best], 0)
+
+    zero = np.flatnonzero(lags == 0)
+    lag_gain = (
+        np.abs(peak_r) - np.abs(r[:, zero[0]]) if len(zero) else np.full(len(r), np.nan)
+    )
+
+    return pd.DataFrame(
+        {
+            "restaurant": list(restaurants),
+            "peak_lag": np.where(valid, lags[best], np.nan),
+            "peak_correlation": peak_r,
+            "n_overlap": peak_n,
+            "p_value": _correlation_p_values(peak_r, peak_n),
+            "lag_gain": lag_gain,
+        }
+    )
+
+
+def run_lag_analysis(
+    efficiency_metric="efficiency_score",
+    waste_metric="total_waste_lb",
+    min_lag=-3,
+    max_lag=3,
+    min_overlap=3,
+    period_metrics=None,
+):
+    """
+    Lagged correlation between daily efficiency and waste for every restaurant.
+
+    Args:
+        efficiency_metric (str): Daily efficiency column to correlate
+        waste_metric (str): Daily waste column to correlate
+        min_lag (int): Smallest lag in days (negative: waste leads efficiency)
+        max_lag (int): Largest lag in days (positive: waste trails efficiency)
+        min_overlap (int): Minimum overlapping days for a lag to be reported
+        period_metrics (tuple, optional): Pre-loaded daily (efficiency, waste)
+            frames, see build_daily_series()
+
+    Returns:
+        dict: 'lags', 'correlations' (restaurant x lag DataFrame of r),
+            'overlap' (restaurant x lag DataFrame of overlapping days) and
+            'peaks' (see find_peak_lags)
+    """
+    efficiency, waste = build_daily_series(
+        efficiency_metric, waste_metric, period_metrics
+    )
+    lags, r, n = lagged_cross_correlation(
+        efficiency, waste, min_lag, max_lag, min_overlap
+    )
+    restaurants = efficiency.index
+
+    return {
+        "lags": lags.tolist(),
+        "correlations": pd.DataFrame(r, index=restaurants, columns=lags),
+        "overlap": pd.DataFrame(n, index=restaurants, columns=lags),
+        "peaks": find_peak_lags(restaurants, lags, r, n),
+    }
+
+
+if __name__ == "__main__":
+    results = run_lag_analysis()
+    print("Peak lag per restaurant (positive lag: waste trails efficiency):")
+    print(results["peaks"].to_string(index=False))
@@ -0,0 +1,211 @@
+"""
+Persisted Regression Models
+
+Fitted waste regressions are written to data/models/ after each analysis run
+so predictions can be served without refitting. A stored bundle records the
+feature order, one coefficient column and intercept per waste target, and a
+fingerprint of the training data; RegressionPredictor turns it into a
+(features x targets) matrix so a whole batch of efficiency profiles is
+predicted with one matrix product.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from analysis.correlate_efficiency_waste import DATA_DIR, EFFICIENCY_METRICS
+
+MODEL_DIR = os.path.join(DATA_DIR, "models")
+REGRESSION_MODEL_FILE = os.path.join(MODEL_DIR, "regression_models.json")
+SELECTED_MODEL_FILE = os.path.join(MODEL_DIR, "regularized_regression.json")
+
+
+def training_fingerprint(df, columns):
+    """
+    SHA-256 of the training values and column names, independent of row order.
+
+    Args:
+        df (pd.DataFrame): Training data
+        columns (list): Columns the models were fitted on
+
+    Returns:
+        str: Hex digest
+    """
+    row_hashes = np.sort(
+        pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    )
+    digest = hashlib.sha256(json.dumps(list(columns)).encode())
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def build_model_bundle(regression_results, df, kind="ols"):
+    """
+    Package fitted regressions for storage.
+
+    Args:
+        regression_results (dict): Per target 'coefficients' (predictor -> value)
+            and 'intercept', e.g. from fit_regression_batch() or
+            select_regularized_models()['models']. Other scalar fields (r2_score,
+            n_samples, alpha, cv_rmse, ...) are kept as model metadata.
+        df (pd.DataFrame): Data the models were fitted on
+        kind (str): Label for the kind of model ('ols', 'regularized', ...)
+
+    Returns:
+        dict: JSON-serializable bundle
+    """
+    targets = list(regression_results)
+    # Feature order follows EFFICIENCY_METRICS, then any other predictors as first seen
+    seen = {
+        p for results in regression_results.values() for p in results["coefficients"]
+    }
+    features = [m for m in EFFICIENCY_METRICS if m in seen]
+    for results in regression_results.values():
+        features += [p for p in results["coefficients"] if p not in features]
+
+    models = {}
+    for target, results in regression_results.items():
+        metadata = {
+            key: value.item() if isinstance(value, np.generic) else value
+            for key, value in results.items()
+            if key not in ("coefficients", "intercept")
+            and isinstance(value, (str, int, float, bool, np.generic))
+        }
+        models[target] = {
+            # Predictors a target was not fitted on contribute nothing
+            "coefficients": [
+                float(results["coefficients"].get(f, 0.0)) for f in features
+            ],
+            "intercept": float(results["intercept"]),
+            **metadata,
+        }
+
+    return {
+        "kind": kind,
+        "features": features,
+        "targets": targets,
+        "models": models,
+        "training_fingerprint": training_fingerprint(
+            df, features + [t for t in targets if t in df.columns]
+        ),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def save_models(bundle, path=None):
+    """
+    Write a model bundle atomically.
+
+    Args:
+        bundle (dict): Output of build_model_bundle()
+        path (str, optional): Defaults to REGRESSION_MODEL_FILE
+
+    Returns:
+        str: The path written
+    """
+    path = path or REGRESSION_MODEL_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # A unique temp name: several server processes may save at once
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(bundle, f, indent=2)
+        os.chmod(tmp_path, 0o644)  # mkstemp files are owner-only
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+def load_models(path=None):
+    """Read a bundle written by save_models()."""
+    with open(path or REGRESSION_MODEL_FILE) as f:
+        return json.load(f)
+
+
+class RegressionPredictor:
+    """
+    Vectorized predictions from a stored model bundle.
+    """
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+        self.features = list(bundle["features"])
+        self.targets = list(bundle["targets"])
+        # (features, targets) so that predictions = profiles @ coef + intercept
+        self.coef = (
+            np.array(
+                [bundle["models"][t]["coefficients"] for t in self.targets], dtype=float
+            )
+            .reshape(len(self.targets), len(self.features))
+            .T
+        )
+        self.intercept = np.array(
+            [bundle["models"][t]["intercept"] for t in self.targets], dtype=float
+        )
+
+    def _profile_matrix(self, profiles):
+        if isinstance(profiles, pd.DataFrame):
+            missing = [f for f in self.features if f not in profiles.columns]
+            if missing:
+                raise ValueError(f"Profiles are missing features: {missing}")
+            return profiles[self.features].to_numpy(dtype=float)
+        if isinstance(profiles, np.ndarray):
+            X = np.atleast_2d(profiles.astype(float))
+            if X.shape[1] != len(self.features):
+                raise ValueError(
+                    f"Expected {len(self.features)} feature columns, got {X.shape[1]}"
+                )
+            return X
+        # Sequence of dicts
+        try:
+            return np.array(
+                [[p[f] for f in self.features] for p in profiles], dtype=float
+            ).reshape(-1, len(self.features))
+        except KeyError as e:
+            raise ValueError(f"Profile is missing feature {e}") from None
+
+    def predict(self, profiles):
+        """
+        Predict every target for a batch of efficiency profiles.
+
+        Args:
+            profiles (pd.DataFrame, np.ndarray or list of dict): One row per
+                profile; arrays must follow self.features
+
+        Returns:
+            np.ndarray: (n_profiles, n_targets) predictions in self.targets order
+        """
+        X = self._profile_matrix(profiles)
+        if np.isnan(X).any():
+            raise ValueError("Profiles contain missing or non-numeric feature values")
+        return X @ self.coef + self.intercept
+
+
+_predictor_cache = {}
+
+
+def load_predictor(path=None):
+    """
+    RegressionPredictor for a stored bundle, reloaded only when the file changes.
+
+    Raises:
+        FileNotFoundError: No models have been stored at path
+    """
+    path = path or REGRESSION_MODEL_FILE
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _predictor_cache.get(path)
+    if cached is None or cached[0] != key:
+        cached = (key, RegressionPredictor(load_models(path)))
+        _predictor_cache[path] = cached
+    return cached[1]
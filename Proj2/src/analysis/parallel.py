@@ -0,0 +1,77 @@
+"""
+Chunked Process-Pool Execution
+
+Shared fan-out for the analyses that split independent work (bootstrap and
+permutation replicates, segments, cross-validation folds) into chunks: the
+chunk sizes, one independent random stream per chunk, and running the chunks
+in a process pool when more than one worker is requested. Results do not
+depend on n_jobs because the chunks and their seeds do not.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def resolve_workers(n_jobs):
+    """
+    Number of worker processes for an n_jobs argument.
+
+    Args:
+        n_jobs (int): Worker processes; -1 uses every core
+
+    Returns:
+        int: At least 1
+    """
+    workers = os.cpu_count() if n_jobs == -1 else n_jobs
+    return max(1, workers or 1)
+
+
+def split_evenly(total, n_chunks):
+    """
+    Split total items into n_chunks sizes that differ by at most one.
+
+    Returns:
+        np.ndarray: n_chunks integer sizes summing to total
+    """
+    return np.diff(np.linspace(0, total, n_chunks + 1).astype(int))
+
+
+def n_chunks_for(total, per_chunk):
+    """Fewest chunks of at most per_chunk items that hold total items (at least 1)."""
+    return max(1, -(-total // max(1, per_chunk)))
+
+
+def spawn_seeds(seed, n_chunks):
+    """
+    Independent random streams, one per chunk.
+
+    Args:
+        seed (int or None): Seed of the whole computation
+        n_chunks (int): Number of chunks
+
+    Returns:
+        list: np.random.SeedSequence per chunk
+    """
+    return np.random.SeedSequence(seed).spawn(n_chunks)
+
+
+def map_chunks(fn, tasks, n_jobs=1):
+    """
+    Apply fn to every task, in a process pool when n_jobs asks for more than
+    one worker and there is more than one task.
+
+    Args:
+        fn (callable): Module-level function (it is pickled for the workers)
+        tasks (list): One argument per call
+        n_jobs (int): Worker processes; -1 uses every core
+
+    Returns:
+        list: fn(task) for each task, in task order
+    """
+    workers = resolve_workers(n_jobs)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            return list(pool.map(fn, tasks))
+    return [fn(task) for task in tasks]
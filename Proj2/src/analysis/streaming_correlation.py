@@ -0,0 +1,223 @@
+"""
+Streaming Efficiency-Waste Correlation
+
+Keeps running means and co-moments for every efficiency and waste metric so
+correlations and regression coefficients can be refreshed as new observations
+arrive, or combined across shards, without re-reading the source data.
+
+Batches are folded in with the Chan et al. parallel update (Welford's update
+for a single row), which is numerically stable and exact: merging two partial
+states gives the same result as processing all rows at once.
+"""
+
+import numpy as np
+import pandas as pd
+
+from analysis.correlate_efficiency_waste import (
+    EFFICIENCY_METRICS,
+    WASTE_METRICS,
+    _correlation_p_values,
+)
+
+
+class CoMomentAccumulator:
+    """
+    Running count, means and co-moment matrix over efficiency and waste metrics.
+
+    Only rows where every tracked metric is present are accumulated, so all
+    statistics describe the same set of observations.
+    """
+
+    def __init__(self, efficiency_metrics=None, waste_metrics=None):
+        self.efficiency_metrics = list(efficiency_metrics or EFFICIENCY_METRICS)
+        self.waste_metrics = list(waste_metrics or WASTE_METRICS)
+        self.columns = self.efficiency_metrics + self.waste_metrics
+        k = len(self.columns)
+        self.n = 0
+        self.mean = np.zeros(k)
+        # Sum of outer products of deviations from the mean
+        self.comoment = np.zeros((k, k))
+
+    def _merge_moments(self, n_b, mean_b, comoment_b):
+        """Chan et al. merge of another set of moments into this one."""
+        if n_b == 0:
+            return
+        n_a = self.n
+        total = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (n_b / total)
+        self.comoment = (
+            self.comoment + comoment_b + np.outer(delta, delta) * (n_a * n_b / total)
+        )
+        self.n = total
+
+    def update(self, data):
+        """
+        Fold a batch of observations into the running state.
+
+        Args:
+            data (pd.DataFrame or np.ndarray): Rows with every tracked column (a
+                DataFrame) or an array whose columns follow self.columns
+
+        Returns:
+            int: Number of complete rows accumulated
+        """
+        if isinstance(data, pd.DataFrame):
+            missing = [c for c in self.columns if c not in data.columns]
+            if missing:
+                raise KeyError(f"Missing columns for accumulator: {missing}")
+            data = data[self.columns].to_numpy(dtype=float)
+        values = np.atleast_2d(np.asarray(data, dtype=float))
+        if values.shape[1] != len(self.columns):
+            raise ValueError(
+                f"Expected {len(self.columns)} columns, got {values.shape[1]}"
+            )
+
+        values = values[~np.isnan(values).any(axis=1)]
+        if len(values) == 0:
+            return 0
+        batch_mean = values.mean(axis=0)
+        centered = values - batch_mean
+        self._merge_moments(len(values), batch_mean, centered.T @ centered)
+        return len(values)
+
+    def add(self, observation):
+        """
+        Add a single observation (Welford update).
+
+        Args:
+            observation (dict): Metric name -> value for every tracked column
+        """
+        return self.update(
+            np.array([[observation[c] for c in self.columns]], dtype=float)
+        )
+
+    def merge(self, other):
+        """
+        Fold another accumulator's state (e.g. from another shard) into this one.
+        """
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge accumulators tracking different metrics.")
+        self._merge_moments(other.n, other.mean, other.comoment)
+        return self
+
+    def to_state(self):
+        """
+        Returns:
+            dict: JSON-serializable state, restorable with from_state()
+        """
+        return {
+            "efficiency_metrics": self.efficiency_metrics,
+            "waste_metrics": self.waste_metrics,
+            "n": self.n,
+            "mean": self.mean.tolist(),
+            "comoment": self.comoment.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an accumulator from to_state() output."""
+        accumulator = cls(state["efficiency_metrics"], state["waste_metrics"])
+        accumulator.n = int(state["n"])
+        accumulator.mean = np.asarray(state["mean"], dtype=float)
+        accumulator.comoment = np.asarray(state["comoment"], dtype=float)
+        return accumulator
+
+    def covariance(self):
+        """
+        Returns:
+            pd.DataFrame: Sample covariance matrix over all tracked columns
+        """
+        scale = 1.0 / (self.n - 1) if self.n > 1 else np.nan
+        return pd.DataFrame(
+            self.comoment * scale, index=self.columns, columns=self.columns
+        )
+
+    def pearson(self):
+        """
+        Returns:
+            pd.DataFrame: Pearson r, efficiency metrics (rows) x waste metrics (columns)
+        """
+        p = len(self.efficiency_metrics)
+        variances = np.diag(self.comoment)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = self.comoment[:p, p:] / np.sqrt(np.outer(variances[:p], variances[p:]))
+        return pd.DataFrame(
+            np.clip(r, -1.0, 1.0),
+            index=self.efficiency_metrics,
+            columns=self.waste_metrics,
+        )
+
+    def correlation_results(self):
+        """
+        Pearson results in the per-pair format of compute_correlations().
+
+        Spearman correlations need ranks over the full data and are not available
+        from streaming moments.
+
+        Returns:
+            dict: "<efficiency>_vs_<waste>" -> pearson_correlation, pearson_p_value,
+                n_samples
+        """
+        if self.n < 3:
+            return {}
+        r = self.pearson()
+        p_values = _correlation_p_values(r.to_numpy(), np.full(r.shape, self.n))
+        return {
+            f"{eff}_vs_{waste}": {
+                "pearson_correlation": float(r.iloc[i, j]),
+                "pearson_p_value": float(p_values[i, j]),
+                "n_samples": self.n,
+            }
+            for i, eff in enumerate(self.efficiency_metrics)
+            for j, waste in enumerate(self.waste_metrics)
+        }
+
+    def simple_regressions(self):
+        """
+        Slope and intercept of each waste metric on each efficiency metric alone.
+
+        Returns:
+            dict: "<efficiency>_vs_<waste>" -> slope, intercept
+        """
+        p = len(self.efficiency_metrics)
+        results = {}
+        for i, eff in enumerate(self.efficiency_metrics):
+            for j, waste in enumerate(self.waste_metrics):
+                var_x = self.comoment[i, i]
+                slope = self.comoment[i, p + j] / var_x if var_x > 0 else np.nan
+                results[f"{eff}_vs_{waste}"] = {
+                    "slope": float(slope),
+                    "intercept": float(self.mean[p + j] - slope * self.mean[i]),
+                }
+        return results
+
+    def regressions(self):
+        """
+        Multiple regression of each waste metric on all efficiency metrics.
+
+        Solved from the accumulated co-moments (normal equations on centered data),
+        using the pseudo-inverse so collinear predictors get the minimum-norm fit.
+
+        Returns:
+            dict: Per waste metric: coefficients, intercept, r2_score, n_samples
+        """
+        p = len(self.efficiency_metrics)
+        if self.n < p + 2:
+            return {}
+        sxx = self.comoment[:p, :p]
+        sxy = self.comoment[:p, p:]
+        coef = np.linalg.pinv(sxx) @ sxy
+        intercepts = self.mean[p:] - self.mean[:p] @ coef
+        explained = (coef * sxy).sum(axis=0)
+        total = np.diag(self.comoment)[p:]
+
+        results = {}
+        for j, target in enumerate(self.waste_metrics):
+            results[target] = {
+                "coefficients": dict(zip(self.efficiency_metrics, coef[:, j].tolist())),
+                "intercept": float(intercepts[j]),
+                "r2_score": float(explained[j] / total[j]) if total[j] > 0 else np.nan,
+                "n_samples": self.n,
+            }
+        return results
@@ -10,7 +10,10 @@ Issue: #15
 
 import os
 import sys
-from flask import Flask, jsonify
+import json
+import numpy as np
+import pandas as pd
+from flask import Flask, jsonify, request
 from flask_cors import CORS
 
 
@@ -18,15 +21,66 @@ from flask_cors import CORS
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from analysis.correlate_efficiency_waste import (
+    CORRELATION_METHODS,
+    DATA_DIR,
+    EFFICIENCY_FILE,
+    EFFICIENCY_METRICS,
+    WASTE_FILE,
+    WASTE_METRICS,
     load_and_merge_data,
     compute_correlations,
+    compute_correlation_matrices,
+    _correlation_results,
     perform_regression_analysis,
+    fit_regression_batch,
     get_correlation_summary
 )
+from analysis import model_store
+from api import metrics, responses, result_cache
+from api.precompute import DEFAULT_POLL_INTERVAL, PrecomputeWorker
+from api.single_flight import Overloaded, SingleFlight
+
+# Upper bound on profiles per prediction request
+MAX_PREDICTION_PROFILES = 100000
+
+# The correlation response depends only on these files
+ANALYSIS_INPUT_FILES = [EFFICIENCY_FILE, WASTE_FILE]
+CORRELATION_CACHE_KEY = 'efficiency-waste-correlation'
+CORRELATION_SECTIONS = ('correlations', 'regressions', 'summary')
+# Fields of each correlation pair and regression model in the response
+CORRELATION_FIELDS = (
+    'pearson_correlation',
+    'pearson_p_value',
+    'spearman_correlation',
+    'spearman_p_value',
+    'n_samples',
+)
+REGRESSION_FIELDS = ('coefficients', 'intercept', 'r2_score', 'n_samples')
+
+# Background recompute of the correlation payload (see start_precompute_worker)
+_precompute_worker = None
+# Leader lock and published payload shared by the workers of a multi-process server
+PRECOMPUTE_DIR = os.path.join(DATA_DIR, "precompute")
+
+# (input signature, merged DataFrame) loaded once by preload(); read-only
+_preloaded_data = None
+
+# Distinct analyses allowed to run at once; identical requests share one run
+# and further distinct ones are shed with 503 + Retry-After (seconds)
+MAX_CONCURRENT_ANALYSES = 2
+OVERLOAD_RETRY_AFTER = 1
+_analysis_flight = SingleFlight(max_concurrent=MAX_CONCURRENT_ANALYSES)
 
 app = Flask(__name__)
+metrics.init_app(app)
+responses.init_app(app)
 from api.leaderboard_api import leaderboard_bp
+from api.jobs_api import jobs_bp
+from api.restaurants_api import restaurants_bp
+
 app.register_blueprint(leaderboard_bp)
+app.register_blueprint(jobs_bp)
+app.register_blueprint(restaurants_bp)
 CORS(app)  # Enable CORS for frontend access
 
 
@@ -35,64 +89,485 @@ def efficiency_waste_correlation():
     """
     API endpoint to get correlation and regression analysis results.
     
+    The response is cached until the analysis input files change and carries
+    a strong ETag; a matching If-None-Match returns 304. While the background
+    precompute worker runs, changed inputs are picked up by the worker and the
+    last good result is served immediately with 'stale': true. Concurrent
+    cache misses share one computation; when too many are running the
+    request is refused with 503.
+
+    Query parameters (all optional; without any the full analysis is returned):
+        - metrics: Comma-separated efficiency and/or waste metrics to analyze
+          (a side with none listed keeps all its metrics); regressions use the
+          selected efficiency metrics as predictors
+        - pairs: Comma-separated '<efficiency>_vs_<waste>' pairs (instead of metrics)
+        - method: 'pearson', 'spearman' or 'both'
+        - sections: Comma-separated subset of correlations, regressions, summary
+    Only the requested correlations and regressions are computed.
+
     Returns:
         JSON response with:
         - correlations: Dictionary of correlation coefficients
         - regressions: Dictionary of regression models
         - summary: Summary of strong correlations
+        - computed_at: When the result was computed (UTC, ISO 8601)
+        - stale: Whether the inputs have changed since then
     """
     try:
-        # Load and merge data
-        merged_df = load_and_merge_data()
-        
-        # Compute correlations (this prints, but also returns results)
-        correlation_results = compute_correlations(merged_df)
-        
-        # Perform regression analysis (this prints, but also returns results)
-        regression_results = perform_regression_analysis(merged_df)
-        
-        # Get summary
-        summary = get_correlation_summary(correlation_results)
-        
-        # Format regression results for JSON serialization
-        formatted_regressions = {}
-        for target, results in regression_results.items():
-            formatted_regressions[target] = {
-                'coefficients': {k: float(v) for k, v in results['coefficients'].items()},
-                'intercept': float(results['intercept']),
-                'r2_score': float(results['r2_score']),
-                'n_samples': int(results['n_samples'])
-            }
-        
-        # Format correlations for JSON serialization
-        formatted_correlations = {}
-        for key, values in correlation_results.items():
-            formatted_correlations[key] = {
-                'pearson_correlation': float(values['pearson_correlation']),
-                'pearson_p_value': float(values['pearson_p_value']),
-                'spearman_correlation': float(values['spearman_correlation']),
-                'spearman_p_value': float(values['spearman_p_value']),
-                'n_samples': int(values['n_samples'])
+        selection = _parse_correlation_selection(request.args)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    cache_key = CORRELATION_CACHE_KEY
+    if selection is not None:
+        cache_key += '?' + json.dumps(selection, sort_keys=True)
+
+    try:
+        signature = result_cache.input_signature(ANALYSIS_INPUT_FILES)
+    except OSError:
+        # Missing inputs: recompute so the failure is reported as usual
+        signature = None
+
+    entry = result_cache.get(cache_key)
+    if entry is not None and signature is not None and entry.signature == signature:
+        metrics.CACHE_REQUESTS.inc('correlation', 'hit')
+        return _cached_json_response(entry)
+    # The worker only keeps the full response up to date
+    if (
+        selection is None
+        and entry is not None
+        and _precompute_worker is not None
+        and _precompute_worker.running
+    ):
+        metrics.CACHE_REQUESTS.inc('correlation', 'stale')
+        return _cached_json_response(entry, stale=True)
+    metrics.CACHE_REQUESTS.inc('correlation', 'miss')
+
+    # Concurrent misses for the same inputs share one computation
+    try:
+        entry = _analysis_flight.do(
+            (cache_key, signature),
+            lambda: _compute_correlation_entry(signature, cache_key, selection),
+        )
+    except Overloaded:
+        return _overloaded_response()
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+    return _cached_json_response(entry)
+
+
+def _compute_correlation_entry(
+    signature, cache_key=CORRELATION_CACHE_KEY, selection=None
+):
+    """
+    Compute the correlation response and cache it under signature (if known).
+    """
+    if selection is None:
+        response = _build_correlation_response()
+    else:
+        response = _build_selected_correlation_response(selection)
+    if signature is None:
+        return result_cache.CachedResponse(None, response, dumps=responses.dumps)
+    return result_cache.put(cache_key, signature, response, dumps=responses.dumps)
+
+
+def _split_param(args, name):
+    value = args.get(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _parse_correlation_selection(args):
+    """
+    Parse the projection query parameters of the correlation endpoint.
+
+    Args:
+        args (MultiDict): Request query parameters
+
+    Returns:
+        dict or None: Normalized 'efficiency_metrics', 'waste_metrics', 'pairs'
+            (None unless given), 'methods' and 'sections'; None when the full
+            response is requested
+
+    Raises:
+        ValueError: Unknown metric, pair, method or section
+    """
+    metrics = _split_param(args, 'metrics')
+    pairs = _split_param(args, 'pairs')
+    method = args.get('method', 'both')
+    sections = _split_param(args, 'sections')
+
+    if metrics is not None and pairs is not None:
+        raise ValueError("Use either 'metrics' or 'pairs', not both")
+    if method not in CORRELATION_METHODS + ('both',):
+        raise ValueError(f"Unknown method '{method}'; use pearson, spearman or both")
+    methods = list(CORRELATION_METHODS) if method == 'both' else [method]
+    if sections is None:
+        sections = list(CORRELATION_SECTIONS)
+    unknown = [section for section in sections if section not in CORRELATION_SECTIONS]
+    if unknown or not sections:
+        raise ValueError(
+            f"Unknown sections {unknown}; choose from {list(CORRELATION_SECTIONS)}"
+        )
+    sections = [section for section in CORRELATION_SECTIONS if section in sections]
+
+    efficiency_metrics, waste_metrics = list(EFFICIENCY_METRICS), list(WASTE_METRICS)
+    if metrics is not None:
+        unknown = [m for m in metrics if m not in EFFICIENCY_METRICS + WASTE_METRICS]
+        if unknown or not metrics:
+            raise ValueError(f"Unknown metrics {unknown}")
+        efficiency_metrics = [
+            m for m in EFFICIENCY_METRICS if m in metrics
+        ] or efficiency_metrics
+        waste_metrics = [m for m in WASTE_METRICS if m in metrics] or waste_metrics
+    if pairs is not None:
+        known_pairs = {
+            f"{e}_vs_{w}": (e, w) for e in EFFICIENCY_METRICS for w in WASTE_METRICS
+        }
+        unknown = [pair for pair in pairs if pair not in known_pairs]
+        if unknown or not pairs:
+            raise ValueError(
+                f"Unknown pairs {unknown}; use '<efficiency metric>_vs_<waste metric>'"
+            )
+        pairs = [pair for pair in known_pairs if pair in pairs]
+        efficiency_metrics = [
+            m for m in EFFICIENCY_METRICS if any(known_pairs[p][0] == m for p in pairs)
+        ]
+        waste_metrics = [
+            m for m in WASTE_METRICS if any(known_pairs[p][1] == m for p in pairs)
+        ]
+
+    selection = {
+        'efficiency_metrics': efficiency_metrics,
+        'waste_metrics': waste_metrics,
+        'pairs': pairs,
+        'methods': methods,
+        'sections': sections,
+    }
+    full = {
+        'efficiency_metrics': list(EFFICIENCY_METRICS),
+        'waste_metrics': list(WASTE_METRICS),
+        'pairs': None,
+        'methods': list(CORRELATION_METHODS),
+        'sections': list(CORRELATION_SECTIONS),
+    }
+    return None if selection == full else selection
+
+
+def _build_selected_correlation_response(selection):
+    """
+    Compute only the sections, metrics, pairs and methods in selection.
+
+    Correlations are computed on the selected (efficiency x waste) block; the
+    summary needs both methods, so they are computed when it is requested.
+    Regressions fit the selected waste metrics on the selected efficiency
+    metrics and are not stored for /api/predict-waste.
+
+    Returns:
+        dict: Response body in the layout of the full response, restricted to
+            the selected sections
+    """
+    with metrics.time_stage('load_and_merge_data'):
+        merged_df = _load_merged_data()
+    sections = selection['sections']
+    data = {}
+
+    if 'correlations' in sections or 'summary' in sections:
+        methods = CORRELATION_METHODS if 'summary' in sections else selection['methods']
+        with metrics.time_stage('compute_correlation_matrices'):
+            correlation_results = _correlation_results(
+                compute_correlation_matrices(
+                    merged_df,
+                    selection['efficiency_metrics'],
+                    selection['waste_metrics'],
+                    methods=methods,
+                )
+            )
+        if selection['pairs'] is not None:
+            correlation_results = {
+                k: v for k, v in correlation_results.items() if k in selection['pairs']
             }
-        
-        # Build response
-        response = {
-            'status': 'success',
-            'data': {
-                'correlations': formatted_correlations,
-                'regressions': formatted_regressions,
-                'summary': summary,
-                'restaurants_analyzed': len(merged_df)
+        if 'correlations' in sections:
+            fields = [
+                f'{method}_{field}'
+                for method in selection['methods']
+                for field in ('correlation', 'p_value')
+            ] + ['n_samples']
+            data['correlations'] = {
+                key: {field: values[field] for field in fields}
+                for key, values in correlation_results.items()
             }
+        if 'summary' in sections:
+            data['summary'] = get_correlation_summary(correlation_results)
+
+    if 'regressions' in sections:
+        with metrics.time_stage('fit_regression_batch'):
+            regression_results = fit_regression_batch(
+                merged_df, selection['efficiency_metrics'], selection['waste_metrics']
+            )
+        data['regressions'] = {
+            target: {field: results[field] for field in REGRESSION_FIELDS}
+            for target, results in regression_results.items()
         }
-        
-        return jsonify(response), 200
-        
-    except Exception as e:
+
+    data['restaurants_analyzed'] = len(merged_df)
+    return {'status': 'success', 'data': data}
+
+
+def _load_merged_data():
+    """
+    The merged analysis dataset: the preloaded one while the input files are
+    unchanged, otherwise freshly loaded. Callers must not modify it.
+    """
+    preloaded = _preloaded_data
+    if preloaded is not None:
+        try:
+            if result_cache.input_signature(ANALYSIS_INPUT_FILES) == preloaded[0]:
+                return preloaded[1]
+        except OSError:
+            pass
+    return load_and_merge_data(verbose=False)
+
+
+def preload():
+    """
+    Load the merged dataset and compute and render the full correlation
+    response once, before the server starts (or forks its workers), so
+    requests are served from memory.
+
+    Returns:
+        result_cache.CachedResponse: The cached full correlation response
+
+    Raises:
+        OSError: The input files cannot be read
+    """
+    global _preloaded_data
+    signature = result_cache.input_signature(ANALYSIS_INPUT_FILES)
+    _preloaded_data = (signature, load_and_merge_data(verbose=False))
+    entry = _compute_correlation_entry(signature)
+    for stale in (False, True):
+        for encoding in (None,) + responses.available_encodings():
+            entry.render(stale, encoding)
+    return entry
+
+
+def _overloaded_response():
+    """503 for requests shed because too many analyses are already running."""
+    response = jsonify(
+        {'status': 'error', 'message': 'Too many analyses in progress; retry shortly'}
+    )
+    response.status_code = 503
+    response.headers['Retry-After'] = str(OVERLOAD_RETRY_AFTER)
+    return response
+
+
+def _build_correlation_response():
+    """
+    Run the correlation and regression analysis and format it for JSON.
+
+    Returns:
+        dict: Response body with status 'success' and the analysis data
+    """
+    # Load and merge data
+    with metrics.time_stage('load_and_merge_data'):
+        merged_df = _load_merged_data()
+
+    # Compute correlations
+    with metrics.time_stage('compute_correlations'):
+        correlation_results = compute_correlations(merged_df, verbose=False)
+
+    # Perform regression analysis
+    with metrics.time_stage('perform_regression_analysis'):
+        regression_results = perform_regression_analysis(merged_df, verbose=False)
+
+    # Get summary
+    summary = get_correlation_summary(correlation_results)
+    app.logger.info(
+        'Correlation analysis: %d restaurants, %d pairs, %d regressions',
+        len(merged_df),
+        len(correlation_results),
+        len(regression_results),
+    )
+
+    # NumPy values are serialized as they are by the response layer
+    formatted_regressions = {
+        target: {field: results[field] for field in REGRESSION_FIELDS}
+        for target, results in regression_results.items()
+    }
+    formatted_correlations = {
+        key: {field: values[field] for field in CORRELATION_FIELDS}
+        for key, values in correlation_results.items()
+    }
+
+    return {
+        'status': 'success',
+        'data': {
+            'correlations': formatted_correlations,
+            'regressions': formatted_regressions,
+            'summary': summary,
+            'restaurants_analyzed': len(merged_df)
+        }
+    }
+
+
+def _cached_json_response(entry, stale=False):
+    """
+    Serve a cached payload with its ETag, or 304 if the client already has it.
+    The body is compressed when the client accepts it (each encoding is
+    compressed once per cached entry).
+    """
+    body, etag = entry.render(stale)
+    encoding = responses.negotiate_encoding(len(body))
+    if encoding is not None:
+        body, etag = entry.render(stale, encoding)
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, status=200, mimetype='application/json')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate it
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def start_precompute_worker(interval=DEFAULT_POLL_INTERVAL, shared=False):
+    """
+    Start recomputing the correlation analysis in the background whenever its
+    input files change. Not started on import; call once per server process.
+
+    Args:
+        interval (float): Seconds between input checks
+        shared (bool): Coordinate with the other server processes through
+            PRECOMPUTE_DIR so only one of them computes and the rest load its
+            result
+
+    Returns:
+        PrecomputeWorker: The running worker
+    """
+    global _precompute_worker
+    if _precompute_worker is None or not _precompute_worker.running:
+        _precompute_worker = PrecomputeWorker(
+            CORRELATION_CACHE_KEY,
+            ANALYSIS_INPUT_FILES,
+            _build_correlation_response,
+            interval=interval,
+            dumps=responses.dumps,
+            shared_dir=PRECOMPUTE_DIR if shared else None,
+        ).start()
+    return _precompute_worker
+
+
+def stop_precompute_worker():
+    """Stop the background worker, if running."""
+    global _precompute_worker
+    if _precompute_worker is not None:
+        _precompute_worker.stop()
+        _precompute_worker = None
+
+
+@app.route('/api/predict-waste', methods=['POST'])
+def predict_waste():
+    """
+    API endpoint to predict waste for a batch of hypothetical efficiency profiles.
+
+    Uses the models stored by the last 'regression' (or, for the
+    'regularized' model, 'model_selection') job; nothing is refit.
+
+    Request JSON:
+        - profiles: List of {feature: value} objects, or
+        - columns + rows: Feature names and a list of value rows (compact form)
+        - model (optional): 'ols' (default) or 'regularized'
+
+    Returns:
+        JSON response with:
+        - targets: Waste metrics predicted
+        - predictions: Dictionary of target -> list of predictions, in input order
+        - model: Feature order, kind, training fingerprint and creation time
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return (
+            jsonify(
+                {'status': 'error', 'message': 'Request body must be a JSON object'}
+            ),
+            400,
+        )
+
+    # model name -> (stored bundle, job that fits and stores it)
+    model_files = {
+        'ols': (model_store.REGRESSION_MODEL_FILE, 'regression'),
+        'regularized': (model_store.SELECTED_MODEL_FILE, 'model_selection'),
+    }
+    model_name = payload.get('model', 'ols')
+    if model_name not in model_files:
+        return (
+            jsonify({'status': 'error', 'message': f"Unknown model '{model_name}'"}),
+            400,
+        )
+
+    model_file, job = model_files[model_name]
+    try:
+        predictor = model_store.load_predictor(model_file)
+    except FileNotFoundError:
         return jsonify({
             'status': 'error',
-            'message': str(e)
-        }), 500
+            'message': f"No fitted models stored yet; submit a '{job}' job first",
+        }), 404
+
+    try:
+        if 'rows' in payload:
+            columns = payload.get('columns') or predictor.features
+            rows = np.asarray(payload['rows'], dtype=float).reshape(-1, len(columns))
+            profiles = pd.DataFrame(rows, columns=columns)
+        else:
+            profiles = payload.get('profiles')
+            if not isinstance(profiles, list):
+                raise ValueError(
+                    "Provide 'profiles' as a list of objects or 'columns' and 'rows'"
+                )
+        if len(profiles) > MAX_PREDICTION_PROFILES:
+            return (
+                jsonify(
+                    {
+                        'status': 'error',
+                        'message': (
+                            f'At most {MAX_PREDICTION_PROFILES} profiles per request'
+                        ),
+                    }
+                ),
+                413,
+            )
+        predictions = predictor.predict(profiles)
+    except (ValueError, TypeError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    bundle = predictor.bundle
+    # One contiguous row per target serializes straight from the array
+    by_target = np.ascontiguousarray(predictions.T)
+    return (
+        jsonify(
+            {
+                'status': 'success',
+                'data': {
+                    'targets': predictor.targets,
+                    'predictions': {
+                        t: by_target[j] for j, t in enumerate(predictor.targets)
+                    },
+                    'n_profiles': len(predictions),
+                    'model': {
+                        'kind': bundle['kind'],
+                        'features': predictor.features,
+                        'training_fingerprint': bundle['training_fingerprint'],
+                        'created_at': bundle['created_at'],
+                    },
+                },
+            }
+        ),
+        200,
+    )
 
 
 @app.route('/api/health', methods=['GET'])
@@ -109,6 +584,14 @@ def index():
         'version': '1.0.0',
         'endpoints': {
             '/api/efficiency-waste-correlation': 'GET - Correlation and regression analysis results',
+            '/api/predict-waste': 'POST - Predictions from stored regression models',
+            '/api/restaurants': 'GET - Restaurants, by cuisine, zip or name',
+            '/api/restaurants/<restaurant_id>': 'GET - One restaurant by ID',
+            '/api/jobs': 'POST - Submit a long-running analysis as a background job',
+            '/api/jobs/analyses': 'GET - Job analyses and their parameters',
+            '/api/jobs/<job_id>': 'GET - Job status',
+            '/api/jobs/<job_id>/result': 'GET - Result of a finished job',
+            '/api/metrics': 'GET - Request, stage and cache metrics (Prometheus)',
             '/api/health': 'GET - Health check'
         }
     }), 200
@@ -117,5 +600,8 @@ def index():
 if __name__ == '__main__':
     # Run Flask app
     port = int(os.environ.get('PORT', 5000))
+    # With the debug reloader, only the serving child process runs the worker
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_precompute_worker()
     app.run(host='0.0.0.0', port=port, debug=True)
 
@@ -0,0 +1,518 @@
+"""
+Analysis Jobs
+
+Heavy analysis variants (segmented, significance testing, score bootstrap,
+panel, lag, approximate, model selection) and regression model training run
+as jobs in a process pool instead of on the HTTP serving threads. A job is
+identified by a hash of its analysis name, its parameters and the content
+signature of the data files, so identical requests on unchanged data dedupe
+to the same job. Job records and results are kept in data/jobs/ as JSON; a
+result file is written once, in its final response form, and served as is.
+"""
+
+import os
+import re
+import sys
+import json
+import socket
+import hashlib
+import tempfile
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from analysis.correlate_efficiency_waste import (
+    DATA_DIR,
+    DELIVERY_FILE,
+    EFFICIENCY_FILE,
+    EFFICIENCY_METRICS,
+    PERIOD_FREQUENCIES,
+    SEGMENT_COLUMNS,
+    WASTE_FILE,
+    WASTE_METRICS,
+    compute_correlation_significance,
+    compute_segmented_analysis,
+    fit_regression_batch,
+    load_and_merge_data,
+    run_approximate_analysis,
+    run_panel_analysis,
+)
+from analysis.lag_analysis import run_lag_analysis
+from analysis.model_selection import save_selected_models, select_regularized_models
+from analysis.model_store import build_model_bundle, save_models
+from api import result_cache
+from api.responses import dumps
+from efficiency_scoring import WEIGHT_PROFILES, bootstrap_efficiency_scores
+
+JOB_DIR = os.path.join(DATA_DIR, "jobs")
+# Every analysis reads from these files; a change to any of them starts new jobs
+JOB_INPUT_FILES = [EFFICIENCY_FILE, WASTE_FILE, DELIVERY_FILE]
+DEFAULT_JOB_WORKERS = 2
+
+PENDING_STATUSES = ("queued", "running")
+JOB_ID_PATTERN = re.compile(r"[0-9a-f]{24}")
+_HOST = socket.gethostname()
+
+
+def _segmented(segment_col="cuisine"):
+    return compute_segmented_analysis(load_and_merge_data(), segment_col)
+
+
+def _significance(n_permutations=10000, n_bootstrap=2000, confidence=0.95, seed=None):
+    return compute_correlation_significance(
+        load_and_merge_data(), n_permutations, n_bootstrap, confidence, seed=seed
+    )
+
+
+def _bootstrap(
+    n_replicates=1000, confidence=0.95, weights="default", n_jobs=1, seed=None
+):
+    return bootstrap_efficiency_scores(
+        pd.read_csv(DELIVERY_FILE), n_replicates, confidence, weights, n_jobs, seed
+    )
+
+
+def _panel(freq="D", fixed_effects=False):
+    results = run_panel_analysis(freq, fixed_effects)
+    # The panel itself is input data, not a result
+    results.pop("panel")
+    return results
+
+
+def _approximate(fraction=0.1, size=None, n_replicates=20, confidence=0.95, seed=None):
+    return run_approximate_analysis(fraction, size, n_replicates, confidence, seed)
+
+
+def _model_selection(n_folds=5, n_alphas=30, group_col=None, seed=None):
+    df = load_and_merge_data()
+    selection = select_regularized_models(
+        df, n_alphas=n_alphas, n_folds=n_folds, group_col=group_col, seed=seed
+    )
+    # Serve the selected models as the 'regularized' model of /api/predict-waste
+    selection["saved_to"] = save_selected_models(selection["models"], df)
+    return selection
+
+
+def _regression():
+    df = load_and_merge_data()
+    regressions = fit_regression_batch(df)
+    if not regressions:
+        raise ValueError("No regression model could be fitted to the data")
+    # Serve the fitted models as the 'ols' model of /api/predict-waste
+    saved_to = save_models(build_model_bundle(regressions, df))
+    return {"regressions": regressions, "saved_to": saved_to}
+
+
+class JobFailed(Exception):
+    """An analysis raised in the worker; carries when it started."""
+
+    def __init__(self, message, started_at):
+        super().__init__(message, started_at)
+        self.message = message
+        self.started_at = started_at
+
+    def __str__(self):
+        return self.message
+
+
+def _number(kind, minimum=None, maximum=None):
+    """Spec of a numeric parameter with inclusive bounds (None: unbounded)."""
+    return {"type": kind, "min": minimum, "max": maximum}
+
+
+def _one_of(values):
+    """Spec of a string parameter that must be one of values."""
+    return {"type": str, "choices": list(values)}
+
+
+_FLAG = {"type": bool}
+_SEED = _number(int, 0, 2**32 - 1)
+_CONFIDENCE = _number(float, 0.5, 0.999)
+
+# analysis name -> (function run in the worker process, {parameter: spec}).
+# A spec has the parameter 'type' and either 'min'/'max' bounds or the allowed
+# 'choices'. The bounds keep one request from holding a worker process for
+# hours; the choices turn a bad value into a 400 instead of a failed job.
+ANALYSES = {
+    "segmented": (_segmented, {"segment_col": _one_of(SEGMENT_COLUMNS)}),
+    "significance": (
+        _significance,
+        {
+            "n_permutations": _number(int, 1, 100_000),
+            "n_bootstrap": _number(int, 1, 20_000),
+            "confidence": _CONFIDENCE,
+            "seed": _SEED,
+        },
+    ),
+    "bootstrap": (
+        _bootstrap,
+        {
+            "n_replicates": _number(int, 1, 20_000),
+            "confidence": _CONFIDENCE,
+            "weights": _one_of(WEIGHT_PROFILES),
+            "n_jobs": _number(int, 1, os.cpu_count() or 1),
+            "seed": _SEED,
+        },
+    ),
+    "panel": (_panel, {"freq": _one_of(PERIOD_FREQUENCIES), "fixed_effects": _FLAG}),
+    "lag": (
+        run_lag_analysis,
+        {
+            "efficiency_metric": _one_of(EFFICIENCY_METRICS),
+            "waste_metric": _one_of(WASTE_METRICS),
+            "min_lag": _number(int, -90, 90),
+            "max_lag": _number(int, -90, 90),
+            "min_overlap": _number(int, 2, 366),
+        },
+    ),
+    "approximate": (
+        _approximate,
+        {
+            "fraction": _number(float, 0.001, 1.0),
+            "size": _number(int, 1, 10_000_000),
+            "n_replicates": _number(int, 2, 200),
+            "confidence": _CONFIDENCE,
+            "seed": _SEED,
+        },
+    ),
+    "regression": (_regression, {}),
+    "model_selection": (
+        _model_selection,
+        {
+            "n_folds": _number(int, 2, 20),
+            "n_alphas": _number(int, 1, 200),
+            "group_col": _one_of(SEGMENT_COLUMNS),
+            "seed": _SEED,
+        },
+    ),
+}
+
+
+def validate_params(analysis, params, analyses=None):
+    """
+    Check job parameters against an analysis's parameter types, bounds and
+    choices.
+
+    Integers are accepted (and stored) as floats for float parameters, so
+    equivalent requests dedupe to the same job.
+
+    Args:
+        analysis (str): Analysis name
+        params (dict or None): Keyword arguments for the analysis
+        analyses (dict, optional): Registry to validate against; defaults to ANALYSES
+
+    Returns:
+        dict: Normalized parameters
+
+    Raises:
+        ValueError: Unknown analysis or parameter, or a value of the wrong
+            type, out of range or not among the choices
+    """
+    analyses = ANALYSES if analyses is None else analyses
+    if analysis not in analyses:
+        raise ValueError(
+            f"Unknown analysis '{analysis}'; choose from {sorted(analyses)}"
+        )
+    if params is None:
+        params = {}
+    if not isinstance(params, dict):
+        raise ValueError("'params' must be an object")
+
+    spec = analyses[analysis][1]
+    normalized = {}
+    for name, value in params.items():
+        if name not in spec:
+            raise ValueError(
+                f"Unknown parameter '{name}' for {analysis}; expected {sorted(spec)}"
+            )
+        expected = spec[name]["type"]
+        if value is None:
+            normalized[name] = None
+            continue
+        # bool is an int subclass; only accept it for bool parameters
+        if isinstance(value, bool) != (expected is bool):
+            raise ValueError(f"Parameter '{name}' must be {expected.__name__}")
+        if expected is float and isinstance(value, int):
+            value = float(value)
+        if not isinstance(value, expected):
+            raise ValueError(f"Parameter '{name}' must be {expected.__name__}")
+        minimum, maximum = spec[name].get("min"), spec[name].get("max")
+        if (minimum is not None and value < minimum) or (
+            maximum is not None and value > maximum
+        ):
+            raise ValueError(
+                f"Parameter '{name}' must be between {minimum} and {maximum}"
+            )
+        choices = spec[name].get("choices")
+        if choices is not None and value not in choices:
+            raise ValueError(f"Parameter '{name}' must be one of {choices}")
+        normalized[name] = value
+    return normalized
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _write_atomic(path, data):
+    """
+    Replace path with data in one step. The temp file gets a unique name, so
+    server processes writing the same file concurrently never share one.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _write_json(path, obj):
+    _write_atomic(path, json.dumps(obj).encode())
+
+
+def _owner_alive(record):
+    """
+    Whether the server process that submitted a job (which runs it in its own
+    pool) may still be running. Several server processes can share a job
+    directory; only the submitting one tracks the job's future.
+    """
+    pid = record.get("owner_pid")
+    if pid is None:
+        return False
+    if record.get("owner_host") != _HOST:
+        # Another machine sharing the directory; assume it is still working
+        return True
+    if pid == os.getpid() or os.name != "posix":
+        # This process did not submit it (no future), so an earlier one with
+        # the same pid did; without POSIX signals other pids cannot be checked
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _run_job(func, params, job_id, analysis, result_path):
+    """
+    Run one analysis and write its response body (runs in a worker process).
+
+    Returns:
+        dict: started_at and finished_at times
+
+    Raises:
+        JobFailed: The analysis raised (chained to its exception)
+    """
+    started_at = _now()
+    try:
+        data = func(**params)
+    except Exception as e:
+        raise JobFailed(str(e) or type(e).__name__, started_at) from e
+    body = dumps(
+        {"status": "success", "job_id": job_id, "analysis": analysis, "data": data}
+    )
+    _write_atomic(result_path, body)
+    return {"started_at": started_at, "finished_at": _now()}
+
+
+class JobManager:
+    """
+    Submits analysis jobs to a process pool and tracks them on disk.
+
+    Each server process runs the jobs it submitted; records name the owning
+    process so the other processes sharing job_dir report (and deduplicate
+    against) its jobs instead of treating them as interrupted.
+
+    Args:
+        job_dir (str, optional): Directory for job records and results;
+            defaults to JOB_DIR
+        max_workers (int): Worker processes, created on the first submission
+        analyses (dict, optional): Analysis registry; defaults to ANALYSES
+        input_paths (list, optional): Data files jobs depend on; defaults to
+            JOB_INPUT_FILES
+    """
+
+    def __init__(
+        self,
+        job_dir=None,
+        max_workers=DEFAULT_JOB_WORKERS,
+        analyses=None,
+        input_paths=None,
+    ):
+        self.job_dir = job_dir or JOB_DIR
+        self.max_workers = max_workers
+        self.analyses = ANALYSES if analyses is None else analyses
+        self.input_paths = JOB_INPUT_FILES if input_paths is None else input_paths
+        self._lock = threading.Lock()
+        self._records = {}
+        self._futures = {}
+        self._executor = None
+
+    def _record_path(self, job_id):
+        return os.path.join(self.job_dir, f"{job_id}.json")
+
+    def result_path(self, job_id):
+        """Path of a job's result file (exists once the job has succeeded)."""
+        return os.path.join(self.job_dir, f"{job_id}.result.json")
+
+    def job_id(self, analysis, params):
+        """
+        Deterministic job ID for an analysis, its normalized parameters and
+        the current contents of the input files.
+        """
+        signature = result_cache.input_signature(self.input_paths)
+        key = json.dumps(
+            {"analysis": analysis, "params": params, "inputs": signature},
+            sort_keys=True,
+        )
+        return hashlib.sha256(key.encode()).hexdigest()[:24]
+
+    def _load_record(self, job_id):
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        record = self._records.get(job_id)
+        if record is None:
+            try:
+                with open(self._record_path(job_id)) as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self._records[job_id] = record
+        return record
+
+    def _save_record(self, record):
+        os.makedirs(self.job_dir, exist_ok=True)
+        _write_json(self._record_path(record["job_id"]), record)
+        self._records[record["job_id"]] = record
+
+    def submit(self, analysis, params=None):
+        """
+        Start a job, or return the existing one for identical parameters and data.
+
+        A job that failed, was interrupted, or whose result file is gone is
+        started again.
+
+        Returns:
+            tuple: (job record, True if a new job was started)
+
+        Raises:
+            ValueError: Invalid analysis or parameters
+            OSError: Input files cannot be read
+        """
+        params = validate_params(analysis, params, self.analyses)
+        job_id = self.job_id(analysis, params)
+        with self._lock:
+            existing = self._current_record(job_id)
+            if existing is not None and (
+                existing["status"] in PENDING_STATUSES
+                or (
+                    existing["status"] == "succeeded"
+                    and os.path.exists(self.result_path(job_id))
+                )
+            ):
+                return dict(existing), False
+
+            record = {
+                "job_id": job_id,
+                "analysis": analysis,
+                "params": params,
+                "status": "queued",
+                "submitted_at": _now(),
+                "error": None,
+                "owner_host": _HOST,
+                "owner_pid": os.getpid(),
+            }
+            self._save_record(record)
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            future = self._executor.submit(
+                _run_job,
+                self.analyses[analysis][0],
+                params,
+                job_id,
+                analysis,
+                self.result_path(job_id),
+            )
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f, job_id=job_id: self._finish(job_id, f))
+        return dict(record), True
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            record = dict(self._records[job_id])
+            self._futures.pop(job_id, None)
+            if future.cancelled():
+                record.update(status="failed", error="cancelled", finished_at=_now())
+            elif future.exception() is not None:
+                error = future.exception()
+                print(f"Warning: job {job_id} ({record['analysis']}) failed: {error}")
+                traceback.print_exception(type(error), error, error.__traceback__)
+                record.update(
+                    status="failed",
+                    error=str(error) or type(error).__name__,
+                    finished_at=_now(),
+                )
+                if isinstance(error, JobFailed):
+                    record["started_at"] = error.started_at
+            else:
+                record.update(status="succeeded", **future.result())
+            self._save_record(record)
+
+    def _current_record(self, job_id):
+        record = self._load_record(job_id)
+        if record is None or record["status"] not in PENDING_STATUSES:
+            return record
+        future = self._futures.get(job_id)
+        if future is None:
+            # Submitted by another server process: its record on disk is current
+            self._records.pop(job_id, None)
+            record = self._load_record(job_id)
+            if (
+                record is None
+                or record["status"] not in PENDING_STATUSES
+                or _owner_alive(record)
+            ):
+                return record
+            # Left pending by a server process that is gone
+            record = dict(
+                record, status="failed", error="interrupted", finished_at=_now()
+            )
+            self._save_record(record)
+        elif future.running() and record["status"] == "queued":
+            self._save_record(dict(record, status="running"))
+            record = self._records[job_id]
+        return record
+
+    def status(self, job_id):
+        """
+        Current record of a job.
+
+        Returns:
+            dict or None: job_id, analysis, params, status ('queued', 'running',
+                'succeeded' or 'failed'), submitted_at, error, owner_host and
+                owner_pid (the server process running it), finished_at once
+                the job is over and started_at if it ran; None for an unknown job
+        """
+        with self._lock:
+            record = self._current_record(job_id)
+        return dict(record) if record is not None else None
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes, cancelling jobs that have not started."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
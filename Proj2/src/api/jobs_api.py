@@ -0,0 +1,103 @@
+"""
+Job API
+
+Endpoints to submit heavy analyses as background jobs (see api/jobs.py),
+poll their status and fetch their results.
+"""
+
+import os
+from flask import Blueprint, jsonify, request, send_file
+
+from api.jobs import JobManager
+from api.responses import error_response
+
+jobs_bp = Blueprint("jobs_bp", __name__)
+
+# Worker processes are only started by the first submission
+job_manager = JobManager()
+
+
+@jobs_bp.post("/api/jobs")
+def submit_job():
+    """
+    Submit an analysis job.
+
+    Request JSON:
+        - analysis: One of the names listed by GET /api/jobs/analyses
+        - params (optional): Keyword arguments for the analysis
+
+    Returns:
+        202 with the job record (and a Location header for polling); identical
+        submissions on unchanged data return the same job with
+        'deduplicated': true
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or "analysis" not in payload:
+        return error_response(
+            "Request body must be a JSON object with an 'analysis' name", 400
+        )
+    try:
+        record, created = job_manager.submit(payload["analysis"], payload.get("params"))
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except OSError as e:
+        return error_response(f"Input data unavailable: {e}", 503)
+
+    response = jsonify(
+        {"status": "success", "data": record, "deduplicated": not created}
+    )
+    response.status_code = 202
+    response.headers["Location"] = f"/api/jobs/{record['job_id']}"
+    return response
+
+
+@jobs_bp.get("/api/jobs/analyses")
+def list_analyses():
+    """Submittable analyses with their parameter types, bounds and choices."""
+    return (
+        jsonify(
+            {
+                "status": "success",
+                "data": {
+                    name: {
+                        param: {**param_spec, "type": param_spec["type"].__name__}
+                        for param, param_spec in spec.items()
+                    }
+                    for name, (_, spec) in job_manager.analyses.items()
+                },
+            }
+        ),
+        200,
+    )
+
+
+@jobs_bp.get("/api/jobs/<job_id>")
+def job_status(job_id):
+    """Status of a job: queued, running, succeeded or failed."""
+    record = job_manager.status(job_id)
+    if record is None:
+        return error_response(f"Unknown job '{job_id}'", 404)
+    return jsonify({"status": "success", "data": record}), 200
+
+
+@jobs_bp.get("/api/jobs/<job_id>/result")
+def job_result(job_id):
+    """
+    Result of a finished job, served from disk.
+
+    Returns:
+        200 with the result, 202 with the job record while it is pending,
+        409 if the job failed and 404 for an unknown job
+    """
+    record = job_manager.status(job_id)
+    if record is None:
+        return error_response(f"Unknown job '{job_id}'", 404)
+    if record["status"] == "failed":
+        return (
+            jsonify({"status": "error", "message": record["error"], "data": record}),
+            409,
+        )
+    result_path = job_manager.result_path(job_id)
+    if record["status"] != "succeeded" or not os.path.exists(result_path):
+        return jsonify({"status": "pending", "data": record}), 202
+    return send_file(result_path, mimetype="application/json", conditional=True)
@@ -0,0 +1,293 @@
+"""
+API Metrics
+
+In-process request, pipeline-stage and cache metrics, exposed at /api/metrics
+in the Prometheus text exposition format. Recording a value is a dictionary
+lookup and a few additions under a per-metric lock; text is only built when
+the endpoint is scraped. Metrics are per server process.
+"""
+
+import os
+import sys
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+from flask import g, request
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """
+    Monotonic count per label combination.
+
+    Args:
+        name (str): Metric name; '_total' is appended in the exposition
+        documentation (str): HELP text
+        labelnames (tuple): Label names, in the order values are passed
+    """
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        with self._lock:
+            return self._values.get(labelvalues, 0)
+
+    def collect(self):
+        """Exposition lines for this metric."""
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [
+            f"# HELP {self.name}_total {self.documentation}",
+            f"# TYPE {self.name}_total counter",
+        ]
+        for labelvalues, value in values:
+            lines.append(
+                f"{self.name}_total{_format_labels(self.labelnames, labelvalues)} "
+                f"{_format_value(value)}"
+            )
+        return lines
+
+
+class Histogram:
+    """
+    Distribution of observed values per label combination.
+
+    Args:
+        name (str): Metric name
+        documentation (str): HELP text
+        labelnames (tuple): Label names, in the order values are passed
+        buckets (tuple): Increasing bucket upper bounds; +Inf is implied
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, *labelvalues):
+        with self._lock:
+            state = self._values.get(labelvalues)
+            return sum(state[0]) if state is not None else 0
+
+    @contextmanager
+    def time(self, *labelvalues):
+        """Observe the wall time of the with block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def collect(self):
+        """Exposition lines for this metric."""
+        with self._lock:
+            values = sorted(
+                (labels, (list(counts), total))
+                for labels, (counts, total) in self._values.items()
+            )
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        names = self.labelnames + ("le",)
+        for labelvalues, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    names, labelvalues + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+REQUEST_COUNT = Counter(
+    "http_requests",
+    "HTTP requests by route, method and status.",
+    ("route", "method", "status"),
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route, method and status.",
+    ("route", "method", "status"),
+)
+STAGE_LATENCY = Histogram(
+    "analysis_stage_duration_seconds",
+    "Time spent in analysis pipeline stages.",
+    ("stage",),
+)
+CACHE_REQUESTS = Counter(
+    "response_cache_requests",
+    "Response cache lookups by cache and result " "('hit', 'stale' or 'miss').",
+    ("cache", "result"),
+)
+REGISTRY = [REQUEST_COUNT, REQUEST_LATENCY, STAGE_LATENCY, CACHE_REQUESTS]
+
+
+def time_stage(stage):
+    """Context manager recording the duration of a pipeline stage."""
+    return STAGE_LATENCY.time(stage)
+
+
+def process_memory():
+    """
+    Memory of this process in bytes.
+
+    Returns:
+        dict: 'resident' and 'virtual' (from /proc) and 'max_resident'
+            (peak resident size, from getrusage); each None where unavailable
+    """
+    resident = virtual = None
+    try:
+        with open("/proc/self/statm") as f:
+            pages = f.read().split()
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        virtual, resident = int(pages[0]) * page_size, int(pages[1]) * page_size
+    except (OSError, ValueError, IndexError):
+        pass
+    max_resident = None
+    if resource is not None:
+        max_resident = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        if sys.platform != "darwin":
+            max_resident *= 1024
+    return {"resident": resident, "virtual": virtual, "max_resident": max_resident}
+
+
+def _process_lines():
+    memory = process_memory()
+    lines = []
+    for key, name, documentation in (
+        ("resident", "process_resident_memory_bytes", "Resident memory size in bytes."),
+        ("virtual", "process_virtual_memory_bytes", "Virtual memory size in bytes."),
+        (
+            "max_resident",
+            "process_max_resident_memory_bytes",
+            "Peak resident memory size in bytes.",
+        ),
+    ):
+        if memory[key] is not None:
+            lines += [
+                f"# HELP {name} {documentation}",
+                f"# TYPE {name} gauge",
+                f"{name} {memory[key]}",
+            ]
+    return lines
+
+
+def render(registry=None):
+    """
+    All metrics in the Prometheus text exposition format.
+
+    Args:
+        registry (list, optional): Metrics to render; defaults to REGISTRY
+
+    Returns:
+        str: Exposition text
+    """
+    lines = []
+    for metric in REGISTRY if registry is None else registry:
+        lines += metric.collect()
+    lines += _process_lines()
+    return "\n".join(lines) + "\n"
+
+
+def _start_timer():
+    g._metrics_start = time.perf_counter()
+
+
+def _record_request(response):
+    start = g.pop("_metrics_start", None)
+    if start is not None:
+        # Route templates keep the label set bounded
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        labels = (route, request.method, str(response.status_code))
+        REQUEST_COUNT.inc(*labels)
+        REQUEST_LATENCY.observe(time.perf_counter() - start, *labels)
+    return response
+
+
+def _metrics_endpoint():
+    return render(), 200, {"Content-Type": CONTENT_TYPE}
+
+
+def init_app(app):
+    """
+    Record every request of app and serve the metrics at /api/metrics.
+
+    Call before registering other after_request hooks (such as
+    responses.init_app) so their time is included in the request latency.
+    """
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule("/api/metrics", "metrics", _metrics_endpoint, methods=["GET"])
+    return app
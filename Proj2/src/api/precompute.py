@@ -0,0 +1,226 @@
+"""
+Background Precompute Worker
+
+Recomputes an analysis payload off the request path. The worker polls the
+signature of its input files (see result_cache.input_signature; a poll is one
+os.stat() per file) and, when the contents change, runs the analysis and
+swaps the new payload into the response cache in one step. Requests keep
+being served the last good payload meanwhile, marked stale. A failed
+recomputation keeps the previous payload.
+
+With a shared directory, server processes that each run a worker elect one
+leader through a lock file: only the leader computes, and it publishes each
+payload to a file the other processes load instead of computing it again.
+When the leader exits its lock is released and the next worker to poll takes
+over.
+"""
+
+import os
+import tempfile
+import threading
+import traceback
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from api import responses, result_cache
+
+# Seconds between checks of the input files
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+class PrecomputeWorker:
+    """
+    Keeps one cached payload in step with its input files.
+
+    Args:
+        name (str): Result cache name the payload is stored under
+        input_paths (list): Files the payload depends on
+        compute (callable): Returns the JSON-serializable payload
+        interval (float): Seconds between input checks
+        dumps (callable): Serializer used to render the payload
+        shared_dir (str, optional): Directory for the leader lock and the
+            published payload; by default every worker computes on its own
+    """
+
+    def __init__(
+        self,
+        name,
+        input_paths,
+        compute,
+        interval=DEFAULT_POLL_INTERVAL,
+        dumps=responses.dumps,
+        shared_dir=None,
+    ):
+        self.name = name
+        self.input_paths = list(input_paths)
+        self.compute = compute
+        self.interval = interval
+        self.dumps = dumps
+        self.shared_dir = shared_dir
+        self.last_error = None
+        self._lock_fd = None
+        # (mtime_ns, size, signature) of a published file already found not to match
+        self._rejected = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def _shared_path(self):
+        return os.path.join(self.shared_dir, f"{self.name}.json")
+
+    @property
+    def is_leader(self):
+        """Whether this worker computes the payload (always without a shared dir)."""
+        return self.shared_dir is None or self._lock_fd is not None or fcntl is None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def refresh(self):
+        """
+        Recompute the payload if the inputs changed since the cached one.
+
+        Returns:
+            bool: True if a new payload was stored
+        """
+        try:
+            signature = result_cache.input_signature(self.input_paths)
+        except OSError as e:
+            # Inputs are being replaced or are missing; keep the last good payload
+            self.last_error = str(e)
+            return False
+        if result_cache.get(self.name, signature) is not None:
+            return False
+        if self.shared_dir is not None:
+            if self._load_shared(signature):
+                self.last_error = None
+                return True
+            if not self._acquire_leadership():
+                # Another process computes it; serve the last payload until it is
+                # published
+                return False
+        try:
+            payload = self.compute()
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Warning: background recompute of {self.name} failed: {e}")
+            traceback.print_exc()
+            return False
+        # Stored under the signature read before computing: if the inputs changed
+        # meanwhile, the next check recomputes again
+        entry = result_cache.put(self.name, signature, payload, dumps=self.dumps)
+        if self.shared_dir is not None:
+            self._publish(entry)
+        self.last_error = None
+        return True
+
+    def _acquire_leadership(self):
+        """
+        Take the leader lock without blocking. The lock is held until stop()
+        or process exit; fcntl.lockf locks belong to the process, so children
+        forked later (e.g. job pools) do not inherit it.
+
+        Returns:
+            bool: Whether this process is the leader
+        """
+        if self.is_leader:
+            return True
+        os.makedirs(self.shared_dir, exist_ok=True)
+        fd = os.open(
+            os.path.join(self.shared_dir, f"{self.name}.lock"),
+            os.O_RDWR | os.O_CREAT,
+            0o644,
+        )
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _release_leadership(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _load_shared(self, signature):
+        """
+        Load the published payload if it was computed from signature.
+
+        Returns:
+            bool: True if it was stored in the result cache
+        """
+        try:
+            stat = os.stat(self._shared_path)
+            if (stat.st_mtime_ns, stat.st_size, signature) == self._rejected:
+                return False
+            with open(self._shared_path, "rb") as f:
+                published = responses.loads(f.read())
+        except (OSError, ValueError):
+            return False
+        if tuple(published.get("signature") or ()) != signature:
+            # Not republished yet; skip re-reading it until it changes
+            self._rejected = (stat.st_mtime_ns, stat.st_size, signature)
+            return False
+        result_cache.put(
+            self.name,
+            signature,
+            published["payload"],
+            dumps=self.dumps,
+            computed_at=published["computed_at"],
+        )
+        return True
+
+    def _publish(self, entry):
+        """Write entry to the shared file in one step (temp file, then rename)."""
+        body = responses.dumps(
+            {
+                "signature": list(entry.signature),
+                "computed_at": entry.computed_at,
+                "payload": entry.payload,
+            }
+        )
+        try:
+            os.makedirs(self.shared_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.shared_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(body)
+                os.chmod(tmp_path, 0o644)  # mkstemp default is 0600
+                os.replace(tmp_path, self._shared_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            # The other processes then compute it themselves on their next miss
+            print(f"Warning: could not publish {self.name}: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the worker thread (a daemon); the first check runs immediately."""
+        if self.running:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"precompute-{self.name}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop the worker thread, wait for it to exit and give up leadership."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self._release_leadership()
@@ -0,0 +1,217 @@
+"""
+Shared Response Layer
+
+JSON encoding and compression for every blueprint of the API. init_app()
+installs a JSON provider that serializes NumPy and pandas values natively
+(with orjson when it is installed, the standard library otherwise), and an
+after_request hook that compresses JSON and text responses above a size
+threshold with the best encoding the client accepts (brotli when the brotli
+package is installed, then gzip). Cached responses compress once per encoding
+(see result_cache.CachedResponse.render) and pass through the hook untouched.
+"""
+
+import gzip
+import json
+import math
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+from flask import jsonify, request
+from flask.json.provider import JSONProvider
+
+from api import metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = 1024
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/plain")
+# Compression levels for per-request bodies and for bodies compressed once and cached
+GZIP_LEVEL, GZIP_CACHED_LEVEL = 6, 9
+BROTLI_QUALITY, BROTLI_CACHED_QUALITY = 5, 11
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def available_encodings():
+    """Content encodings this server can produce, in order of preference."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def to_jsonable(obj):
+    """
+    Convert analysis output to plain JSON types.
+
+    NumPy scalars and arrays become Python numbers and lists, NaN, infinity
+    and missing timestamps become None, timestamps become ISO strings and
+    DataFrames become {'index', 'columns', 'data'} (pandas 'split' layout).
+    """
+    if isinstance(obj, dict):
+        return {str(to_jsonable(k)): to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [to_jsonable(v) for v in obj]
+    if isinstance(obj, pd.DataFrame):
+        return to_jsonable(obj.to_dict(orient="split"))
+    if isinstance(obj, (pd.Series, pd.Index, np.ndarray)):
+        return to_jsonable(obj.tolist())
+    if isinstance(obj, np.generic):
+        return to_jsonable(obj.item())
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return obj
+
+
+def _default(obj):
+    """orjson fallback for types it does not serialize itself."""
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient="split")
+    if isinstance(obj, (pd.Series, pd.Index, np.ndarray)):
+        # Non-contiguous and object arrays end up here
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, set):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """
+    Serialize to JSON bytes; NaN and infinity are written as null.
+
+    Args:
+        obj: Dicts, lists, numbers, strings and NumPy/pandas values
+
+    Returns:
+        bytes: UTF-8 JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. NumPy scalars as dict keys; convert and retry
+            return orjson.dumps(to_jsonable(obj), option=_ORJSON_OPTIONS)
+    return json.dumps(to_jsonable(obj), allow_nan=False).encode()
+
+
+def loads(data):
+    """Parse JSON text or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def error_response(message, status):
+    """
+    JSON error body in the API's usual shape.
+
+    Args:
+        message (str): What went wrong
+        status (int): HTTP status code
+
+    Returns:
+        tuple: (response, status) for a Flask view to return
+    """
+    return jsonify({"status": "error", "message": message}), status
+
+
+def compress(body, encoding, cached=False):
+    """
+    Compress a body with 'gzip' or 'br'.
+
+    Args:
+        body (bytes): Uncompressed body
+        encoding (str): Content encoding from available_encodings()
+        cached (bool): Spend more CPU for a smaller result, for bodies that
+            are compressed once and served many times
+
+    Returns:
+        bytes: Compressed body
+    """
+    if encoding == "br":
+        return brotli.compress(
+            body, quality=BROTLI_CACHED_QUALITY if cached else BROTLI_QUALITY
+        )
+    if encoding == "gzip":
+        # mtime=0 keeps the output deterministic for a given body
+        return gzip.compress(
+            body, compresslevel=GZIP_CACHED_LEVEL if cached else GZIP_LEVEL, mtime=0
+        )
+    raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+
+def negotiate_encoding(size):
+    """
+    Content encoding for a response body of the given size in the current request.
+
+    Returns:
+        str or None: 'br', 'gzip', or None to send the body uncompressed
+    """
+    if size < COMPRESSION_MIN_BYTES:
+        return None
+    accepted = request.accept_encodings
+    best = max(available_encodings(), key=lambda encoding: accepted[encoding])
+    return best if accepted[best] > 0 else None
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by dumps() and loads()."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        with metrics.time_stage("serialization"):
+            body = dumps(obj)
+        return self._app.response_class(body, mimetype="application/json")
+
+
+def _compress_response(response):
+    """after_request hook: compress eligible responses not encoded yet."""
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.direct_passthrough:
+        return response
+    response.vary.add("Accept-Encoding")
+    if response.status_code != 200 or "Content-Encoding" in response.headers:
+        return response
+    body = response.get_data()
+    encoding = negotiate_encoding(len(body))
+    if encoding is None:
+        return response
+    with metrics.time_stage("compression"):
+        response.set_data(compress(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        # Each encoding is a different representation
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+    return response
+
+
+def init_app(app):
+    """
+    Use the fast JSON provider and response compression for every route of app.
+    """
+    app.json = FastJSONProvider(app)
+    app.after_request(_compress_response)
+    return app
@@ -0,0 +1,278 @@
+"""
+In-Memory Restaurant Directory
+
+Joins the restaurant metadata with efficiency scores, delivery metrics,
+customer feedback aggregates and rescue meals into one record per restaurant,
+built once and indexed by ID, name, cuisine and zip code. Lookups are
+dictionary reads on an immutable snapshot. The source files are checked at
+most every refresh_interval seconds (one os.stat() per file, see
+result_cache.file_fingerprint) and the snapshot is rebuilt and swapped in when
+any of them changed; if a rebuild fails the previous snapshot is kept.
+"""
+
+import os
+import sys
+import time
+import threading
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from analysis.correlate_efficiency_waste import DATA_DIR, EFFICIENCY_FILE
+from api import result_cache
+from api.responses import to_jsonable
+
+METADATA_FILE = os.path.join(DATA_DIR, "Restaurant_Metadata.csv")
+DELIVERY_METRICS_FILE = os.path.join(DATA_DIR, "vendor_delivery_metrics.csv")
+FEEDBACK_FILE = os.path.join(DATA_DIR, "Customer_Feedback.csv")
+RESCUE_MEALS_FILE = os.path.join(DATA_DIR, "rescue_meals.csv")
+
+# Seconds between checks of the source files
+DEFAULT_REFRESH_INTERVAL = 2.0
+
+DELIVERY_COLUMNS = [
+    "avg_delivery_time",
+    "on_time_rate",
+    "avg_distance",
+    "deliveries_per_day",
+]
+RESCUE_MEAL_COLUMNS = [
+    "meal_name",
+    "original_price",
+    "rescue_price",
+    "quantity",
+    "expires_in",
+]
+
+
+def _read_optional_csv(path, columns):
+    """Read a CSV, or an empty frame with the given columns if it does not exist."""
+    if not os.path.exists(path):
+        print(f"Warning: {path} not found; restaurants will have no data from it")
+        return pd.DataFrame(columns=columns)
+    return pd.read_csv(path)
+
+
+def _feedback_aggregates(feedback):
+    """
+    Per-restaurant rating aggregates.
+
+    A review's rating is the mean of its delivery and food quality ratings;
+    reviews with neither rating are not counted (as on the dashboard).
+
+    Returns:
+        pd.DataFrame: Indexed by restaurant with rating, review_count,
+            avg_delivery_rating and avg_food_quality_rating
+    """
+    delivery = pd.to_numeric(feedback["delivery_rating"], errors="coerce").fillna(0)
+    food = pd.to_numeric(feedback["food_quality_rating"], errors="coerce").fillna(0)
+    rated = (delivery > 0) | (food > 0)
+    reviews = pd.DataFrame(
+        {
+            "restaurant": feedback["restaurant"],
+            "rating": (delivery + food) / 2,
+            "avg_delivery_rating": delivery,
+            "avg_food_quality_rating": food,
+        }
+    )[rated]
+    grouped = reviews.groupby("restaurant")
+    aggregates = grouped.mean().round(2)
+    aggregates["review_count"] = grouped.size()
+    return aggregates
+
+
+def build_restaurant_records(
+    metadata_file=METADATA_FILE,
+    efficiency_file=EFFICIENCY_FILE,
+    delivery_metrics_file=DELIVERY_METRICS_FILE,
+    feedback_file=FEEDBACK_FILE,
+    rescue_meals_file=RESCUE_MEALS_FILE,
+):
+    """
+    Join the restaurant sources into one record per restaurant.
+
+    Restaurants come from the metadata file, in its order; IDs are 1-based
+    positions in it, as on the dashboard. Values missing from the other
+    sources are None (and an empty rescue meal list).
+
+    Returns:
+        list: Restaurant dicts with id, name, cuisine, zip_code, capacity,
+            seating_type, avg_daily_orders, has_sustainability_program,
+            efficiency_score, delivery metrics, rating aggregates and
+            rescue_meals
+
+    Raises:
+        OSError: The metadata file cannot be read
+    """
+    # Zip codes stay text: read as numbers, one blank would turn them all into
+    # floats ('27606.0')
+    metadata = pd.read_csv(metadata_file, dtype={"zip_code": str})
+    efficiency = _read_optional_csv(efficiency_file, ["restaurant", "efficiency_score"])
+    delivery = _read_optional_csv(
+        delivery_metrics_file, ["restaurant"] + DELIVERY_COLUMNS
+    )
+    feedback = _read_optional_csv(
+        feedback_file, ["restaurant", "delivery_rating", "food_quality_rating"]
+    )
+    rescue_meals = _read_optional_csv(
+        rescue_meals_file, ["restaurant"] + RESCUE_MEAL_COLUMNS
+    )
+
+    restaurants = metadata.rename(columns={"restaurant": "name"})
+    restaurants.insert(0, "id", range(1, len(restaurants) + 1))
+    restaurants = (
+        restaurants.join(
+            efficiency.drop_duplicates("restaurant").set_index("restaurant")[
+                "efficiency_score"
+            ],
+            on="name",
+        )
+        .join(
+            delivery.drop_duplicates("restaurant")
+            .set_index("restaurant")
+            .reindex(columns=DELIVERY_COLUMNS),
+            on="name",
+        )
+        .join(_feedback_aggregates(feedback), on="name")
+    )
+    restaurants["review_count"] = restaurants["review_count"].fillna(0).astype(int)
+
+    meals = rescue_meals.rename(columns={"meal_name": "name"})
+    meals_by_restaurant = {
+        restaurant: group.drop(columns="restaurant").to_dict(orient="records")
+        for restaurant, group in meals.groupby("restaurant", sort=False)
+    }
+    records = to_jsonable(restaurants.to_dict(orient="records"))
+    for record in records:
+        record["rescue_meals"] = to_jsonable(
+            meals_by_restaurant.get(record["name"], [])
+        )
+    return records
+
+
+def _key(value):
+    """Normalized index key for names and cuisines."""
+    return str(value).strip().casefold()
+
+
+class _Snapshot:
+    """Restaurant records and their indexes; never modified once built."""
+
+    def __init__(self, signature, records):
+        self.signature = signature
+        self.records = tuple(records)
+        self.by_id = {record["id"]: record for record in self.records}
+        self.by_name = {}
+        # (cuisine key or None, zip code or None) -> records, for every filter
+        # combination
+        self.by_filter = {}
+        for record in self.records:
+            self.by_name.setdefault(_key(record["name"]), record)
+            cuisine, zip_code = _key(record["cuisine"]), record["zip_code"]
+            keys = [(None, None), (cuisine, None)]
+            if zip_code is not None:
+                keys += [(None, zip_code), (cuisine, zip_code)]
+            for key in keys:
+                self.by_filter.setdefault(key, []).append(record)
+        self.by_filter = {
+            key: tuple(records) for key, records in self.by_filter.items()
+        }
+
+
+class RestaurantStore:
+    """
+    Restaurant directory kept in step with its source files.
+
+    Args:
+        paths (dict, optional): build_restaurant_records() file arguments;
+            defaults to the files in data/
+        refresh_interval (float): Least seconds between source file checks
+    """
+
+    def __init__(self, paths=None, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        self.paths = dict(paths or {})
+        self.refresh_interval = refresh_interval
+        self.last_error = None
+        self._snapshot = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _source_files(self):
+        defaults = {
+            "metadata_file": METADATA_FILE,
+            "efficiency_file": EFFICIENCY_FILE,
+            "delivery_metrics_file": DELIVERY_METRICS_FILE,
+            "feedback_file": FEEDBACK_FILE,
+            "rescue_meals_file": RESCUE_MEALS_FILE,
+        }
+        return [self.paths.get(name, path) for name, path in defaults.items()]
+
+    def _signature(self):
+        # Optional sources may be missing; a file appearing is a change too
+        return tuple(
+            result_cache.file_fingerprint(path) if os.path.exists(path) else None
+            for path in self._source_files()
+        )
+
+    def refresh(self):
+        """
+        Rebuild the snapshot if any source file changed since it was built.
+
+        Returns:
+            bool: True if a new snapshot was built
+
+        Raises:
+            Exception: The rebuild failed and there is no earlier snapshot
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                signature = self._signature()
+                if self._snapshot is not None and self._snapshot.signature == signature:
+                    return False
+                self._snapshot = _Snapshot(
+                    signature, build_restaurant_records(**self.paths)
+                )
+            except Exception as e:
+                self.last_error = str(e)
+                if self._snapshot is None:
+                    raise
+                print(f"Warning: could not refresh the restaurant directory: {e}")
+                return False
+            self.last_error = None
+            return True
+
+    def snapshot(self):
+        """
+        The current snapshot, checking the source files first if the last
+        check is older than refresh_interval or no build has succeeded yet.
+        """
+        checked_at = self._checked_at
+        if (
+            self._snapshot is None
+            or checked_at is None
+            or time.monotonic() - checked_at >= self.refresh_interval
+        ):
+            self.refresh()
+        return self._snapshot
+
+    def get(self, restaurant_id):
+        """Restaurant record by ID, or None."""
+        return self.snapshot().by_id.get(restaurant_id)
+
+    def find(self, name):
+        """Restaurant record by name (case-insensitive), or None."""
+        return self.snapshot().by_name.get(_key(name))
+
+    def filter(self, cuisine=None, zip_code=None):
+        """
+        Restaurants matching a cuisine (case-insensitive) and/or zip code.
+
+        Returns:
+            tuple: Matching records in directory order; all of them without filters
+        """
+        key = (
+            _key(cuisine) if cuisine else None,
+            str(zip_code).strip() if zip_code else None,
+        )
+        return self.snapshot().by_filter.get(key, ())
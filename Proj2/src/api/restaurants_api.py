@@ -0,0 +1,61 @@
+"""
+Restaurant Directory API
+
+Restaurant records joined from the metadata, efficiency, delivery, feedback
+and rescue meal files, served from an in-memory store (see
+api/restaurant_store.py) instead of re-reading the CSVs on each request.
+"""
+
+from flask import Blueprint, jsonify, request
+
+from api.restaurant_store import RestaurantStore
+from api.responses import error_response
+
+restaurants_bp = Blueprint("restaurants_bp", __name__)
+
+# Built on first use (or by api.wsgi.create_app before the workers fork)
+restaurant_store = RestaurantStore()
+
+# Unreadable source files (OSError) and malformed ones, e.g. a missing column
+# (KeyError) or a CSV pandas cannot parse (ValueError)
+DATA_ERRORS = (OSError, KeyError, ValueError)
+
+
+@restaurants_bp.get("/api/restaurants")
+def list_restaurants():
+    """
+    List restaurants.
+
+    Query parameters (all optional):
+        - cuisine: Only restaurants with this cuisine (case-insensitive)
+        - zip: Only restaurants in this zip code
+        - name: The restaurant with this name (case-insensitive); 404 if unknown
+
+    Returns:
+        JSON response with the matching restaurant records and their count
+    """
+    try:
+        name = request.args.get("name")
+        if name is not None:
+            record = restaurant_store.find(name)
+            if record is None:
+                return error_response(f"Unknown restaurant '{name}'", 404)
+            return jsonify({"status": "success", "data": record}), 200
+        records = restaurant_store.filter(
+            request.args.get("cuisine"), request.args.get("zip")
+        )
+    except DATA_ERRORS as e:
+        return error_response(f"Restaurant data unavailable: {e}", 503)
+    return jsonify({"status": "success", "count": len(records), "data": records}), 200
+
+
+@restaurants_bp.get("/api/restaurants/<int:restaurant_id>")
+def get_restaurant(restaurant_id):
+    """One restaurant by ID."""
+    try:
+        record = restaurant_store.get(restaurant_id)
+    except DATA_ERRORS as e:
+        return error_response(f"Restaurant data unavailable: {e}", 503)
+    if record is None:
+        return error_response(f"Unknown restaurant {restaurant_id}", 404)
+    return jsonify({"status": "success", "data": record}), 200
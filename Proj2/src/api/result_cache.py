@@ -0,0 +1,165 @@
+"""
+File-Change-Aware Response Cache
+
+Analysis endpoints are pure functions of a few input files. Their serialized
+responses are cached under a signature built from the content hashes of those
+files. A file is only re-hashed when its mtime or size changes, so checking a
+cached response costs one os.stat() per input. Each rendered body carries a
+strong ETag derived from its bytes for conditional requests.
+"""
+
+import os
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+from api import metrics, responses
+
+# path -> ((mtime_ns, size), sha256 hex digest)
+_file_hashes = {}
+# cache name -> CachedResponse, oldest first
+_entries = {}
+# Most responses kept; query variants of an endpoint each take an entry
+MAX_ENTRIES = 256
+_lock = threading.Lock()
+
+
+class CachedResponse:
+    """
+    A computed response payload and the input signature it was computed from.
+
+    The payload is rendered to bytes together with its 'computed_at' time and
+    a 'stale' flag, and optionally compressed; each rendering and its ETag are
+    built once and reused.
+    """
+
+    def __init__(self, signature, payload, computed_at=None, dumps=responses.dumps):
+        self.signature = signature
+        self.payload = payload
+        self.computed_at = computed_at or datetime.now(timezone.utc).isoformat()
+        self._dumps = dumps
+        self._rendered = {}
+
+    def render(self, stale=False, encoding=None):
+        """
+        Serialized payload plus metadata.
+
+        Args:
+            stale (bool): Whether the inputs have changed since it was computed
+            encoding (str, optional): Content encoding ('gzip' or 'br') to
+                compress the body with
+
+        Returns:
+            tuple: (body bytes, strong ETag value); compressed bodies get the
+                ETag of the uncompressed body suffixed with the encoding
+        """
+        rendered = self._rendered.get((stale, encoding))
+        if rendered is None:
+            if encoding is None:
+                with metrics.time_stage("serialization"):
+                    body = self._dumps(
+                        {
+                            **self.payload,
+                            "computed_at": self.computed_at,
+                            "stale": stale,
+                        }
+                    )
+                body = body.encode() if isinstance(body, str) else body
+                rendered = (body, hashlib.sha256(body).hexdigest()[:32])
+            else:
+                body, etag = self.render(stale)
+                with metrics.time_stage("compression"):
+                    body = responses.compress(body, encoding, cached=True)
+                rendered = (body, f"{etag}-{encoding}")
+            self._rendered[(stale, encoding)] = rendered
+        return rendered
+
+
+def file_fingerprint(path):
+    """
+    SHA-256 of a file's contents, recomputed only when its mtime or size changes.
+
+    Args:
+        path (str): File to fingerprint
+
+    Returns:
+        str: Hex digest
+
+    Raises:
+        OSError: The file cannot be read
+    """
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _file_hashes.get(path)
+    if cached is None or cached[0] != key:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        cached = (key, digest.hexdigest())
+        _file_hashes[path] = cached
+    return cached[1]
+
+
+def input_signature(paths):
+    """
+    Signature of a set of input files; it changes only when their contents do.
+
+    Args:
+        paths (list): Input files
+
+    Returns:
+        tuple: One content hash per path
+    """
+    return tuple(file_fingerprint(path) for path in paths)
+
+
+def get(name, signature=None):
+    """
+    Cached response for name.
+
+    Args:
+        name (str): Cache name
+        signature (tuple, optional): Only return the entry if it was computed
+            from this signature; by default return the latest entry
+
+    Returns:
+        CachedResponse or None
+    """
+    entry = _entries.get(name)
+    if entry is not None and (signature is None or entry.signature == signature):
+        return entry
+    return None
+
+
+def put(name, signature, payload, dumps=responses.dumps, computed_at=None):
+    """
+    Store a response payload computed from the given signature, replacing the
+    previous entry in one step. Beyond MAX_ENTRIES the least recently stored
+    entry is dropped.
+
+    Args:
+        name (str): Cache name
+        signature (tuple): Input signature the payload was computed from
+        payload (dict): JSON-serializable response body
+        dumps (callable): Serializer used to render the payload
+        computed_at (str, optional): When the payload was computed (ISO 8601);
+            defaults to now
+
+    Returns:
+        CachedResponse: The stored entry
+    """
+    entry = CachedResponse(signature, payload, computed_at=computed_at, dumps=dumps)
+    with _lock:
+        _entries.pop(name, None)
+        _entries[name] = entry
+        while len(_entries) > MAX_ENTRIES:
+            del _entries[next(iter(_entries))]
+    return entry
+
+
+def clear():
+    """Drop all cached responses and file hashes."""
+    with _lock:
+        _entries.clear()
+        _file_hashes.clear()
@@ -0,0 +1,89 @@
+"""
+Single-Flight Request Coalescing
+
+Concurrent requests for the same expensive result share one computation: the
+first caller for a key runs it and every caller that arrives while it is in
+flight waits for and receives the same result (or exception). The number of
+distinct computations running at once is bounded; a new computation beyond
+the bound is refused with Overloaded so the API can shed load with a 503
+instead of queueing threads behind a saturated CPU.
+"""
+
+import threading
+
+
+class Overloaded(Exception):
+    """Raised when starting a computation would exceed the concurrency bound."""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls by key.
+
+    Args:
+        max_concurrent (int, optional): Most distinct computations in flight at
+            once; None for no bound
+    """
+
+    def __init__(self, max_concurrent=None):
+        self.max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self):
+        """Number of computations currently running."""
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key, fn):
+        """
+        Run fn() for key, or wait for the identical call already in flight.
+
+        Args:
+            key (hashable): Identifies identical requests
+            fn (callable): Computes the result
+
+        Returns:
+            The result of fn(), shared by every caller for key
+
+        Raises:
+            Overloaded: No call for key is in flight and max_concurrent are
+                already running
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                if (
+                    self.max_concurrent is not None
+                    and len(self._calls) >= self.max_concurrent
+                ):
+                    raise Overloaded(
+                        f"{len(self._calls)} computations already in flight"
+                    )
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
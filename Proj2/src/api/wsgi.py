@@ -0,0 +1,59 @@
+"""
+Production WSGI Entry Point
+
+create_app() prepares the API for a multi-process server. The merged dataset,
+the rendered correlation response (plain and compressed) and the restaurant
+directory are loaded once, in the parent process, and then frozen out of the
+garbage collector's reach (gc.freeze) so forked workers share those pages
+copy-on-write instead of each one re-reading the CSVs or dirtying the pages
+during collections.
+
+Run from the src directory:
+    gunicorn 'api.wsgi:create_app()'              (settings in gunicorn.conf.py)
+    waitress-serve --call api.wsgi:create_app      (one process, many threads)
+
+The development server is still `python api/app.py`.
+"""
+
+import os
+import sys
+import gc
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from api import app as app_module
+from api.restaurants_api import restaurant_store
+
+
+def create_app(preload=True, precompute=False):
+    """
+    Return the configured Flask application.
+
+    Args:
+        preload (bool): Load the dataset and restaurant directory and
+            precompute the correlation response now; a failure is reported
+            and left to the requests
+        precompute (bool): Start the background precompute worker in this
+            process (with forking servers, start it in each worker with
+            shared=True instead, so one of them computes; see gunicorn.conf.py)
+
+    Returns:
+        Flask: The API application
+    """
+    if preload:
+        try:
+            app_module.preload()
+        except Exception as e:
+            print(f"Warning: could not preload the analysis data: {e}")
+        try:
+            restaurant_store.refresh()
+        except Exception as e:
+            print(f"Warning: could not load the restaurant directory: {e}")
+        # Move everything allocated so far out of the collected generations so
+        # collections in forked workers do not touch (and copy) these pages
+        gc.collect()
+        gc.freeze()
+    if precompute:
+        app_module.start_precompute_worker()
+    return app_module.app
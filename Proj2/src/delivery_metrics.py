@@ -1,33 +1,48 @@
 import pandas as pd
 from pathlib import Path
 
-def compute_delivery_metrics(input_file: str, output_file: str):
-    """
-    Process Delivery_Logs.csv to compute vendor-level KPIs:
-    - Average delivery time
-    - On-time delivery rate
-    - Average distance per delivery
-    - Delivery volume per day
-    """
+REQUIRED_COLUMNS = [
+    "order_id",
+    "date",
+    "restaurant",
+    "distance_km",
+    "delivery_time_min",
+    "delayed",
+]
 
-    # --- Load CSV ---
-    df = pd.read_csv(input_file)
 
-    required_cols = [
-        "order_id", "date", "restaurant", "distance_km",
-        "delivery_time_min", "delayed"
-    ]
-    for col in required_cols:
+def clean_delivery_logs(df):
+    """
+    Validate and normalize raw Delivery_Logs rows:
+    - Drops rows missing any required column
+    - Parses dates
+    - Coerces delayed to boolean and adds on_time
+    """
+    for col in REQUIRED_COLUMNS:
         if col not in df.columns:
             raise ValueError(f"Missing required column: {col}")
 
     # --- Clean up and normalize ---
-    df = df.dropna(subset=required_cols)
+    df = df.dropna(subset=REQUIRED_COLUMNS).copy()
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
 
     # Ensure delayed is boolean
     df["delayed"] = df["delayed"].astype(str).str.lower().isin(["true", "1", "yes"])
     df["on_time"] = ~df["delayed"]
+    return df
+
+
+def compute_delivery_metrics(input_file: str, output_file: str):
+    """
+    Process Delivery_Logs.csv to compute vendor-level KPIs:
+    - Average delivery time
+    - On-time delivery rate
+    - Average distance per delivery
+    - Delivery volume per day
+    """
+
+    # --- Load CSV ---
+    df = clean_delivery_logs(pd.read_csv(input_file))
 
     # --- Compute metrics per restaurant ---
     vendor_metrics = df.groupby("restaurant").agg(
@@ -1,5 +1,601 @@
 import pandas as pd
+import numpy as np
 import os
+from bisect import bisect_left, insort
+
+from analysis.parallel import map_chunks, n_chunks_for, spawn_seeds, split_evenly
+from delivery_metrics import clean_delivery_logs
+
+# Columns the weighted formula reads from the delivery metrics
+SCORE_INPUT_COLUMNS = [
+    'on_time_rate',
+    'avg_delivery_time',
+    'avg_distance',
+    'deliveries_per_day',
+]
+
+# Columns that are min-max normalized before weighting
+NORMALIZED_COLUMNS = ['avg_delivery_time', 'avg_distance', 'deliveries_per_day']
+
+# Named weightings of the four score components. 'default' is the production formula.
+WEIGHT_PROFILES = {
+    'default': {
+        'on_time_rate': 0.4,
+        'avg_delivery_time': 0.3,
+        'avg_distance': 0.2,
+        'deliveries_per_day': 0.1,
+    },
+    'equal': {
+        'on_time_rate': 0.25,
+        'avg_delivery_time': 0.25,
+        'avg_distance': 0.25,
+        'deliveries_per_day': 0.25,
+    },
+    'reliability_first': {
+        'on_time_rate': 0.7,
+        'avg_delivery_time': 0.1,
+        'avg_distance': 0.1,
+        'deliveries_per_day': 0.1,
+    },
+    'speed_first': {
+        'on_time_rate': 0.2,
+        'avg_delivery_time': 0.6,
+        'avg_distance': 0.1,
+        'deliveries_per_day': 0.1,
+    },
+    'proximity_first': {
+        'on_time_rate': 0.2,
+        'avg_delivery_time': 0.2,
+        'avg_distance': 0.5,
+        'deliveries_per_day': 0.1,
+    },
+    'volume_first': {
+        'on_time_rate': 0.2,
+        'avg_delivery_time': 0.2,
+        'avg_distance': 0.1,
+        'deliveries_per_day': 0.5,
+    },
+}
+
+
+def _min_max(values):
+    """
+    Min-max normalize an array to 0-1. A constant column maps to 0.5.
+    """
+    return _scale_between(values, np.nanmin(values), np.nanmax(values))
+
+
+def _scale_between(values, min_val, max_val):
+    """
+    Scale values to 0-1 against known bounds. Equal bounds map to 0.5.
+    """
+    if max_val == min_val:
+        return np.full(np.shape(values), 0.5)
+    return (values - min_val) / (max_val - min_val)
+
+
+def _weighted_score(
+    on_time_rate,
+    norm_delivery_time,
+    norm_distance,
+    norm_deliveries_per_day,
+    weights=None,
+):
+    """
+    Apply the efficiency weights to normalized inputs (before the 0-100 rescale).
+    """
+    w = WEIGHT_PROFILES['default'] if weights is None else weights
+    return (
+        w['on_time_rate'] * (on_time_rate / 100)  # convert to 0-1 scale
+        + w['avg_delivery_time'] * (1 - norm_delivery_time)
+        + w['avg_distance'] * (1 - norm_distance)
+        + w['deliveries_per_day'] * norm_deliveries_per_day
+    )
+
+
+def resolve_weights(weights):
+    """
+    Turn a profile name or a weight dict into a validated weight dict.
+
+    Args:
+        weights (str or dict): Name in WEIGHT_PROFILES, or a mapping of every score
+            input column to a non-negative weight
+
+    Returns:
+        dict: Weight per score input column
+    """
+    if isinstance(weights, str):
+        if weights not in WEIGHT_PROFILES:
+            raise KeyError(
+                f"Unknown weight profile '{weights}'. "
+                f"Choose from {sorted(WEIGHT_PROFILES)}"
+            )
+        return WEIGHT_PROFILES[weights]
+
+    if set(weights) != set(SCORE_INPUT_COLUMNS):
+        raise KeyError(f"Weights must cover exactly {SCORE_INPUT_COLUMNS}")
+    if any(w < 0 for w in weights.values()) or sum(weights.values()) <= 0:
+        raise ValueError("Weights must be non-negative and not all zero.")
+    return {col: float(weights[col]) for col in SCORE_INPUT_COLUMNS}
+
+
+def score_efficiency(metrics_df, meta_df=None, weights='default'):
+    """
+    Compute the delivery efficiency score for metrics already held in memory.
+
+    Uses the same weighted formula as compute_efficiency_scores() but takes and
+    returns DataFrames, so callers never have to round-trip through CSV files.
+
+    Args:
+        metrics_df (pd.DataFrame): One row per restaurant with on_time_rate (0-100),
+            avg_delivery_time, avg_distance and deliveries_per_day
+        meta_df (pd.DataFrame, optional): Restaurant metadata, left-joined on
+            'restaurant'
+        weights (str or dict): Weight profile name or weight dict (see resolve_weights)
+
+    Returns:
+        pd.DataFrame: Copy of the input with norm_* columns and efficiency_score (0-100)
+    """
+    for col in SCORE_INPUT_COLUMNS:
+        if col not in metrics_df.columns:
+            raise KeyError(f"Expected '{col}' column in delivery metrics file.")
+
+    if meta_df is not None:
+        if 'restaurant' not in meta_df.columns:
+            raise KeyError("Expected 'restaurant' column in metadata file.")
+        scored_df = pd.merge(metrics_df, meta_df, on='restaurant', how='left')
+    else:
+        scored_df = metrics_df.copy()
+
+    # Normalize numeric columns
+    for col in NORMALIZED_COLUMNS:
+        scored_df[f'norm_{col}'] = _min_max(scored_df[col].to_numpy(dtype=float))
+
+    # Compute weighted efficiency score
+    raw_score = _weighted_score(
+        scored_df['on_time_rate'].to_numpy(dtype=float),
+        scored_df['norm_avg_delivery_time'].to_numpy(),
+        scored_df['norm_avg_distance'].to_numpy(),
+        scored_df['norm_deliveries_per_day'].to_numpy(),
+        resolve_weights(weights),
+    )
+
+    # Scale efficiency score 0-100
+    scored_df['efficiency_score'] = 100 * _min_max(raw_score)
+    return scored_df
+
+
+def _component_matrix(metrics_df):
+    """
+    Build the restaurants x components matrix the weights are applied to.
+
+    Columns follow SCORE_INPUT_COLUMNS and are already oriented so that higher is
+    better.
+    """
+    return np.column_stack(
+        [
+            metrics_df['on_time_rate'].to_numpy(dtype=float) / 100,
+            1 - _min_max(metrics_df['avg_delivery_time'].to_numpy(dtype=float)),
+            1 - _min_max(metrics_df['avg_distance'].to_numpy(dtype=float)),
+            _min_max(metrics_df['deliveries_per_day'].to_numpy(dtype=float)),
+        ]
+    )
+
+
+def _weight_matrix(profiles):
+    """
+    Convert profiles to (names, components x profiles weight matrix).
+
+    Accepts None (all WEIGHT_PROFILES), a list of profile names, a dict of
+    name -> weights, or an array of shape (n_profiles, 4).
+    """
+    if profiles is None:
+        profiles = WEIGHT_PROFILES
+    if isinstance(profiles, np.ndarray):
+        weights = np.atleast_2d(np.asarray(profiles, dtype=float))
+        if weights.shape[1] != len(SCORE_INPUT_COLUMNS) or (weights < 0).any():
+            raise ValueError(
+                "Weight arrays must be non-negative with one column per score input."
+            )
+        return [f'profile_{i}' for i in range(len(weights))], weights.T
+    if not isinstance(profiles, dict):
+        profiles = {name: name for name in profiles}
+
+    names = list(profiles)
+    resolved = [resolve_weights(profiles[name]) for name in names]
+    weights = np.array([[w[col] for col in SCORE_INPUT_COLUMNS] for w in resolved])
+    return names, weights.T
+
+
+def _rescale_columns(raw_scores):
+    """Rescale each column to 0-100; constant columns map to 50."""
+    col_min = np.nanmin(raw_scores, axis=0)
+    col_range = np.nanmax(raw_scores, axis=0) - col_min
+    scaled = np.full(raw_scores.shape, 0.5)
+    varying = col_range > 0
+    scaled[:, varying] = (raw_scores[:, varying] - col_min[varying]) / col_range[
+        varying
+    ]
+    return 100 * scaled
+
+
+def _rank_columns(scores):
+    """Rank restaurants within each column, 1 = highest score (ties broken by order)."""
+    order = np.argsort(-scores, axis=0, kind='stable')
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, len(scores) + 1)[:, None], axis=0)
+    return ranks
+
+
+def score_weight_profiles(metrics_df, profiles=None):
+    """
+    Score every restaurant under many weightings with a single matrix multiply.
+
+    Args:
+        metrics_df (pd.DataFrame): One row per restaurant with 'restaurant' and the
+            score input columns
+        profiles: Weight profiles (see _weight_matrix); defaults to WEIGHT_PROFILES
+
+    Returns:
+        tuple: (scores, ranks) DataFrames indexed by restaurant, one column per profile
+    """
+    for col in ['restaurant'] + SCORE_INPUT_COLUMNS:
+        if col not in metrics_df.columns:
+            raise KeyError(f"Expected '{col}' column in delivery metrics file.")
+
+    names, weights = _weight_matrix(profiles)
+    scores = _rescale_columns(_component_matrix(metrics_df) @ weights)
+    index = pd.Index(metrics_df['restaurant'], name='restaurant')
+    return (
+        pd.DataFrame(scores, index=index, columns=names),
+        pd.DataFrame(_rank_columns(scores), index=index, columns=names),
+    )
+
+
+def sample_weight_simplex(n_samples, seed=None):
+    """
+    Draw weight vectors uniformly from the simplex (weights >= 0, summing to 1).
+
+    Returns:
+        np.ndarray: Array of shape (n_samples, 4) in SCORE_INPUT_COLUMNS order
+    """
+    rng = np.random.default_rng(seed)
+    return rng.dirichlet(np.ones(len(SCORE_INPUT_COLUMNS)), size=n_samples)
+
+
+def rank_stability(metrics_df, n_samples=1000, seed=None):
+    """
+    Measure how stable each restaurant's rank is under random weightings.
+
+    Samples n_samples weight vectors from the simplex, ranks all restaurants under
+    each of them in one batch, and summarizes the rank distribution.
+
+    Returns:
+        pd.DataFrame: Per restaurant: default_rank, mean_rank, rank_std, best_rank,
+            worst_rank and top_rank_share (fraction of samples ranked first)
+    """
+    _, ranks = score_weight_profiles(metrics_df, sample_weight_simplex(n_samples, seed))
+    ranks = ranks.to_numpy()
+    _, default_ranks = score_weight_profiles(metrics_df, ['default'])
+
+    return (
+        pd.DataFrame(
+            {
+                'restaurant': metrics_df['restaurant'].to_numpy(),
+                'default_rank': default_ranks['default'].to_numpy(),
+                'mean_rank': ranks.mean(axis=1),
+                'rank_std': ranks.std(axis=1),
+                'best_rank': ranks.min(axis=1),
+                'worst_rank': ranks.max(axis=1),
+                'top_rank_share': (ranks == 1).mean(axis=1),
+            }
+        )
+        .sort_values('mean_rank')
+        .reset_index(drop=True)
+    )
+
+
+def _min_max_rows(values):
+    """Min-max normalize each row of a 2-D array; constant rows map to 0.5."""
+    min_val = values.min(axis=1, keepdims=True)
+    value_range = values.max(axis=1, keepdims=True) - min_val
+    safe_range = np.where(value_range > 0, value_range, 1.0)
+    return np.where(value_range > 0, (values - min_val) / safe_range, 0.5)
+
+
+def _replicate_metrics(
+    idx, starts, counts, day_keys, n_days, delivery_time, on_time, distance
+):
+    """
+    Compute per-restaurant delivery metrics for a batch of resampled row indices.
+
+    Args:
+        idx (np.ndarray): (replicates, rows) indices into the log arrays; slot j is
+            always drawn from the same restaurant as row j
+        starts, counts (np.ndarray): Segment start and length of each restaurant
+        day_keys (np.ndarray): restaurant_code * n_days + day_code per log row
+        n_days (int): Number of distinct delivery dates
+
+    Returns:
+        tuple: (on_time_rate, avg_delivery_time, avg_distance, deliveries_per_day),
+            each of shape (replicates, restaurants)
+    """
+    avg_delivery_time = np.add.reduceat(delivery_time[idx], starts, axis=1) / counts
+    on_time_rate = 100 * np.add.reduceat(on_time[idx], starts, axis=1) / counts
+    avg_distance = np.add.reduceat(distance[idx], starts, axis=1) / counts
+
+    n_restaurants = len(starts)
+    n_keys = n_restaurants * n_days
+    if n_keys <= idx.shape[1]:
+        # Few restaurant-days: count hits per (replicate, restaurant, day) directly
+        flat = day_keys[idx] + n_keys * np.arange(len(idx))[:, None]
+        hits = np.bincount(flat.ravel(), minlength=len(idx) * n_keys)
+        active_days = (hits.reshape(len(idx), n_restaurants, n_days) > 0).sum(axis=2)
+    else:
+        # Keys are restaurant-major, so a row-wise sort keeps each restaurant's segment
+        # in place and distinct days are the positions where the key changes.
+        keys = np.sort(day_keys[idx], axis=1)
+        new_day = np.ones(keys.shape, dtype=np.int64)
+        new_day[:, 1:] = keys[:, 1:] != keys[:, :-1]
+        active_days = np.add.reduceat(new_day, starts, axis=1)
+    deliveries_per_day = counts / active_days
+
+    return on_time_rate, avg_delivery_time, avg_distance, deliveries_per_day
+
+
+def _bootstrap_chunk(task):
+    """Score one chunk of bootstrap replicates (runs in a worker process)."""
+    seed_seq, n_replicates, arrays, weights = task
+    starts, counts, row_group = arrays[:3]
+    rng = np.random.default_rng(seed_seq)
+
+    # Draw every replicate at once: each slot picks a random row of its own restaurant
+    offsets = (rng.random((n_replicates, len(row_group))) * counts[row_group]).astype(
+        np.int64
+    )
+    return _score_replicates(starts[row_group] + offsets, arrays, weights)
+
+
+def _score_replicates(idx, arrays, weights):
+    """Recompute metrics and 0-100 scores for each row of an index matrix."""
+    starts, counts, _, day_keys, n_days, delivery_time, on_time, distance = arrays
+    on_time_rate, avg_time, avg_distance, per_day = _replicate_metrics(
+        idx, starts, counts, day_keys, n_days, delivery_time, on_time, distance
+    )
+    raw = _weighted_score(
+        on_time_rate,
+        _min_max_rows(avg_time),
+        _min_max_rows(avg_distance),
+        _min_max_rows(per_day),
+        weights,
+    )
+    return 100 * _min_max_rows(raw)
+
+
+def bootstrap_efficiency_scores(
+    delivery_logs_df,
+    n_replicates=1000,
+    confidence=0.95,
+    weights='default',
+    n_jobs=1,
+    seed=None,
+):
+    """
+    Bootstrap confidence intervals for each restaurant's efficiency score.
+
+    Delivery_Logs rows are resampled with replacement within each restaurant. Each
+    replicate recomputes the delivery metrics and the full score (normalization
+    included), with all replicates of a chunk drawn as one NumPy index matrix.
+    Chunks are spread across worker processes when n_jobs != 1.
+
+    Args:
+        delivery_logs_df (pd.DataFrame): Raw Delivery_Logs rows
+        n_replicates (int): Number of bootstrap replicates
+        confidence (float): Two-sided confidence level of the interval
+        weights (str or dict): Weight profile name or weight dict
+        n_jobs (int): Worker processes; -1 uses every core
+        seed (int, optional): Seed for reproducible resampling
+
+    Returns:
+        pd.DataFrame: restaurant, efficiency_score, score_std, ci_lower, ci_upper,
+            n_deliveries
+    """
+    logs = clean_delivery_logs(delivery_logs_df)
+    logs = logs[logs['date'].notna()].sort_values('restaurant', kind='stable')
+
+    restaurant_codes, restaurants = pd.factorize(logs['restaurant'], sort=True)
+    day_codes, days = pd.factorize(logs['date'])
+    counts = np.bincount(restaurant_codes, minlength=len(restaurants))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    arrays = (
+        starts,
+        counts,
+        restaurant_codes,
+        restaurant_codes.astype(np.int64) * len(days) + day_codes,
+        len(days),
+        logs['delivery_time_min'].to_numpy(dtype=float),
+        logs['on_time'].to_numpy(dtype=float),
+        logs['distance_km'].to_numpy(dtype=float),
+    )
+    weights = resolve_weights(weights)
+
+    point = _score_replicates(np.arange(len(logs))[None, :], arrays, weights)[0]
+
+    # Keep each chunk's (replicates x rows) index matrix around 2M entries
+    sizes = split_evenly(
+        n_replicates, n_chunks_for(n_replicates, 2_000_000 // max(len(logs), 1))
+    )
+    seeds = spawn_seeds(seed, len(sizes))
+    tasks = [(seed_seq, size, arrays, weights) for seed_seq, size in zip(seeds, sizes)]
+    replicates = np.vstack(map_chunks(_bootstrap_chunk, tasks, n_jobs))
+
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(replicates, [alpha, 1 - alpha], axis=0)
+    return pd.DataFrame(
+        {
+            'restaurant': restaurants,
+            'efficiency_score': point,
+            'score_std': replicates.std(axis=0, ddof=1) if n_replicates > 1 else np.nan,
+            'ci_lower': lower,
+            'ci_upper': upper,
+            'n_deliveries': counts,
+        }
+    )
+
+
+class IncrementalEfficiencyScorer:
+    """
+    Keeps efficiency scores current while individual restaurants' metrics change.
+
+    Every normalized column (and the raw weighted score used for the final 0-100
+    rescale) is mirrored in a sorted list, so the min and max are always at hand.
+    An update only re-scores the changed restaurant unless it moved one of those
+    bounds, in which case all scores are recomputed in one vectorized pass.
+    """
+
+    def __init__(self, metrics_df):
+        """
+        Args:
+            metrics_df (pd.DataFrame): One row per restaurant with 'restaurant' and
+                the score input columns
+        """
+        for col in ['restaurant'] + SCORE_INPUT_COLUMNS:
+            if col not in metrics_df.columns:
+                raise KeyError(f"Expected '{col}' column in delivery metrics file.")
+
+        self.restaurants = list(metrics_df['restaurant'])
+        self._index = {name: i for i, name in enumerate(self.restaurants)}
+        self._values = {
+            col: metrics_df[col].to_numpy(dtype=float).copy()
+            for col in SCORE_INPUT_COLUMNS
+        }
+        for col, values in self._values.items():
+            if not np.isfinite(values).all():
+                raise ValueError(
+                    f"Column '{col}' contains missing or non-finite values."
+                )
+
+        self.full_rescores = 0
+        self._rescore_all()
+
+    def _rescore_all(self):
+        """Rebuild order statistics and recompute every score."""
+        self._sorted = {col: sorted(self._values[col]) for col in NORMALIZED_COLUMNS}
+        self._norm = {
+            col: _scale_between(
+                self._values[col], self._sorted[col][0], self._sorted[col][-1]
+            )
+            for col in NORMALIZED_COLUMNS
+        }
+        self._raw = _weighted_score(
+            self._values['on_time_rate'],
+            self._norm['avg_delivery_time'],
+            self._norm['avg_distance'],
+            self._norm['deliveries_per_day'],
+        )
+        self._sorted_raw = sorted(self._raw)
+        self._rescale_all()
+        self.full_rescores += 1
+
+    def _rescale_all(self):
+        """Re-apply the final 0-100 rescale to every raw score."""
+        self._scores = 100 * _scale_between(
+            self._raw, self._sorted_raw[0], self._sorted_raw[-1]
+        )
+
+    @staticmethod
+    def _replace_sorted(sorted_values, old, new):
+        """
+        Swap one value in a sorted list and report whether its min or max moved.
+        """
+        bounds = (sorted_values[0], sorted_values[-1])
+        del sorted_values[bisect_left(sorted_values, old)]
+        insort(sorted_values, new)
+        return (sorted_values[0], sorted_values[-1]) != bounds
+
+    def update(self, restaurant, **metrics):
+        """
+        Apply new metric values for one restaurant.
+
+        Args:
+            restaurant (str): Restaurant name; unknown names are added
+            **metrics: New values for any of the score input columns
+
+        Returns:
+            float: The restaurant's updated efficiency score
+        """
+        unknown = set(metrics) - set(SCORE_INPUT_COLUMNS)
+        if unknown:
+            raise KeyError(f"Unknown score input column(s): {sorted(unknown)}")
+        if not all(np.isfinite(v) for v in metrics.values()):
+            raise ValueError("Metric values must be finite numbers.")
+
+        if restaurant not in self._index:
+            missing = [col for col in SCORE_INPUT_COLUMNS if col not in metrics]
+            if missing:
+                raise KeyError(f"New restaurant '{restaurant}' is missing {missing}")
+            self._index[restaurant] = len(self.restaurants)
+            self.restaurants.append(restaurant)
+            for col in SCORE_INPUT_COLUMNS:
+                self._values[col] = np.append(self._values[col], float(metrics[col]))
+            self._rescore_all()
+            return self.score(restaurant)
+
+        i = self._index[restaurant]
+        bounds_moved = False
+        for col, value in metrics.items():
+            old = self._values[col][i]
+            self._values[col][i] = value
+            if col in self._sorted:
+                bounds_moved |= self._replace_sorted(
+                    self._sorted[col], old, float(value)
+                )
+
+        if bounds_moved:
+            self._rescore_all()
+            return self.score(restaurant)
+
+        norm = {
+            col: _scale_between(
+                self._values[col][i], self._sorted[col][0], self._sorted[col][-1]
+            )
+            for col in NORMALIZED_COLUMNS
+        }
+        for col in NORMALIZED_COLUMNS:
+            self._norm[col][i] = norm[col]
+        old_raw = self._raw[i]
+        self._raw[i] = _weighted_score(
+            self._values['on_time_rate'][i],
+            norm['avg_delivery_time'],
+            norm['avg_distance'],
+            norm['deliveries_per_day'],
+        )
+        if self._replace_sorted(self._sorted_raw, old_raw, self._raw[i]):
+            self._rescale_all()
+        else:
+            self._scores[i] = 100 * _scale_between(
+                self._raw[i], self._sorted_raw[0], self._sorted_raw[-1]
+            )
+        return self.score(restaurant)
+
+    def score(self, restaurant):
+        """Return the current efficiency score (0-100) for one restaurant."""
+        return float(self._scores[self._index[restaurant]])
+
+    def scores(self):
+        """
+        Returns:
+            pd.DataFrame: Current inputs, norm_* columns and efficiency_score per
+                restaurant
+        """
+        result = pd.DataFrame({'restaurant': self.restaurants})
+        for col in SCORE_INPUT_COLUMNS:
+            result[col] = self._values[col]
+        for col in NORMALIZED_COLUMNS:
+            result[f'norm_{col}'] = self._norm[col]
+        result['efficiency_score'] = self._scores
+        return result
+
 
 def compute_efficiency_scores(delivery_metrics_path, metadata_path, output_path):
     """
@@ -11,45 +607,21 @@ def compute_efficiency_scores(delivery_metrics_path, metadata_path, output_path)
       + 0.3 * (1 - norm_avg_delivery_time)
       + 0.2 * (1 - norm_avg_distance)
       + 0.1 * norm_deliveries_per_day
+
+    Returns:
+        pd.DataFrame: The scored dataset that was written to output_path
     """
 
     # Load datasets
     delivery_df = pd.read_csv(delivery_metrics_path)
     meta_df = pd.read_csv(metadata_path)
 
-    # Ensure key columns exist
-    for col in ['restaurant', 'on_time_rate', 'avg_delivery_time', 'avg_distance', 'deliveries_per_day']:
-        if col not in delivery_df.columns and col != 'restaurant':
-            raise KeyError(f"Expected '{col}' column in delivery metrics file.")
-
-    if 'restaurant' not in meta_df.columns:
-        raise KeyError("Expected 'restaurant' column in metadata file.")
-
-    # Merge datasets
-    merged_df = pd.merge(delivery_df, meta_df, on='restaurant', how='left')
-
-    # Normalize numeric columns
-    for col in ['avg_delivery_time', 'avg_distance', 'deliveries_per_day']:
-        min_val, max_val = merged_df[col].min(), merged_df[col].max()
-        merged_df[f'norm_{col}'] = (
-            (merged_df[col] - min_val) / (max_val - min_val) if max_val != min_val else 0.5
-        )
-
-    # Compute weighted efficiency score
-    merged_df['efficiency_score'] = (
-        0.4 * (merged_df['on_time_rate'] / 100) +       # convert to 0-1 scale
-        0.3 * (1 - merged_df['norm_avg_delivery_time']) +
-        0.2 * (1 - merged_df['norm_avg_distance']) +
-        0.1 * merged_df['norm_deliveries_per_day']
-    )
-
-    # Scale efficiency score 0-100
-    min_score, max_score = merged_df['efficiency_score'].min(), merged_df['efficiency_score'].max()
-    merged_df['efficiency_score'] = 100 * ((merged_df['efficiency_score'] - min_score) / (max_score - min_score))
+    merged_df = score_efficiency(delivery_df, meta_df)
 
     # Save output
     merged_df.to_csv(output_path, index=False)
     print(f"Efficiency scores computed successfully and saved to {output_path}")
+    return merged_df
 
 
 if __name__ == "__main__":
@@ -58,4 +630,12 @@ if __name__ == "__main__":
     metadata_path = os.path.join(base_path, "Restaurant_Metadata.csv")
     output_path = os.path.join(base_path, "vendor_efficiency_scores.csv")
 
-    compute_efficiency_scores(delivery_metrics_path, metadata_path, output_path)
+    scores_df = compute_efficiency_scores(
+        delivery_metrics_path, metadata_path, output_path
+    )
+
+    # Keep this week's scores; the CSV above only holds the latest run
+    from score_history import ScoreHistoryStore
+
+    period = ScoreHistoryStore().append(scores_df)
+    print(f"Efficiency scores recorded in score history for {period}")
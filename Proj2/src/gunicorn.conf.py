@@ -0,0 +1,23 @@
+"""
+Gunicorn settings for the API (run from src: gunicorn 'api.wsgi:create_app()').
+
+The app is created, and the data preloaded, once in the master process before
+the workers fork (preload_app), so the workers share it copy-on-write.
+"""
+
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Threads do not survive fork, so each worker watches the input files, but
+    # only the one holding the lock in data/precompute recomputes; the others
+    # load its published result
+    from api.app import start_precompute_worker
+
+    start_precompute_worker(shared=True)
@@ -0,0 +1,206 @@
+"""
+Weekly history of per-restaurant efficiency scores.
+
+Each period (ISO week, e.g. 2025-W41) is stored as its own compressed columnar
+.npz partition under data/score_history/. Appending a week writes one small file
+and never rewrites older ones; trend and mover queries only open the partitions
+they need.
+"""
+
+import os
+import re
+import tempfile
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+HISTORY_DIR = os.path.join(DATA_DIR, "score_history")
+
+# Columns kept per restaurant and period
+HISTORY_COLUMNS = [
+    "efficiency_score",
+    "on_time_rate",
+    "avg_delivery_time",
+    "avg_distance",
+    "deliveries_per_day",
+]
+
+PERIOD_PATTERN = re.compile(r"^\d{4}-W\d{2}$")
+
+
+def period_key(day):
+    """
+    Return the ISO week key ('YYYY-Www') for a date-like value.
+    """
+    year, week, _ = pd.Timestamp(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def recent_periods(end, n):
+    """
+    The n consecutive ISO week keys ending with (and including) end.
+
+    Args:
+        end (str): Period key of the last week
+        n (int): Number of weeks
+
+    Returns:
+        list: Period keys, oldest first
+    """
+    if not PERIOD_PATTERN.match(end):
+        raise ValueError(f"Invalid period '{end}', expected e.g. '2025-W41'")
+    year, week = int(end[:4]), int(end[-2:])
+    monday = date.fromisocalendar(year, week, 1)
+    return [period_key(monday - timedelta(weeks=i)) for i in range(n - 1, -1, -1)]
+
+
+class ScoreHistoryStore:
+    """
+    Append-only store of efficiency scores and component metrics keyed by period.
+    """
+
+    def __init__(self, root_dir=HISTORY_DIR):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _path(self, period):
+        if not PERIOD_PATTERN.match(period):
+            raise ValueError(f"Invalid period '{period}', expected e.g. '2025-W41'")
+        return os.path.join(self.root_dir, f"{period}.npz")
+
+    def periods(self):
+        """
+        Returns:
+            list: Stored period keys, oldest first
+        """
+        return sorted(
+            name[:-4]
+            for name in os.listdir(self.root_dir)
+            if name.endswith(".npz") and PERIOD_PATTERN.match(name[:-4])
+        )
+
+    def append(self, scores_df, period=None):
+        """
+        Store one period of scores. Re-appending a period replaces it.
+
+        Args:
+            scores_df (pd.DataFrame): One row per restaurant with 'restaurant' and
+                HISTORY_COLUMNS (e.g. the output of score_efficiency)
+            period (str, optional): Period key; defaults to the current ISO week
+
+        Returns:
+            str: The period key written
+        """
+        missing = [
+            col
+            for col in ["restaurant"] + HISTORY_COLUMNS
+            if col not in scores_df.columns
+        ]
+        if missing:
+            raise KeyError(f"Missing columns for score history: {missing}")
+
+        period = period or period_key(pd.Timestamp.now())
+        columns = {
+            "restaurant": scores_df["restaurant"].astype(str).to_numpy(dtype=str)
+        }
+        for col in HISTORY_COLUMNS:
+            columns[col] = scores_df[col].to_numpy(dtype=np.float32)
+
+        # Write to a uniquely named temp file first so readers never see a
+        # partial partition and concurrent writers never share a temp file
+        path = self._path(period)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **columns)
+            # Readable like the other data files, not mkstemp's 0600
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return period
+
+    def load(self, period, columns=None):
+        """
+        Load one period.
+
+        Args:
+            period (str): Period key
+            columns (list, optional): Subset of HISTORY_COLUMNS to read
+
+        Returns:
+            pd.DataFrame: 'restaurant' plus the requested columns
+        """
+        path = self._path(period)
+        if not os.path.exists(path):
+            raise KeyError(f"No score history for period '{period}'")
+
+        # npz members are decompressed lazily, so unrequested columns are never read
+        with np.load(path) as partition:
+            data = {"restaurant": partition["restaurant"]}
+            for col in columns or HISTORY_COLUMNS:
+                data[col] = partition[col].astype(float)
+        return pd.DataFrame(data)
+
+    def trend(self, restaurant, last_n=8, columns=("efficiency_score",), end=None):
+        """
+        Score trend for one restaurant over the last weeks.
+
+        Args:
+            restaurant (str): Restaurant name
+            last_n (int): Number of consecutive ISO weeks, ending with end
+            columns (tuple): History columns to include
+            end (str, optional): Last week of the trend; defaults to the
+                latest stored period
+
+        Returns:
+            pd.DataFrame: One row per week, oldest first; values are NaN for
+                weeks that are not stored or in which the restaurant was not scored
+        """
+        stored = self.periods()
+        end = end or (stored[-1] if stored else None)
+        if end is None or last_n <= 0:
+            return pd.DataFrame(columns=["period", *columns])
+
+        stored = set(stored)
+        rows = []
+        for period in recent_periods(end, last_n):
+            row = {"period": period, **{col: np.nan for col in columns}}
+            if period in stored:
+                partition = self.load(period, list(columns))
+                match = partition[partition["restaurant"] == restaurant]
+                if not match.empty:
+                    row.update(match.iloc[0][list(columns)].to_dict())
+            rows.append(row)
+        return pd.DataFrame(rows, columns=["period", *columns])
+
+    def biggest_movers(self, period=None, top_n=5, column="efficiency_score"):
+        """
+        Restaurants whose score changed most versus the previous stored period.
+
+        Args:
+            period (str, optional): Period to compare; defaults to the latest
+            top_n (int): Number of restaurants to return
+            column (str): History column to compare
+
+        Returns:
+            pd.DataFrame: restaurant, previous, current, change; largest |change| first
+        """
+        periods = self.periods()
+        period = period or (periods[-1] if periods else None)
+        if period not in periods or periods.index(period) == 0:
+            return pd.DataFrame(columns=["restaurant", "previous", "current", "change"])
+
+        previous = self.load(periods[periods.index(period) - 1], [column])
+        current = self.load(period, [column])
+        moves = pd.merge(
+            previous.rename(columns={column: "previous"}),
+            current.rename(columns={column: "current"}),
+            on="restaurant",
+        )
+        moves["change"] = moves["current"] - moves["previous"]
+        order = moves["change"].abs().sort_values(ascending=False).index
+        return moves.loc[order].head(top_n).reset_index(drop=True)
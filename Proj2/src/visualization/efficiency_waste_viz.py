@@ -12,25 +12,41 @@ import os
 import sys
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from analysis.correlate_efficiency_waste import load_and_merge_data, compute_correlations
 
-# Configure matplotlib for better plots
-try:
-    plt.style.use('seaborn-v0_8-darkgrid')
-except OSError:
-    plt.style.use('seaborn-darkgrid')  # Fallback for older matplotlib versions
-sns.set_palette("husl")
-
 # Path configuration
 BASE_DIR = os.path.join(os.path.dirname(__file__), "..", "..")
 OUTPUT_DIR = os.path.join(BASE_DIR, "data", "visualizations")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+_plotting_configured = False
+
+
+def _plotting():
+    """
+    Import and configure matplotlib and seaborn on first use; importing them
+    takes longer than the rest of the analysis code.
+
+    Returns:
+        tuple: (matplotlib.pyplot, seaborn)
+    """
+    global _plotting_configured
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if not _plotting_configured:
+        # Configure matplotlib for better plots
+        try:
+            plt.style.use('seaborn-v0_8-darkgrid')
+        except OSError:
+            plt.style.use('seaborn-darkgrid')  # Fallback for older matplotlib versions
+        sns.set_palette("husl")
+        _plotting_configured = True
+    return plt, sns
+
 
 def create_scatter_plots(df, output_dir=OUTPUT_DIR):
     """
@@ -41,6 +57,7 @@ def create_scatter_plots(df, output_dir=OUTPUT_DIR):
         output_dir (str): Directory to save plots
     """
     print("\nGenerating scatter plots...")
+    plt, sns = _plotting()
     
     # Define pairs to plot (efficiency metric, waste metric)
     pairs_to_plot = [
@@ -113,6 +130,7 @@ def create_correlation_heatmap(df, output_dir=OUTPUT_DIR):
         output_dir (str): Directory to save plots
     """
     print("\nGenerating correlation heatmap...")
+    plt, sns = _plotting()
     
     # Select numeric columns for correlation
     efficiency_cols = [
@@ -199,6 +217,8 @@ def create_efficiency_waste_comparison(df, output_dir=OUTPUT_DIR):
         print("  No data to plot")
         return
     
+    plt, _ = _plotting()
+
     # Create figure with two y-axes
     fig, ax1 = plt.subplots(figsize=(14, 8))
     
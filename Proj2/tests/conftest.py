@@ -0,0 +1,72 @@
+"""
+Shared pytest fixtures.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis import model_store
+from api import result_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_model_store(tmp_path, monkeypatch):
+    """Keep models persisted during tests out of data/models."""
+    model_dir = tmp_path / "models"
+    monkeypatch.setattr(model_store, "MODEL_DIR", str(model_dir))
+    monkeypatch.setattr(
+        model_store, "REGRESSION_MODEL_FILE", str(model_dir / "regression_models.json")
+    )
+    monkeypatch.setattr(
+        model_store,
+        "SELECTED_MODEL_FILE",
+        str(model_dir / "regularized_regression.json"),
+    )
+    return model_dir
+
+
+@pytest.fixture(autouse=True)
+def empty_result_cache():
+    """Start every test without cached API responses."""
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+
+@pytest.fixture
+def sources(tmp_path):
+    """Small source files for two restaurants; returns the store path arguments."""
+    files = {
+        "metadata_file": (
+            "restaurant,cuisine,capacity,seating_type,avg_daily_orders,"
+            "has_sustainability_program,zip_code\n"
+            "Taco Spot,Mexican,40,Indoor,120,True,27606\n"
+            "Noodle Bar,Asian,25,Counter,90,False,27607\n"
+        ),
+        "efficiency_file": "restaurant,efficiency_score\nTaco Spot,61.5\n",
+        "delivery_metrics_file": (
+            "restaurant,avg_delivery_time,on_time_rate,avg_distance,"
+            "deliveries_per_day\n"
+            "Taco Spot,20.5,90.0,4.2,6\nNoodle Bar,25.0,80.0,5.5,3\n"
+        ),
+        "feedback_file": (
+            "restaurant,date,delivery_rating,food_quality_rating,feedback_text\n"
+            "Taco Spot,2025-10-06,5,3,Good\nTaco Spot,2025-10-07,4,4,Fine\n"
+            "Taco Spot,2025-10-08,0,0,No rating\n"
+        ),
+        "rescue_meals_file": (
+            "restaurant,meal_name,original_price,rescue_price,quantity,expires_in\n"
+            "Noodle Bar,Veggie Ramen,12.49,7.49,4,1 hour\n"
+        ),
+    }
+    paths = {}
+    for name, content in files.items():
+        path = tmp_path / f"{name}.csv"
+        path.write_text(content)
+        paths[name] = str(path)
+    return paths
@@ -1,17 +1,35 @@
 """
 Test suite for Flask API application (app.py)
-Tests: 15 test cases
+Tests: 31 test cases
 """
 import pytest
 import sys
 import os
 from unittest.mock import patch, MagicMock
 import json
+import logging
+import time
+import threading
+import numpy as np
+import pandas as pd
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from api.app import app
+from api.app import (
+    app,
+    start_precompute_worker,
+    stop_precompute_worker,
+    CORRELATION_CACHE_KEY,
+)
+from analysis import model_store
+from api import metrics, result_cache
+from api.jobs import _regression
+from api.single_flight import SingleFlight
+from analysis.correlate_efficiency_waste import (
+    compute_correlations,
+    fit_regression_batch,
+)
 
 
 @pytest.fixture
@@ -241,6 +259,426 @@ class TestEfficiencyWasteCorrelation:
         assert data['data']['restaurants_analyzed'] == 25
 
 
+class TestCorrelationCache:
+    """Test caching and conditional requests on the correlation endpoint"""
+
+    @pytest.fixture
+    def inputs(self, tmp_path, monkeypatch):
+        """Point the cache at temporary input files."""
+        paths = [tmp_path / 'efficiency.csv', tmp_path / 'waste.csv']
+        for path in paths:
+            path.write_text('restaurant,value\nR1,1\n')
+        monkeypatch.setattr('api.app.ANALYSIS_INPUT_FILES', [str(p) for p in paths])
+        return paths
+
+    @staticmethod
+    def _mock_analysis(mock_load, mock_correlations, mock_regression, mock_summary):
+        mock_df = MagicMock()
+        mock_df.__len__ = MagicMock(return_value=10)
+        mock_load.return_value = mock_df
+        mock_correlations.return_value = {}
+        mock_regression.return_value = {}
+        mock_summary.return_value = {}
+
+    @patch('api.app.load_and_merge_data')
+    @patch('api.app.compute_correlations')
+    @patch('api.app.perform_regression_analysis')
+    @patch('api.app.get_correlation_summary')
+    def test_cache_lookups_and_stages_are_counted(
+        self,
+        mock_summary,
+        mock_regression,
+        mock_correlations,
+        mock_load,
+        client,
+        inputs,
+    ):
+        """Test that hits, misses and pipeline stage timings are recorded"""
+        self._mock_analysis(mock_load, mock_correlations, mock_regression, mock_summary)
+        hits = metrics.CACHE_REQUESTS.value('correlation', 'hit')
+        misses = metrics.CACHE_REQUESTS.value('correlation', 'miss')
+        stages = (
+            'load_and_merge_data',
+            'compute_correlations',
+            'perform_regression_analysis',
+        )
+        stage_counts = [metrics.STAGE_LATENCY.count(stage) for stage in stages]
+        client.get('/api/efficiency-waste-correlation')
+        client.get('/api/efficiency-waste-correlation')
+        client.get('/api/efficiency-waste-correlation')
+        assert metrics.CACHE_REQUESTS.value('correlation', 'miss') == misses + 1
+        assert metrics.CACHE_REQUESTS.value('correlation', 'hit') == hits + 2
+        assert [metrics.STAGE_LATENCY.count(stage) for stage in stages] == [
+            n + 1 for n in stage_counts
+        ]
+
+    @patch('api.app.load_and_merge_data')
+    @patch('api.app.compute_correlations')
+    @patch('api.app.perform_regression_analysis')
+    @patch('api.app.get_correlation_summary')
+    def test_repeat_requests_are_served_from_cache(
+        self,
+        mock_summary,
+        mock_regression,
+        mock_correlations,
+        mock_load,
+        client,
+        inputs,
+    ):
+        """Test that unchanged inputs reuse the cached body and ETag"""
+        self._mock_analysis(mock_load, mock_correlations, mock_regression, mock_summary)
+        first = client.get('/api/efficiency-waste-correlation')
+        second = client.get('/api/efficiency-waste-correlation')
+        assert mock_load.call_count == 1
+        assert first.status_code == second.status_code == 200
+        assert first.data == second.data
+        assert first.headers['ETag'] == second.headers['ETag']
+        assert not first.headers['ETag'].startswith('W/')
+
+    @patch('api.app.load_and_merge_data')
+    @patch('api.app.compute_correlations')
+    @patch('api.app.perform_regression_analysis')
+    @patch('api.app.get_correlation_summary')
+    def test_if_none_match_returns_304(
+        self,
+        mock_summary,
+        mock_regression,
+        mock_correlations,
+        mock_load,
+        client,
+        inputs,
+    ):
+        """Test that a matching ETag gets 304 with no body and a stale one gets 200"""
+        self._mock_analysis(mock_load, mock_correlations, mock_regression, mock_summary)
+        etag = client.get('/api/efficiency-waste-correlation').headers['ETag']
+        response = client.get(
+            '/api/efficiency-waste-correlation', headers={'If-None-Match': etag}
+        )
+        assert response.status_code == 304
+        assert response.data == b''
+        response = client.get(
+            '/api/efficiency-waste-correlation', headers={'If-None-Match': '"other"'}
+        )
+        assert response.status_code == 200
+
+    @patch('api.app.load_and_merge_data')
+    @patch('api.app.compute_correlations')
+    @patch('api.app.perform_regression_analysis')
+    @patch('api.app.get_correlation_summary')
+    def test_cache_follows_input_contents(
+        self,
+        mock_summary,
+        mock_regression,
+        mock_correlations,
+        mock_load,
+        client,
+        inputs,
+    ):
+        """Test that touching an input keeps the cache and editing it recomputes"""
+        self._mock_analysis(mock_load, mock_correlations, mock_regression, mock_summary)
+        first = client.get('/api/efficiency-waste-correlation')
+        stat = os.stat(inputs[0])
+        os.utime(inputs[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        client.get('/api/efficiency-waste-correlation')
+        assert mock_load.call_count == 1
+
+        inputs[1].write_text('restaurant,value\nR1,2\n')
+        mock_load.return_value.__len__.return_value = 11
+        second = client.get('/api/efficiency-waste-correlation')
+        assert mock_load.call_count == 2
+        assert json.loads(second.data)['data']['restaurants_analyzed'] == 11
+        assert second.headers['ETag'] != first.headers['ETag']
+
+    @patch('api.app.load_and_merge_data')
+    @patch('api.app.compute_correlations')
+    @patch('api.app.perform_regression_analysis')
+    @patch('api.app.get_correlation_summary')
+    def test_worker_serves_last_good_result_while_stale(
+        self,
+        mock_summary,
+        mock_regression,
+        mock_correlations,
+        mock_load,
+        client,
+        inputs,
+    ):
+        """Test stale-while-revalidate with the background worker running"""
+        self._mock_analysis(mock_load, mock_correlations, mock_regression, mock_summary)
+        worker = start_precompute_worker(interval=60)
+        try:
+            deadline = time.time() + 5
+            while (
+                result_cache.get(CORRELATION_CACHE_KEY) is None
+                and time.time() < deadline
+            ):
+                time.sleep(0.01)
+            fresh = json.loads(client.get('/api/efficiency-waste-correlation').data)
+            assert fresh['stale'] is False
+            assert 'computed_at' in fresh
+
+            inputs[0].write_text('restaurant,value\nR1,5\n')
+            stale = json.loads(client.get('/api/efficiency-waste-correlation').data)
+            assert stale['stale'] is True
+            assert stale['computed_at'] == fresh['computed_at']
+            assert mock_load.call_count == 1
+
+            assert worker.refresh() is True
+            assert (
+                json.loads(client.get('/api/efficiency-waste-correlation').data)[
+                    'stale'
+                ]
+                is False
+            )
+            assert mock_load.call_count == 2
+        finally:
+            stop_precompute_worker()
+
+    @patch('api.app.load_and_merge_data')
+    @patch('api.app.compute_correlations')
+    @patch('api.app.perform_regression_analysis')
+    @patch('api.app.get_correlation_summary')
+    def test_concurrent_requests_share_one_analysis(
+        self, mock_summary, mock_regression, mock_correlations, mock_load, inputs
+    ):
+        """Test that simultaneous cache misses run the analysis once"""
+        self._mock_analysis(mock_load, mock_correlations, mock_regression, mock_summary)
+        release = threading.Event()
+        loaded = mock_load.return_value
+        mock_load.side_effect = lambda **kwargs: release.wait(5) and loaded
+        statuses = []
+
+        def request_analysis():
+            with app.test_client() as thread_client:
+                statuses.append(
+                    thread_client.get('/api/efficiency-waste-correlation').status_code
+                )
+
+        threads = [threading.Thread(target=request_analysis) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        deadline = time.time() + 5
+        while mock_load.call_count == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        assert statuses == [200] * 4
+        assert mock_load.call_count == 1
+
+    @patch('api.app.load_and_merge_data')
+    def test_excess_analyses_are_shed_with_503(
+        self, mock_load, client, inputs, monkeypatch
+    ):
+        """Test load shedding when the concurrency bound is reached"""
+        monkeypatch.setattr('api.app._analysis_flight', SingleFlight(max_concurrent=0))
+        response = client.get('/api/efficiency-waste-correlation')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert json.loads(response.data)['status'] == 'error'
+        assert mock_load.call_count == 0
+
+
+class TestCorrelationSelection:
+    """Test metric, pair, method and section selection on the correlation endpoint"""
+
+    @staticmethod
+    def _merged_frame():
+        rng = np.random.default_rng(12)
+        n = 15
+        df = pd.DataFrame(
+            {
+                'restaurant': [f'R{i}' for i in range(n)],
+                'efficiency_score': rng.uniform(40, 90, n),
+                'avg_delivery_time': rng.uniform(10, 40, n),
+                'on_time_rate': rng.uniform(60, 100, n),
+            }
+        )
+        df['total_waste_lb'] = 200 - df['efficiency_score'] + rng.normal(0, 5, n)
+        df['total_waste_cost_usd'] = 3 * df['total_waste_lb'] + rng.normal(0, 5, n)
+        return df
+
+    @patch('api.app.perform_regression_analysis')
+    @patch('api.app.compute_correlations')
+    @patch('api.app.load_and_merge_data')
+    def test_pairs_and_method_compute_only_requested(
+        self, mock_load, mock_correlations, mock_regression, client
+    ):
+        """Test that a pair/method request computes just that pair"""
+        df = self._merged_frame()
+        mock_load.return_value = df
+        response = client.get(
+            '/api/efficiency-waste-correlation?pairs=efficiency_score_vs_total_waste_lb'
+            '&method=pearson&sections=correlations'
+        )
+        assert response.status_code == 200
+        data = json.loads(response.data)['data']
+        assert set(data) == {'correlations', 'restaurants_analyzed'}
+        assert list(data['correlations']) == ['efficiency_score_vs_total_waste_lb']
+        pair = data['correlations']['efficiency_score_vs_total_waste_lb']
+        assert set(pair) == {'pearson_correlation', 'pearson_p_value', 'n_samples'}
+        expected = compute_correlations(df)['efficiency_score_vs_total_waste_lb']
+        assert pair['pearson_correlation'] == pytest.approx(
+            expected['pearson_correlation']
+        )
+        mock_correlations.assert_not_called()
+        mock_regression.assert_not_called()
+
+    @patch('api.app.load_and_merge_data')
+    def test_metrics_restrict_correlations_and_regressions(self, mock_load, client):
+        """Test that metric selection limits pairs, regression targets and predictors"""
+        df = self._merged_frame()
+        mock_load.return_value = df
+        response = client.get(
+            '/api/efficiency-waste-correlation'
+            '?metrics=efficiency_score,avg_delivery_time,total_waste_cost_usd'
+        )
+        data = json.loads(response.data)['data']
+        assert sorted(data['correlations']) == [
+            'avg_delivery_time_vs_total_waste_cost_usd',
+            'efficiency_score_vs_total_waste_cost_usd',
+        ]
+        assert list(data['regressions']) == ['total_waste_cost_usd']
+        expected = fit_regression_batch(
+            df, ['efficiency_score', 'avg_delivery_time'], ['total_waste_cost_usd']
+        )
+        assert data['regressions']['total_waste_cost_usd'][
+            'coefficients'
+        ] == pytest.approx(expected['total_waste_cost_usd']['coefficients'])
+        assert set(data['summary']['correlations']) == set(data['correlations'])
+
+    @patch('api.app.load_and_merge_data')
+    def test_full_analysis_logs_instead_of_printing(
+        self, mock_load, client, capsys, caplog, tmp_path, monkeypatch
+    ):
+        """Test that the full analysis writes its summary to the app log, not stdout"""
+        path = tmp_path / 'efficiency.csv'
+        path.write_text('restaurant,value\nR1,1\n')
+        monkeypatch.setattr('api.app.ANALYSIS_INPUT_FILES', [str(path)])
+        mock_load.return_value = self._merged_frame()
+        with caplog.at_level(logging.INFO, logger=app.logger.name):
+            response = client.get('/api/efficiency-waste-correlation')
+        assert response.status_code == 200
+        mock_load.assert_called_once_with(verbose=False)
+        assert capsys.readouterr().out == ''
+        assert 'Correlation analysis: 15 restaurants, 6 pairs, 2 regressions' in (
+            caplog.text
+        )
+
+    def test_invalid_selection_returns_400(self, client):
+        """Test that unknown metrics, pairs, methods and sections are rejected"""
+        for query in [
+            'metrics=not_a_metric',
+            'pairs=a_vs_b',
+            'method=kendall',
+            'sections=charts',
+            'metrics=efficiency_score&pairs=efficiency_score_vs_total_waste_lb',
+        ]:
+            response = client.get('/api/efficiency-waste-correlation?' + query)
+            assert response.status_code == 400
+            assert json.loads(response.data)['status'] == 'error'
+
+
+class TestPredictWaste:
+    """Test batch waste prediction endpoint"""
+
+    @staticmethod
+    def _training_frame():
+        rng = np.random.default_rng(6)
+        n = 20
+        df = pd.DataFrame(
+            {
+                'efficiency_score': rng.uniform(20, 90, n),
+                'avg_delivery_time': rng.uniform(10, 40, n),
+            }
+        )
+        df['total_waste_lb'] = 100 - 0.5 * df['efficiency_score'] + rng.normal(0, 1, n)
+        return df
+
+    @staticmethod
+    def _train(df):
+        """Run the 'regression' job function on df; returns the fitted models."""
+        with patch('api.jobs.load_and_merge_data', return_value=df):
+            return _regression()['regressions']
+
+    def test_predict_waste_without_models_returns_404(self, client):
+        """Test that predictions need a stored model"""
+        response = client.post('/api/predict-waste', json={'profiles': []})
+        assert response.status_code == 404
+        assert json.loads(response.data)['status'] == 'error'
+
+    @patch('api.app.load_and_merge_data')
+    @patch('api.app.compute_correlations')
+    @patch('api.app.perform_regression_analysis')
+    def test_correlation_endpoint_stores_no_models(
+        self, mock_regression, mock_correlations, mock_load, client
+    ):
+        """Test that the read-only analysis endpoint writes nothing to disk"""
+        df = self._training_frame()
+        mock_load.return_value = df
+        mock_correlations.return_value = {}
+        mock_regression.return_value = fit_regression_batch(df)
+        assert client.get('/api/efficiency-waste-correlation').status_code == 200
+        assert not os.path.exists(model_store.REGRESSION_MODEL_FILE)
+        response = client.post('/api/predict-waste', json={'profiles': []})
+        assert response.status_code == 404
+        assert "'regression' job" in json.loads(response.data)['message']
+
+    def test_predict_waste_uses_models_from_regression_job(self, client):
+        """Test that the regression job stores the models predictions use"""
+        fits = self._train(self._training_frame())
+
+        profiles = [
+            {'efficiency_score': 50.0, 'avg_delivery_time': 20.0},
+            {'efficiency_score': 80.0, 'avg_delivery_time': 15.0},
+        ]
+        response = client.post('/api/predict-waste', json={'profiles': profiles})
+        assert response.status_code == 200
+        data = json.loads(response.data)['data']
+        fit = fits['total_waste_lb']
+        expected = [
+            fit['intercept'] + sum(p[k] * fit['coefficients'][k] for k in p)
+            for p in profiles
+        ]
+        assert data['predictions']['total_waste_lb'] == pytest.approx(expected)
+        assert data['model']['features'] == ['efficiency_score', 'avg_delivery_time']
+        assert data['n_profiles'] == 2
+
+    def test_predict_waste_accepts_compact_rows(self, client):
+        """Test the columns + rows request form"""
+        self._train(self._training_frame())
+
+        response = client.post(
+            '/api/predict-waste',
+            json={
+                'columns': ['avg_delivery_time', 'efficiency_score'],
+                'rows': [[20.0, 50.0], [15.0, 80.0], [30.0, 40.0]],
+            },
+        )
+        assert response.status_code == 200
+        assert (
+            len(json.loads(response.data)['data']['predictions']['total_waste_lb']) == 3
+        )
+
+    def test_predict_waste_rejects_bad_requests(self, client):
+        """Test that malformed bodies and unknown models return 400"""
+        self._train(self._training_frame())
+
+        assert client.post('/api/predict-waste', data='not json').status_code == 400
+        assert (
+            client.post(
+                '/api/predict-waste', json={'profiles': [{'efficiency_score': 1}]}
+            ).status_code
+            == 400
+        )
+        assert (
+            client.post(
+                '/api/predict-waste', json={'profiles': [], 'model': 'xgb'}
+            ).status_code
+            == 400
+        )
+
+
 class TestCORS:
     """Test CORS configuration"""
     
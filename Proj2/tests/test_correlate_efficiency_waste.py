@@ -1,6 +1,6 @@
 """
 Test suite for Efficiency-Waste Correlation Analysis (correlate_efficiency_waste.py)
-Tests: 13 test cases
+Tests: 34 test cases
 """
 import pytest
 import sys
@@ -17,8 +17,19 @@ from analysis.correlate_efficiency_waste import (
     load_and_merge_data,
     compute_correlations,
     perform_regression_analysis,
-    get_correlation_summary
+    get_correlation_summary,
+    compute_correlation_matrices,
+    compute_correlation_significance,
+    compute_segmented_analysis,
+    fit_regression_batch,
+    load_panel_data,
+    run_panel_analysis,
+    stratified_sample,
+    run_approximate_analysis,
+    _aggregate_waste,
+    _correlation_results,
 )
+from scipy.stats import pearsonr, spearmanr
 
 
 class TestLoadAndMergeData:
@@ -72,6 +83,132 @@ class TestLoadAndMergeData:
         assert result['total_waste_lb'].iloc[0] == 45.0
 
 
+class TestPanelAnalysis:
+    """Test restaurant x period panel mode"""
+
+    @staticmethod
+    def _write_sources(temp_dir):
+        rng = np.random.default_rng(5)
+        dates = ['2025-10-06', '2025-10-07', '2025-10-08', '2025-10-13']
+        n = 80
+        delivery = pd.DataFrame(
+            {
+                'order_id': [f'ORD-{i}' for i in range(n)],
+                'date': rng.choice(dates, n),
+                'restaurant': rng.choice(['R1', 'R2', 'R3'], n),
+                'distance_km': rng.uniform(1, 10, n),
+                'delivery_time_min': rng.integers(10, 45, n),
+                'delayed': rng.choice([True, False], n),
+            }
+        )
+        waste = pd.DataFrame(
+            {
+                'date': rng.choice(dates, n),
+                'restaurant': rng.choice(['R1', 'R2', 'R3'], n),
+                'quantity_lb': rng.uniform(1, 10, n),
+                'waste_per_serving_lb': rng.uniform(0.1, 1, n),
+                'est_cost_usd': rng.uniform(5, 50, n),
+                'delayed': rng.choice([True, False], n),
+            }
+        )
+        delivery_path = os.path.join(temp_dir, 'Delivery_Logs.csv')
+        waste_path = os.path.join(temp_dir, 'waste.csv')
+        delivery.to_csv(delivery_path, index=False)
+        waste.to_csv(waste_path, index=False)
+        return delivery, waste, delivery_path, waste_path
+
+    def test_load_panel_data_daily_grain(self):
+        """Test that the daily panel has one row per restaurant-day"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            delivery, waste, delivery_path, waste_path = self._write_sources(temp_dir)
+            with (
+                patch(
+                    'analysis.correlate_efficiency_waste.DELIVERY_FILE', delivery_path
+                ),
+                patch('analysis.correlate_efficiency_waste.WASTE_FILE', waste_path),
+            ):
+                panel = load_panel_data('D')
+        assert not panel.duplicated(['restaurant', 'period']).any()
+        row = panel[
+            (panel['restaurant'] == 'R1') & (panel['period'] == '2025-10-07')
+        ].iloc[0]
+        expected = waste[
+            (waste['restaurant'] == 'R1') & (waste['date'] == '2025-10-07')
+        ]
+        assert row['total_waste_lb'] == pytest.approx(expected['quantity_lb'].sum())
+        day = delivery[
+            (delivery['restaurant'] == 'R1') & (delivery['date'] == '2025-10-07')
+        ]
+        assert row['deliveries_per_day'] == len(day)
+        assert (
+            0 <= panel['efficiency_score'].min()
+            and panel['efficiency_score'].max() <= 100
+        )
+
+    def test_load_panel_data_weekly_grain(self):
+        """Test that weekly panels average deliveries over active days"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            delivery, _, delivery_path, waste_path = self._write_sources(temp_dir)
+            with (
+                patch(
+                    'analysis.correlate_efficiency_waste.DELIVERY_FILE', delivery_path
+                ),
+                patch('analysis.correlate_efficiency_waste.WASTE_FILE', waste_path),
+            ):
+                panel = load_panel_data('W')
+        assert panel['period'].nunique() == 2
+        week = delivery[
+            (delivery['restaurant'] == 'R2') & (delivery['date'] < '2025-10-13')
+        ]
+        row = panel[
+            (panel['restaurant'] == 'R2') & (panel['period'] == '2025-10-06')
+        ].iloc[0]
+        assert row['deliveries_per_day'] == pytest.approx(
+            len(week) / week['date'].nunique()
+        )
+
+    def test_load_panel_data_rejects_unknown_frequency(self):
+        """Test that only daily and weekly grains are accepted"""
+        with pytest.raises(ValueError):
+            load_panel_data('M')
+
+    def test_run_panel_analysis_with_fixed_effects(self):
+        """Test that fixed effects remove between-restaurant differences"""
+        rng = np.random.default_rng(9)
+        restaurants = np.repeat(['R1', 'R2', 'R3', 'R4'], 10)
+        level = np.repeat([0.0, 50.0, 100.0, 150.0], 10)
+        delivery_time = rng.uniform(10, 40, 40)
+        panel = pd.DataFrame(
+            {
+                'restaurant': restaurants,
+                'avg_delivery_time': delivery_time,
+                # Between-restaurant levels run opposite to the within-restaurant effect
+                'total_waste_lb': level
+                - 2 * delivery_time
+                - 0.05 * level * 10
+                + rng.normal(0, 1, 40),
+            }
+        )
+        panel['avg_delivery_time'] += level / 2
+        pooled = run_panel_analysis(panel_df=panel)
+        within = run_panel_analysis(fixed_effects=True, panel_df=panel)
+        pooled_coef = pooled['regressions']['total_waste_lb']['coefficients'][
+            'avg_delivery_time'
+        ]
+        within_coef = within['regressions']['total_waste_lb']['coefficients'][
+            'avg_delivery_time'
+        ]
+        assert pooled_coef > 0
+        assert within_coef == pytest.approx(-2, abs=0.2)
+        assert (
+            within['correlations']['avg_delivery_time_vs_total_waste_lb'][
+                'pearson_correlation'
+            ]
+            < -0.9
+        )
+        assert within['n_restaurants'] == 4
+
+
 class TestComputeCorrelations:
     """Test correlation computation"""
     
@@ -140,6 +277,340 @@ class TestComputeCorrelations:
         assert isinstance(result, dict)
 
 
+class TestCorrelationMatrices:
+    """Test the vectorized all-pairs correlation engine"""
+
+    @staticmethod
+    def _frame(missing=0.0, seed=0):
+        rng = np.random.default_rng(seed)
+        n = 40
+        df = pd.DataFrame(
+            {
+                'efficiency_score': rng.normal(60, 15, n),
+                'avg_delivery_time': rng.integers(10, 40, n).astype(float),
+                'on_time_rate': rng.uniform(60, 100, n),
+                'total_waste_lb': rng.normal(20, 5, n),
+                'total_waste_cost_usd': rng.integers(0, 8, n).astype(float),
+            }
+        )
+        if missing:
+            df = df.mask(rng.random(df.shape) < missing)
+        return df
+
+    def test_correlation_matrices_match_scipy_pairwise(self):
+        """Test that matrix results equal per-pair scipy results on complete data"""
+        df = self._frame()
+        result = compute_correlations(df)
+        for key, values in result.items():
+            eff, waste = key.split('_vs_')
+            assert values['pearson_correlation'] == pytest.approx(
+                pearsonr(df[eff], df[waste])[0]
+            )
+            assert values['pearson_p_value'] == pytest.approx(
+                pearsonr(df[eff], df[waste])[1]
+            )
+            assert values['spearman_correlation'] == pytest.approx(
+                spearmanr(df[eff], df[waste])[0]
+            )
+            assert values['spearman_p_value'] == pytest.approx(
+                spearmanr(df[eff], df[waste])[1]
+            )
+
+    def test_correlation_matrices_use_pairwise_complete_rows(self):
+        """Test that NaNs are dropped per pair, not across all metrics"""
+        df = self._frame(missing=0.25, seed=1)
+        result = compute_correlations(df)
+        assert len(result) == 6
+        for key, values in result.items():
+            eff, waste = key.split('_vs_')
+            data = df[[eff, waste]].dropna()
+            assert values['n_samples'] == len(data)
+            assert values['pearson_correlation'] == pytest.approx(
+                pearsonr(data[eff], data[waste])[0]
+            )
+            assert values['spearman_correlation'] == pytest.approx(
+                spearmanr(data[eff], data[waste])[0]
+            )
+            assert values['spearman_p_value'] == pytest.approx(
+                spearmanr(data[eff], data[waste])[1]
+            )
+
+    def test_correlation_matrices_shape_follows_available_metrics(self):
+        """Test that matrices only cover metrics present in the frame"""
+        matrices = compute_correlation_matrices(self._frame())
+        assert matrices['efficiency_metrics'] == [
+            'efficiency_score',
+            'avg_delivery_time',
+            'on_time_rate',
+        ]
+        assert matrices['waste_metrics'] == ['total_waste_lb', 'total_waste_cost_usd']
+        assert matrices['pearson'].shape == (3, 2)
+        assert (matrices['n'] == 40).all()
+
+    def test_correlation_matrices_compute_only_requested_methods(self):
+        """Test that a single method is computed alone and matches the full run"""
+        df = self._frame(missing=0.2, seed=3)
+        full = compute_correlation_matrices(df)
+        spearman = compute_correlation_matrices(
+            df, ['on_time_rate'], ['total_waste_lb'], methods=('spearman',)
+        )
+        assert 'pearson' not in spearman and 'pearson_p' not in spearman
+        assert spearman['spearman'][0, 0] == pytest.approx(full['spearman'][2, 0])
+        assert spearman['n'][0, 0] == full['n'][2, 0]
+        results = compute_correlations(df)
+        assert set(
+            _correlation_results(spearman)['on_time_rate_vs_total_waste_lb']
+        ) == {'spearman_correlation', 'spearman_p_value', 'n_samples'}
+        assert _correlation_results(spearman)['on_time_rate_vs_total_waste_lb'][
+            'spearman_p_value'
+        ] == pytest.approx(
+            results['on_time_rate_vs_total_waste_lb']['spearman_p_value']
+        )
+
+
+class TestCorrelationSignificance:
+    """Test permutation and bootstrap significance testing"""
+
+    @staticmethod
+    def _frame():
+        rng = np.random.default_rng(3)
+        score = rng.uniform(40, 90, 12)
+        return pd.DataFrame(
+            {
+                'efficiency_score': score,
+                'total_waste_lb': 50 - 0.5 * score + rng.normal(0, 1, 12),
+                'total_waste_cost_usd': rng.normal(100, 10, 12),
+            }
+        )
+
+    def test_significance_detects_strong_and_null_correlations(self):
+        """Test that permutation p-values separate a real effect from noise"""
+        result = compute_correlation_significance(
+            self._frame(), n_permutations=2000, n_bootstrap=500, seed=0
+        )
+        strong = result['efficiency_score_vs_total_waste_lb']
+        assert strong['pearson_permutation_p_value'] < 0.01
+        assert strong['spearman_permutation_p_value'] < 0.01
+        assert (
+            strong['pearson_ci_lower']
+            <= strong['pearson_correlation']
+            <= strong['pearson_ci_upper']
+        )
+        assert strong['pearson_ci_upper'] < 0
+        noise = result['efficiency_score_vs_total_waste_cost_usd']
+        assert noise['pearson_permutation_p_value'] > 0.01
+
+    def test_significance_p_values_are_bounded(self):
+        """Test that permutation p-values are in (0, 1]"""
+        result = compute_correlation_significance(
+            self._frame(), n_permutations=100, n_bootstrap=50, seed=1
+        )
+        for values in result.values():
+            assert 0 < values['pearson_permutation_p_value'] <= 1
+            assert values['n_permutations'] == 100
+
+    def test_significance_of_constant_column_is_undefined(self):
+        """Test that an undefined correlation gets no p-value or interval"""
+        df = self._frame()
+        df['deliveries_per_day'] = 5.0
+        result = compute_correlation_significance(
+            df, n_permutations=200, n_bootstrap=50, seed=2
+        )
+        constant = result['deliveries_per_day_vs_total_waste_lb']
+        for key in (
+            'pearson_correlation',
+            'pearson_permutation_p_value',
+            'pearson_ci_lower',
+            'pearson_ci_upper',
+            'spearman_permutation_p_value',
+            'spearman_ci_upper',
+        ):
+            assert np.isnan(constant[key])
+        defined = result['efficiency_score_vs_total_waste_lb']
+        assert defined['pearson_permutation_p_value'] < 0.05
+
+    def test_significance_parallel_matches_serial(self):
+        """Test that process-pool chunks reproduce the serial result for a seed"""
+        df = self._frame()
+        serial = compute_correlation_significance(
+            df, n_permutations=150000, n_bootstrap=200, seed=5, n_jobs=1
+        )
+        parallel = compute_correlation_significance(
+            df, n_permutations=150000, n_bootstrap=200, seed=5, n_jobs=2
+        )
+        assert serial == parallel
+
+
+class TestSegmentedAnalysis:
+    """Test per-segment correlation and regression"""
+
+    @staticmethod
+    def _frame(seed=21):
+        rng = np.random.default_rng(seed)
+        n = 120
+        df = pd.DataFrame(
+            {
+                'cuisine': rng.choice(
+                    ['Italian', 'Asian', 'BBQ', 'Deli'], n, p=[0.4, 0.3, 0.25, 0.05]
+                ),
+                'avg_delivery_time': rng.uniform(10, 40, n),
+                'on_time_rate': rng.uniform(60, 100, n),
+                'total_waste_cost_usd': rng.normal(100, 10, n),
+            }
+        )
+        df['total_waste_lb'] = 5 + 0.8 * df['avg_delivery_time'] + rng.normal(0, 1, n)
+        return df
+
+    def test_segmented_analysis_matches_per_segment_results(self):
+        """Test that each segment equals running the suite on that segment alone"""
+        df = self._frame()
+        df.loc[df.sample(frac=0.1, random_state=0).index, 'on_time_rate'] = np.nan
+        result = compute_segmented_analysis(df, 'cuisine')
+        assert sorted(result) == sorted(df['cuisine'].unique())
+        for cuisine, group in df.groupby('cuisine'):
+            segment = result[cuisine]
+            assert segment['n_samples'] == len(group)
+            expected = compute_correlations(group)
+            assert segment['correlations'].keys() == expected.keys()
+            for key, values in expected.items():
+                assert segment['correlations'][key] == pytest.approx(values)
+            expected_fit = fit_regression_batch(group.dropna())
+            assert segment['regressions'].keys() == expected_fit.keys()
+            for target, fit in expected_fit.items():
+                assert segment['regressions'][target]['coefficients'] == pytest.approx(
+                    fit['coefficients']
+                )
+                assert segment['regressions'][target]['std_errors'] == pytest.approx(
+                    fit['std_errors']
+                )
+                assert segment['regressions'][target]['r2_score'] == pytest.approx(
+                    fit['r2_score']
+                )
+
+    def test_segmented_analysis_skips_small_segments(self):
+        """Test that tiny segments report no fits and NaN segments are dropped"""
+        df = self._frame()
+        df.loc[0, 'cuisine'] = None
+        df.loc[df['cuisine'] == 'Deli', 'cuisine'] = ['Deli', 'Deli'] + ['BBQ'] * (
+            (df['cuisine'] == 'Deli').sum() - 2
+        )
+        result = compute_segmented_analysis(df, 'cuisine')
+        assert 'None' not in result and 'nan' not in result
+        assert result['Deli'] == {'n_samples': 2, 'correlations': {}, 'regressions': {}}
+        with pytest.raises(KeyError):
+            compute_segmented_analysis(df, 'zip_code')
+
+    def test_segmented_analysis_parallel_matches_serial(self):
+        """Test that spreading segments over worker processes gives the same result"""
+        df = self._frame()
+        serial = compute_segmented_analysis(df, 'cuisine', n_jobs=1)
+        parallel = compute_segmented_analysis(df, 'cuisine', n_jobs=2)
+        assert serial == parallel
+
+
+class TestApproximateAnalysis:
+    """Test stratified sampling and approximate analysis with error bounds"""
+
+    @staticmethod
+    def _frames(seed=5):
+        rng = np.random.default_rng(seed)
+        restaurants = [f'R{i}' for i in range(12)]
+        efficiency_df = pd.DataFrame(
+            {
+                'restaurant': restaurants,
+                'efficiency_score': rng.uniform(50, 90, 12),
+                'avg_delivery_time': rng.uniform(10, 40, 12),
+                'on_time_rate': rng.uniform(60, 100, 12),
+            }
+        )
+        n = 3000
+        waste_df = pd.DataFrame(
+            {
+                'restaurant': rng.choice(restaurants, n),
+                'date': rng.choice(
+                    pd.date_range('2025-10-01', periods=7).strftime('%Y-%m-%d'), n
+                ),
+                'quantity_lb': rng.gamma(2, 3, n),
+                'waste_per_serving_lb': rng.uniform(0.1, 1, n),
+                'est_cost_usd': rng.gamma(2, 5, n),
+                'delayed': rng.random(n) < 0.2,
+            }
+        )
+        return efficiency_df, waste_df
+
+    def test_stratified_sample_weights_and_groups(self):
+        """Test allocation, design weights and balanced jackknife groups"""
+        _, waste_df = self._frames()
+        sample = stratified_sample(waste_df, fraction=0.1, n_replicates=5, seed=0)
+        sizes = waste_df.groupby(['restaurant', 'date']).size()
+        taken = sample.groupby(['restaurant', 'date']).size()
+        assert (taken >= np.minimum(2, sizes)).all()
+        weight_totals = sample.groupby(['restaurant', 'date'])['sampling_weight'].sum()
+        assert weight_totals.to_numpy() == pytest.approx(
+            sizes.loc[weight_totals.index].to_numpy()
+        )
+        groups = sample.groupby(['restaurant', 'date'])['replicate_group'].agg(
+            lambda g: np.ptp(np.bincount(g, minlength=5))
+        )
+        assert (groups <= 1).all()
+        assert not sample.index.duplicated().any()
+        with pytest.raises(ValueError):
+            stratified_sample(waste_df, fraction=0.1, size=100)
+        with pytest.raises(ValueError):
+            stratified_sample(waste_df, fraction=1.5)
+
+    def test_approximate_analysis_full_sample_is_exact(self):
+        """Test that sampling every record reproduces the exact analysis"""
+        efficiency_df, waste_df = self._frames()
+        result = run_approximate_analysis(
+            fraction=1.0, seed=1, efficiency_df=efficiency_df, waste_df=waste_df
+        )
+        merged = pd.merge(
+            efficiency_df, _aggregate_waste(waste_df, ['restaurant']), on='restaurant'
+        )
+        exact = compute_correlations(merged)
+        assert result['sample_size'] == result['population_size'] == len(waste_df)
+        for key, values in exact.items():
+            assert result['correlations'][key]['pearson_correlation'] == pytest.approx(
+                values['pearson_correlation']
+            )
+            assert result['correlations'][key][
+                'pearson_correlation_se'
+            ] == pytest.approx(0, abs=1e-9)
+        exact_fit = fit_regression_batch(merged)
+        for target, fit in exact_fit.items():
+            approx = result['regressions'][target]
+            assert approx['coefficients'] == pytest.approx(fit['coefficients'])
+            assert approx['intercept_se'] == pytest.approx(0, abs=1e-6)
+
+    def test_approximate_analysis_reports_intervals(self):
+        """Test that a partial sample reports errors and intervals"""
+        efficiency_df, waste_df = self._frames()
+        result = run_approximate_analysis(
+            fraction=0.3, seed=2, efficiency_df=efficiency_df, waste_df=waste_df
+        )
+        assert 0.25 < result['sampling_fraction'] < 0.4
+        for values in result['correlations'].values():
+            assert values['pearson_correlation_se'] > 0
+            assert (
+                -1
+                <= values['pearson_correlation_ci_lower']
+                <= values['pearson_correlation']
+            )
+            assert (
+                values['pearson_correlation']
+                <= values['pearson_correlation_ci_upper']
+                <= 1
+            )
+        for fit in result['regressions'].values():
+            for pred, coef in fit['coefficients'].items():
+                assert (
+                    fit['coefficient_ci_lower'][pred]
+                    <= coef
+                    <= fit['coefficient_ci_upper'][pred]
+                )
+
+
 class TestPerformRegressionAnalysis:
     """Test regression analysis"""
     
@@ -198,6 +669,68 @@ class TestPerformRegressionAnalysis:
         assert isinstance(result, dict)
 
 
+class TestFitRegressionBatch:
+    """Test the batched multi-target regression solver"""
+
+    @staticmethod
+    def _frame():
+        rng = np.random.default_rng(11)
+        n = 30
+        df = pd.DataFrame(
+            {
+                'avg_delivery_time': rng.uniform(10, 40, n),
+                'on_time_rate': rng.uniform(60, 100, n),
+                'avg_distance': rng.uniform(1, 10, n),
+            }
+        )
+        df['total_waste_lb'] = 5 + 0.8 * df['avg_delivery_time'] + rng.normal(0, 1, n)
+        df['total_waste_cost_usd'] = 3 * df['avg_distance'] + rng.normal(0, 2, n)
+        return df
+
+    def test_fit_regression_batch_matches_ols(self):
+        """Test coefficients, R² and standard errors against the normal equations"""
+        df = self._frame()
+        result = fit_regression_batch(df)
+        predictors = ['avg_delivery_time', 'on_time_rate', 'avg_distance']
+        X = np.column_stack([np.ones(len(df)), df[predictors].to_numpy()])
+        y = df['total_waste_lb'].to_numpy()
+        beta = np.linalg.solve(X.T @ X, X.T @ y)
+        resid = y - X @ beta
+        sigma2 = resid @ resid / (len(df) - X.shape[1])
+        se = np.sqrt(np.diag(np.linalg.inv(X.T @ X)) * sigma2)
+        fit = result['total_waste_lb']
+        assert fit['intercept'] == pytest.approx(beta[0])
+        assert [fit['coefficients'][p] for p in predictors] == pytest.approx(beta[1:])
+        assert [
+            fit['std_errors'][k] for k in ['intercept'] + predictors
+        ] == pytest.approx(se)
+        assert fit['r2_score'] == pytest.approx(
+            1 - resid @ resid / ((y - y.mean()) ** 2).sum()
+        )
+        assert fit['p_values']['avg_delivery_time'] < 0.001
+        assert fit['adjusted_r2_score'] < fit['r2_score']
+
+    def test_fit_regression_batch_handles_target_missing_patterns(self):
+        """Test that each target only drops its own missing rows"""
+        df = self._frame()
+        df.loc[:4, 'total_waste_cost_usd'] = np.nan
+        result = fit_regression_batch(df)
+        assert result['total_waste_lb']['n_samples'] == 30
+        assert result['total_waste_cost_usd']['n_samples'] == 25
+        assert list(result) == ['total_waste_lb', 'total_waste_cost_usd']
+
+    def test_fit_regression_batch_flags_collinear_predictors(self):
+        """Test that an exactly collinear design gets infinite VIFs and NaN errors"""
+        df = self._frame()
+        df['efficiency_score'] = 100 - 2 * df['avg_delivery_time']
+        fit = fit_regression_batch(df)['total_waste_lb']
+        assert fit['rank'] == 3
+        assert np.isinf(fit['vif']['efficiency_score'])
+        assert np.isinf(fit['vif']['avg_delivery_time'])
+        assert np.isfinite(fit['vif']['on_time_rate'])
+        assert np.isnan(fit['std_errors']['efficiency_score'])
+
+
 class TestGetCorrelationSummary:
     """Test correlation summary generation"""
     
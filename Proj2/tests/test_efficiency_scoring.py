@@ -1,18 +1,28 @@
 """
 Test suite for Efficiency Scoring (efficiency_scoring.py)
-Tests: 10 test cases
+Tests: 23 test cases
 """
 import pytest
 import sys
 import os
 import pandas as pd
+import numpy as np
 import tempfile
 from unittest.mock import patch
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from efficiency_scoring import compute_efficiency_scores
+from efficiency_scoring import (
+    compute_efficiency_scores,
+    score_efficiency,
+    IncrementalEfficiencyScorer,
+    score_weight_profiles,
+    sample_weight_simplex,
+    rank_stability,
+    bootstrap_efficiency_scores,
+    WEIGHT_PROFILES,
+)
 
 
 class TestComputeEfficiencyScores:
@@ -234,4 +244,221 @@ class TestComputeEfficiencyScores:
         finally:
             for p in [temp_path, meta_path, output_path]:
                 if os.path.exists(p):
-                    os.unlink(p)
\ No newline at end of file
+                    os.unlink(p)
+
+
+class TestScoreEfficiency:
+    """Test in-memory efficiency scoring"""
+
+    def test_score_efficiency_returns_scored_dataframe(self):
+        """Test that score_efficiency scores a DataFrame without touching disk"""
+        metrics = pd.DataFrame(
+            {
+                'restaurant': ['R1', 'R2'],
+                'on_time_rate': [50.0, 100.0],
+                'avg_delivery_time': [30.0, 10.0],
+                'avg_distance': [10.0, 2.0],
+                'deliveries_per_day': [5.0, 20.0],
+            }
+        )
+        result = score_efficiency(metrics)
+        assert list(result['efficiency_score']) == [0.0, 100.0]
+        assert 'efficiency_score' not in metrics.columns
+
+    def test_score_efficiency_merges_metadata(self):
+        """Test that score_efficiency left-joins metadata when given"""
+        metrics = pd.DataFrame(
+            {
+                'restaurant': ['R1'],
+                'on_time_rate': [85.0],
+                'avg_delivery_time': [20.0],
+                'avg_distance': [5.0],
+                'deliveries_per_day': [10.0],
+            }
+        )
+        meta = pd.DataFrame({'restaurant': ['R1'], 'cuisine': ['Italian']})
+        result = score_efficiency(metrics, meta)
+        assert result['cuisine'].iloc[0] == 'Italian'
+
+    def test_score_efficiency_matches_file_based_scoring(self):
+        """Test that the file-based entry point produces the in-memory scores"""
+        metrics = pd.DataFrame(
+            {
+                'restaurant': ['R1', 'R2', 'R3'],
+                'on_time_rate': [85.0, 90.0, 70.0],
+                'avg_delivery_time': [20.0, 15.0, 25.0],
+                'avg_distance': [5.0, 3.0, 4.0],
+                'deliveries_per_day': [10.0, 15.0, 12.0],
+            }
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            metrics_path = os.path.join(temp_dir, 'metrics.csv')
+            meta_path = os.path.join(temp_dir, 'meta.csv')
+            output_path = os.path.join(temp_dir, 'out.csv')
+            metrics.to_csv(metrics_path, index=False)
+            pd.DataFrame({'restaurant': ['R1', 'R2', 'R3']}).to_csv(
+                meta_path, index=False
+            )
+            returned = compute_efficiency_scores(metrics_path, meta_path, output_path)
+            written = pd.read_csv(output_path)
+        expected = score_efficiency(metrics)
+        assert np.allclose(returned['efficiency_score'], expected['efficiency_score'])
+        assert np.allclose(written['efficiency_score'], expected['efficiency_score'])
+
+
+class TestIncrementalEfficiencyScorer:
+    """Test incremental rescoring of single-restaurant updates"""
+
+    @staticmethod
+    def _metrics():
+        return pd.DataFrame(
+            {
+                'restaurant': ['R1', 'R2', 'R3', 'R4'],
+                'on_time_rate': [85.0, 90.0, 70.0, 60.0],
+                'avg_delivery_time': [20.0, 15.0, 25.0, 30.0],
+                'avg_distance': [5.0, 3.0, 4.0, 6.0],
+                'deliveries_per_day': [10.0, 15.0, 12.0, 8.0],
+            }
+        )
+
+    def test_incremental_scorer_matches_batch_scoring(self):
+        """Test that initial scores equal score_efficiency output"""
+        metrics = self._metrics()
+        scorer = IncrementalEfficiencyScorer(metrics)
+        expected = score_efficiency(metrics)['efficiency_score']
+        assert np.allclose(scorer.scores()['efficiency_score'], expected)
+
+    def test_incremental_update_inside_bounds_skips_full_rescore(self):
+        """Test that an update within the current min/max only rescores one row"""
+        metrics = self._metrics()
+        scorer = IncrementalEfficiencyScorer(metrics)
+        new_score = scorer.update('R3', on_time_rate=75.0, avg_delivery_time=22.0)
+        metrics.loc[2, ['on_time_rate', 'avg_delivery_time']] = [75.0, 22.0]
+        expected = score_efficiency(metrics)['efficiency_score']
+        assert scorer.full_rescores == 1
+        assert new_score == pytest.approx(expected.iloc[2])
+        assert np.allclose(scorer.scores()['efficiency_score'], expected)
+
+    def test_incremental_update_moving_bounds_rescores_all(self):
+        """Test that moving a column min/max triggers a vectorized rescore"""
+        metrics = self._metrics()
+        scorer = IncrementalEfficiencyScorer(metrics)
+        scorer.update('R1', avg_distance=12.0)
+        scorer.update(
+            'R5',
+            on_time_rate=95.0,
+            avg_delivery_time=12.0,
+            avg_distance=2.0,
+            deliveries_per_day=20.0,
+        )
+        metrics.loc[0, 'avg_distance'] = 12.0
+        metrics.loc[4] = ['R5', 95.0, 12.0, 2.0, 20.0]
+        expected = score_efficiency(metrics)['efficiency_score']
+        assert scorer.full_rescores == 3
+        assert np.allclose(scorer.scores()['efficiency_score'], expected)
+
+
+class TestWeightProfiles:
+    """Test what-if scoring under alternative weightings"""
+
+    @staticmethod
+    def _metrics():
+        return pd.DataFrame(
+            {
+                'restaurant': ['R1', 'R2', 'R3'],
+                'on_time_rate': [85.0, 90.0, 70.0],
+                'avg_delivery_time': [20.0, 15.0, 25.0],
+                'avg_distance': [5.0, 3.0, 4.0],
+                'deliveries_per_day': [10.0, 15.0, 22.0],
+            }
+        )
+
+    def test_score_weight_profiles_default_matches_formula(self):
+        """Test that the default profile column equals score_efficiency"""
+        metrics = self._metrics()
+        scores, ranks = score_weight_profiles(metrics)
+        assert list(scores.columns) == list(WEIGHT_PROFILES)
+        assert np.allclose(
+            scores['default'], score_efficiency(metrics)['efficiency_score']
+        )
+        assert sorted(ranks['default']) == [1, 2, 3]
+
+    def test_score_efficiency_accepts_named_profile(self):
+        """Test that score_efficiency can use a named weight profile"""
+        metrics = self._metrics()
+        scores, _ = score_weight_profiles(metrics, ['volume_first'])
+        result = score_efficiency(metrics, weights='volume_first')
+        assert np.allclose(result['efficiency_score'], scores['volume_first'])
+        with pytest.raises(KeyError):
+            score_efficiency(metrics, weights='unknown')
+
+    def test_sample_weight_simplex_rows_sum_to_one(self):
+        """Test that sampled weights lie on the simplex"""
+        weights = sample_weight_simplex(100, seed=0)
+        assert weights.shape == (100, 4)
+        assert np.allclose(weights.sum(axis=1), 1.0)
+        assert (weights >= 0).all()
+
+    def test_rank_stability_summarizes_rank_distribution(self):
+        """Test that rank_stability reports rank spread per restaurant"""
+        result = rank_stability(self._metrics(), n_samples=200, seed=0)
+        assert len(result) == 3
+        assert (result['best_rank'] <= result['mean_rank']).all()
+        assert (result['mean_rank'] <= result['worst_rank']).all()
+        assert result['top_rank_share'].sum() == pytest.approx(1.0)
+
+
+class TestBootstrapEfficiencyScores:
+    """Test bootstrap confidence intervals for efficiency scores"""
+
+    @staticmethod
+    def _logs():
+        rng = np.random.default_rng(7)
+        n = 120
+        return pd.DataFrame(
+            {
+                'order_id': [f'ORD-{i}' for i in range(n)],
+                'date': rng.choice(['2025-10-06', '2025-10-07', '2025-10-08'], n),
+                'restaurant': rng.choice(['R1', 'R2', 'R3', 'R4'], n),
+                'distance_km': rng.uniform(1, 10, n).round(2),
+                'delivery_time_min': rng.integers(10, 45, n),
+                'delayed': rng.choice(['True', 'False'], n),
+            }
+        )
+
+    def test_bootstrap_point_estimate_matches_metrics_pipeline(self):
+        """Test that the point estimate is the score of the observed logs"""
+        logs = self._logs()
+        result = bootstrap_efficiency_scores(logs, n_replicates=50, seed=0)
+        delayed = logs['delayed'] == 'True'
+        metrics = (
+            logs.assign(on_time=~delayed)
+            .groupby('restaurant')
+            .agg(
+                avg_delivery_time=('delivery_time_min', 'mean'),
+                on_time_rate=('on_time', 'mean'),
+                avg_distance=('distance_km', 'mean'),
+                deliveries_per_day=('date', lambda x: len(x) / x.nunique()),
+            )
+            .reset_index()
+        )
+        metrics['on_time_rate'] *= 100
+        expected = score_efficiency(metrics)['efficiency_score']
+        assert list(result['restaurant']) == list(metrics['restaurant'])
+        assert np.allclose(result['efficiency_score'], expected)
+
+    def test_bootstrap_interval_bounds_are_ordered(self):
+        """Test that CI bounds are ordered and within the 0-100 score range"""
+        result = bootstrap_efficiency_scores(self._logs(), n_replicates=200, seed=0)
+        assert (result['ci_lower'] <= result['ci_upper']).all()
+        assert result['ci_lower'].min() >= 0
+        assert result['ci_upper'].max() <= 100
+        assert result['n_deliveries'].sum() == 120
+
+    def test_bootstrap_parallel_matches_serial(self):
+        """Test that worker processes reproduce the serial result for a seed"""
+        logs = pd.concat([self._logs()] * 200, ignore_index=True)
+        serial = bootstrap_efficiency_scores(logs, n_replicates=300, seed=3, n_jobs=1)
+        parallel = bootstrap_efficiency_scores(logs, n_replicates=300, seed=3, n_jobs=2)
+        assert np.allclose(serial['ci_lower'], parallel['ci_lower'])
+        assert np.allclose(serial['ci_upper'], parallel['ci_upper'])
@@ -0,0 +1,86 @@
+"""
+Test suite for API cold start (import time of api/app.py)
+Tests: 4 test cases
+"""
+
+import sys
+import os
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "..", "src")
+
+# Modules only some analyses need; importing the API must not load them
+HEAVY_MODULES = ("scipy", "sklearn", "matplotlib", "seaborn")
+# Cumulative import time budget of api.app in seconds (best of
+# IMPORT_TIME_RUNS cold starts). The default leaves headroom for slow CI
+# machines; set IMPORT_TIME_BUDGET to tighten or loosen it
+IMPORT_TIME_BUDGET = float(os.environ.get("IMPORT_TIME_BUDGET", 2.0))
+IMPORT_TIME_RUNS = 3
+
+
+def _run(code):
+    """Run code in a fresh interpreter from src; returns (stdout, stderr)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout, result.stderr
+
+
+def _import_times(stderr):
+    """Parse -X importtime output into {module: cumulative microseconds}."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def _heavy(modules):
+    return sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+
+
+class TestColdStart:
+    """Test what importing and starting the API costs"""
+
+    def test_api_import_skips_heavy_modules(self):
+        """Test that importing the API loads none of the heavy analysis modules"""
+        _, stderr = _run("import api.app")
+        assert _heavy(_import_times(stderr)) == []
+
+    def test_api_import_within_budget(self):
+        """Test that importing the API stays under the cold-start budget"""
+        best = min(
+            _import_times(_run("import api.app")[1])["api.app"]
+            for _ in range(IMPORT_TIME_RUNS)
+        )
+        assert best / 1e6 < IMPORT_TIME_BUDGET
+
+    def test_light_endpoints_skip_heavy_modules(self):
+        """Test that health and leaderboard requests do not load them either"""
+        stdout, _ = _run(
+            "import sys\n"
+            "from api.app import app\n"
+            "client = app.test_client()\n"
+            'client.get("/api/health")\n'
+            'client.get("/api/restaurant-points")\n'
+            'print(",".join(sorted(sys.modules)))'
+        )
+        assert _heavy(stdout.strip().split(",")) == []
+
+    def test_scipy_is_imported_on_first_use(self):
+        """Test that the analysis still gets scipy when it needs p-values"""
+        stdout, _ = _run(
+            "import sys\n"
+            "import numpy as np\n"
+            "from analysis.correlate_efficiency_waste import _correlation_p_values\n"
+            'before = "scipy.stats" in sys.modules\n'
+            "p = _correlation_p_values(np.array([0.5]), np.array([10]))\n"
+            'print(before, "scipy.stats" in sys.modules, round(float(p[0]), 4))'
+        )
+        assert stdout.split() == ["False", "True", "0.1411"]
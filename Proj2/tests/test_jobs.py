@@ -0,0 +1,232 @@
+"""
+Test suite for Analysis Jobs (jobs.py)
+Tests: 10 test cases
+"""
+
+import pytest
+import sys
+import os
+import json
+import time
+import subprocess
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from api.jobs import JobManager, _bootstrap, _model_selection, validate_params
+from api.responses import to_jsonable
+
+
+def _square(x=2.0):
+    return {"value": np.float64(x) ** 2, "table": pd.DataFrame({"a": [1.0, np.nan]})}
+
+
+def _fail():
+    raise ValueError("bad data")
+
+
+TOY_ANALYSES = {
+    "square": (_square, {"x": {"type": float, "min": -10.0, "max": 10.0}}),
+    "fail": (_fail, {}),
+}
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """A job manager over toy analyses and one input file."""
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("a\n1\n")
+    manager = JobManager(
+        job_dir=str(tmp_path / "jobs"),
+        max_workers=1,
+        analyses=TOY_ANALYSES,
+        input_paths=[str(input_file)],
+    )
+    manager.input_file = input_file
+    yield manager
+    manager.shutdown()
+
+
+def _wait(manager, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while (
+        manager.status(job_id)["status"] in ("queued", "running")
+        and time.time() < deadline
+    ):
+        time.sleep(0.02)
+    return manager.status(job_id)
+
+
+class TestValidateParams:
+    """Test job parameter validation"""
+
+    def test_validate_params_checks_names_and_types(self):
+        """Test rejection of unknown analyses, parameters and types"""
+        assert validate_params("square", {"x": 3}, TOY_ANALYSES) == {"x": 3.0}
+        assert validate_params("square", None, TOY_ANALYSES) == {}
+        with pytest.raises(ValueError):
+            validate_params("cube", {}, TOY_ANALYSES)
+        with pytest.raises(ValueError):
+            validate_params("square", {"y": 1}, TOY_ANALYSES)
+        with pytest.raises(ValueError):
+            validate_params("square", {"x": "three"}, TOY_ANALYSES)
+        with pytest.raises(ValueError):
+            validate_params("square", {"x": True}, TOY_ANALYSES)
+        assert validate_params("panel", {"freq": "W", "fixed_effects": True}) == {
+            "freq": "W",
+            "fixed_effects": True,
+        }
+
+    def test_validate_params_checks_bounds(self):
+        """Test that out-of-range values are rejected before a job is started"""
+        assert validate_params("square", {"x": 10}, TOY_ANALYSES) == {"x": 10.0}
+        with pytest.raises(ValueError, match="between"):
+            validate_params("square", {"x": 10.5}, TOY_ANALYSES)
+        assert validate_params("significance", {"n_permutations": 1000}) == {
+            "n_permutations": 1000
+        }
+        for analysis, params in [
+            ("significance", {"n_permutations": 10**9}),
+            ("significance", {"n_bootstrap": 0}),
+            ("model_selection", {"n_alphas": 10**6}),
+            ("approximate", {"n_replicates": 10**7}),
+            ("approximate", {"fraction": 0.0}),
+            ("bootstrap", {"n_replicates": 10**6}),
+            ("bootstrap", {"n_jobs": 0}),
+        ]:
+            with pytest.raises(ValueError):
+                validate_params(analysis, params)
+
+    def test_validate_params_checks_choices(self):
+        """Test that string parameters must be one of the analysis's values"""
+        assert validate_params("lag", {"waste_metric": "total_waste_cost_usd"}) == {
+            "waste_metric": "total_waste_cost_usd"
+        }
+        for analysis, params in [
+            ("segmented", {"segment_col": "owner"}),
+            ("panel", {"freq": "M"}),
+            ("lag", {"efficiency_metric": "speed"}),
+            ("model_selection", {"group_col": "restaurant"}),
+            ("bootstrap", {"weights": "fastest"}),
+        ]:
+            with pytest.raises(ValueError, match="one of"):
+                validate_params(analysis, params)
+
+    def test_to_jsonable_converts_numpy_and_pandas(self):
+        """Test that analysis output becomes strict JSON"""
+        converted = to_jsonable(_square(3))
+        assert json.loads(json.dumps(converted, allow_nan=False)) == {
+            "value": 9.0,
+            "table": {"index": [0, 1], "columns": ["a"], "data": [[1.0], [None]]},
+        }
+
+
+class TestJobManager:
+    """Test running, deduplicating and tracking jobs"""
+
+    def test_job_runs_in_pool_and_stores_result(self, manager):
+        """Test that a job writes its result file and identical submissions dedupe"""
+        record, created = manager.submit("square", {"x": 3})
+        assert created and record["status"] == "queued"
+        status = _wait(manager, record["job_id"])
+        assert status["status"] == "succeeded"
+        assert status["started_at"] and status["finished_at"]
+        with open(manager.result_path(record["job_id"])) as f:
+            result = json.load(f)
+        assert result["data"]["value"] == 9.0
+        assert result["job_id"] == record["job_id"]
+
+        again, created = manager.submit("square", {"x": 3.0})
+        assert not created and again["job_id"] == record["job_id"]
+        other, created = manager.submit("square", {"x": 4})
+        assert created and other["job_id"] != record["job_id"]
+        # New input data means a new job for the same parameters
+        manager.input_file.write_text("a\n2\n")
+        changed, created = manager.submit("square", {"x": 3})
+        assert created and changed["job_id"] != record["job_id"]
+
+    def test_failed_job_is_reported_and_can_be_retried(self, manager):
+        """Test that failures carry the error and resubmission starts the job again"""
+        record, _ = manager.submit("fail")
+        status = _wait(manager, record["job_id"])
+        assert status["status"] == "failed"
+        assert status["error"] == "bad data"
+        assert status["started_at"] and status["finished_at"]
+        retry, created = manager.submit("fail")
+        assert created and retry["job_id"] == record["job_id"]
+        _wait(manager, record["job_id"])
+
+    def test_records_persist_across_managers(self, manager, tmp_path):
+        """Test that a new manager finds jobs and marks orphaned ones interrupted"""
+        record, _ = manager.submit("square", {"x": 5})
+        _wait(manager, record["job_id"])
+        restarted = JobManager(
+            job_dir=manager.job_dir,
+            analyses=TOY_ANALYSES,
+            input_paths=manager.input_paths,
+        )
+        assert restarted.status(record["job_id"])["status"] == "succeeded"
+        assert restarted.submit("square", {"x": 5})[1] is False
+
+        orphan = dict(record, job_id="0" * 24, status="running")
+        with open(os.path.join(manager.job_dir, orphan["job_id"] + ".json"), "w") as f:
+            json.dump(orphan, f)
+        assert restarted.status(orphan["job_id"])["status"] == "failed"
+        assert restarted.status(orphan["job_id"])["error"] == "interrupted"
+        assert restarted.status("../etc/passwd") is None
+
+    def test_jobs_of_other_live_processes_are_not_interrupted(self, manager):
+        """Test that jobs of another running server process are reported as they are"""
+        record, _ = manager.submit("square", {"x": 6})
+        job_id = record["job_id"]
+        final = _wait(manager, job_id)
+        path = os.path.join(manager.job_dir, job_id + ".json")
+        other = JobManager(
+            job_dir=manager.job_dir,
+            analyses=TOY_ANALYSES,
+            input_paths=manager.input_paths,
+        )
+
+        # Still running in the parent process of this test run
+        with open(path, "w") as f:
+            json.dump(dict(record, status="running", owner_pid=os.getppid()), f)
+        assert other.status(job_id)["status"] == "running"
+        again, created = other.submit("square", {"x": 6})
+        assert not created and again["status"] == "running"
+        # The owner finishes and its record is picked up from disk
+        with open(path, "w") as f:
+            json.dump(final, f)
+        assert other.status(job_id)["status"] == "succeeded"
+
+        # An owner that has exited left the job interrupted
+        dead_pid = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead_pid.wait()
+        with open(path, "w") as f:
+            json.dump(dict(record, status="running", owner_pid=dead_pid.pid), f)
+        restarted = JobManager(
+            job_dir=manager.job_dir,
+            analyses=TOY_ANALYSES,
+            input_paths=manager.input_paths,
+        )
+        assert restarted.status(job_id)["error"] == "interrupted"
+
+
+class TestAnalysisWrappers:
+    """Test the analysis functions run by jobs"""
+
+    def test_bootstrap_job_scores_every_restaurant(self):
+        """Test that the bootstrap job returns one interval per restaurant"""
+        scores = _bootstrap(n_replicates=20, seed=0)
+        assert len(scores) > 0
+        assert (scores["ci_lower"] <= scores["ci_upper"]).all()
+
+    def test_model_selection_job_stores_regularized_models(self, tmp_path, monkeypatch):
+        """Test that the job saves the bundle of the 'regularized' prediction model"""
+        path = tmp_path / "regularized_regression.json"
+        monkeypatch.setattr("analysis.model_selection.SELECTED_MODEL_FILE", str(path))
+        selection = _model_selection(n_folds=2, n_alphas=3, seed=0)
+        assert selection["saved_to"] == str(path)
+        with open(path) as f:
+            assert json.load(f)["kind"] == "regularized"
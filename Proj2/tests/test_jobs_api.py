@@ -0,0 +1,102 @@
+"""
+Test suite for Job API (jobs_api.py)
+Tests: 3 test cases
+"""
+
+import pytest
+import sys
+import os
+import json
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from api.app import app
+from api.jobs import JobManager
+from tests.test_jobs import TOY_ANALYSES
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Test client whose job manager runs toy analyses in tmp_path."""
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("a\n1\n")
+    manager = JobManager(
+        job_dir=str(tmp_path / "jobs"),
+        max_workers=1,
+        analyses=TOY_ANALYSES,
+        input_paths=[str(input_file)],
+    )
+    monkeypatch.setattr("api.jobs_api.job_manager", manager)
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+    manager.shutdown()
+
+
+def _poll(client, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = json.loads(client.get(f"/api/jobs/{job_id}").data)["data"]
+        if data["status"] not in ("queued", "running"):
+            return data
+        time.sleep(0.02)
+    return data
+
+
+class TestJobApi:
+    """Test job submission, polling and results"""
+
+    def test_submit_poll_and_fetch_result(self, client):
+        """Test the full job lifecycle over HTTP"""
+        response = client.post(
+            "/api/jobs", json={"analysis": "square", "params": {"x": 3}}
+        )
+        assert response.status_code == 202
+        body = json.loads(response.data)
+        job_id = body["data"]["job_id"]
+        assert response.headers["Location"] == f"/api/jobs/{job_id}"
+        assert body["deduplicated"] is False
+        assert _poll(client, job_id)["status"] == "succeeded"
+
+        result = client.get(f"/api/jobs/{job_id}/result")
+        assert result.status_code == 200
+        assert json.loads(result.data)["data"]["value"] == 9.0
+        again = json.loads(
+            client.post(
+                "/api/jobs", json={"analysis": "square", "params": {"x": 3}}
+            ).data
+        )
+        assert again["deduplicated"] is True and again["data"]["job_id"] == job_id
+
+    def test_failed_job_result_returns_409(self, client):
+        """Test that the result of a failed job reports its error"""
+        job_id = json.loads(client.post("/api/jobs", json={"analysis": "fail"}).data)[
+            "data"
+        ]["job_id"]
+        _poll(client, job_id)
+        response = client.get(f"/api/jobs/{job_id}/result")
+        assert response.status_code == 409
+        assert json.loads(response.data)["message"] == "bad data"
+
+    def test_bad_requests_and_unknown_jobs(self, client):
+        """Test 400 for invalid submissions and 404 for unknown jobs"""
+        assert client.post("/api/jobs", data="not json").status_code == 400
+        assert client.post("/api/jobs", json={"analysis": "cube"}).status_code == 400
+        assert (
+            client.post(
+                "/api/jobs", json={"analysis": "square", "params": {"x": "a"}}
+            ).status_code
+            == 400
+        )
+        assert (
+            client.post(
+                "/api/jobs", json={"analysis": "square", "params": {"x": 1e9}}
+            ).status_code
+            == 400
+        )
+        assert client.get("/api/jobs/" + "f" * 24).status_code == 404
+        assert client.get("/api/jobs/" + "f" * 24 + "/result").status_code == 404
+        analyses = json.loads(client.get("/api/jobs/analyses").data)["data"]
+        assert analyses["square"] == {"x": {"type": "float", "min": -10.0, "max": 10.0}}
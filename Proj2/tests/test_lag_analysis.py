@@ -0,0 +1,115 @@
+"""
+Test suite for Lagged Efficiency-Waste Correlation (lag_analysis.py)
+Tests: 5 test cases
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis.lag_analysis import (
+    build_daily_series,
+    lagged_cross_correlation,
+    run_lag_analysis,
+)
+
+
+def _period_metrics():
+    """Daily frames in the layout of load_period_metrics('D')"""
+    rng = np.random.default_rng(4)
+    days = pd.date_range("2025-10-01", periods=30, freq="D")
+    efficiency_rows, waste_rows = [], []
+    for restaurant, lag in [("R1", 2), ("R2", 0), ("R3", -1)]:
+        score = rng.normal(60, 10, len(days))
+        waste = 40 - 0.8 * np.roll(score, lag) + rng.normal(0, 1, len(days))
+        for i, day in enumerate(days):
+            efficiency_rows.append(
+                {"restaurant": restaurant, "period": day, "efficiency_score": score[i]}
+            )
+            # R1 reports no waste on every fifth day
+            if not (restaurant == "R1" and i % 5 == 0):
+                waste_rows.append(
+                    {
+                        "restaurant": restaurant,
+                        "period": day,
+                        "total_waste_lb": waste[i],
+                    }
+                )
+    return pd.DataFrame(efficiency_rows), pd.DataFrame(waste_rows)
+
+
+class TestBuildDailySeries:
+    """Test daily series construction"""
+
+    def test_build_daily_series_aligns_calendar(self):
+        """Test that both grids share restaurants and days, with gaps as NaN"""
+        efficiency, waste = build_daily_series(period_metrics=_period_metrics())
+        assert list(efficiency.index) == ["R1", "R2", "R3"]
+        assert efficiency.shape == waste.shape == (3, 30)
+        assert (efficiency.columns == waste.columns).all()
+        assert waste.loc["R1"].isna().sum() == 6
+        assert waste.loc["R2"].notna().all()
+
+    def test_build_daily_series_rejects_unknown_metric(self):
+        """Test that an unknown metric name raises KeyError"""
+        with pytest.raises(KeyError):
+            build_daily_series(
+                waste_metric="not_a_metric", period_metrics=_period_metrics()
+            )
+
+
+class TestLaggedCrossCorrelation:
+    """Test the FFT cross-correlation engine"""
+
+    def test_lagged_cross_correlation_matches_direct_computation(self):
+        """Test every lag against np.corrcoef on the overlapping observed days"""
+        rng = np.random.default_rng(9)
+        X = rng.normal(size=(4, 25))
+        Y = np.roll(X, 3, axis=1) + rng.normal(0, 0.5, X.shape)
+        X[rng.random(X.shape) < 0.15] = np.nan
+        Y[rng.random(Y.shape) < 0.15] = np.nan
+        lags, r, n = lagged_cross_correlation(X, Y, min_lag=-4, max_lag=6)
+        assert list(lags) == list(range(-4, 7))
+        for i in range(len(X)):
+            for j, lag in enumerate(lags):
+                a = X[i, max(0, -lag) : 25 - max(0, lag)]
+                b = Y[i, max(0, lag) : 25 - max(0, -lag)]
+                keep = ~np.isnan(a) & ~np.isnan(b)
+                assert n[i, j] == keep.sum()
+                assert r[i, j] == pytest.approx(np.corrcoef(a[keep], b[keep])[0, 1])
+
+    def test_lagged_cross_correlation_masks_short_overlaps(self):
+        """Test that lags beyond the series or below min_overlap are NaN"""
+        X = np.arange(10, dtype=float)[None, :]
+        Y = np.sin(np.arange(10, dtype=float))[None, :]
+        lags, r, n = lagged_cross_correlation(
+            X, Y, min_lag=0, max_lag=12, min_overlap=5
+        )
+        assert n[0, lags == 11][0] == 0
+        assert np.isnan(r[0, lags >= 6]).all()
+        assert np.isfinite(r[0, lags <= 5]).all()
+        with pytest.raises(ValueError):
+            lagged_cross_correlation(X, Y, min_lag=3, max_lag=1)
+
+
+class TestRunLagAnalysis:
+    """Test the end-to-end lag analysis"""
+
+    def test_run_lag_analysis_recovers_known_lags(self):
+        """Test that each restaurant's peak is at the lag the data was built with"""
+        result = run_lag_analysis(
+            min_lag=-3, max_lag=3, period_metrics=_period_metrics()
+        )
+        peaks = result["peaks"].set_index("restaurant")
+        assert peaks.loc["R1", "peak_lag"] == 2
+        assert peaks.loc["R2", "peak_lag"] == 0
+        assert peaks.loc["R3", "peak_lag"] == -1
+        assert (peaks["peak_correlation"] < -0.9).all()
+        assert (peaks["p_value"] < 0.001).all()
+        assert peaks.loc["R1", "n_overlap"] < 28
+        assert result["correlations"].shape == (3, 7)
@@ -0,0 +1,102 @@
+"""
+Test suite for API Metrics (metrics.py)
+Tests: 5 test cases
+"""
+
+import pytest
+import sys
+import os
+from flask import Flask, jsonify
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from api import metrics
+
+
+class TestMetricTypes:
+    """Test counters, histograms and the text exposition"""
+
+    def test_counter_exposition(self):
+        """Test that counters are rendered per label combination with escaped values"""
+        counter = metrics.Counter("things", "Things seen.", ("kind",))
+        counter.inc("a")
+        counter.inc("a")
+        counter.inc('say "hi"', amount=3)
+        assert counter.value("a") == 2
+        assert metrics.render([counter]).startswith(
+            "# HELP things_total Things seen.\n"
+            "# TYPE things_total counter\n"
+            'things_total{kind="a"} 2\n'
+            'things_total{kind="say \\"hi\\""} 3\n'
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket boundaries (inclusive upper bounds), sum and count"""
+        histogram = metrics.Histogram(
+            "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)
+        )
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value, "/x")
+        lines = histogram.collect()
+        assert lines[2:] == [
+            'latency_seconds_bucket{route="/x",le="0.1"} 2',
+            'latency_seconds_bucket{route="/x",le="1"} 3',
+            'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+            'latency_seconds_sum{route="/x"} 2.65',
+            'latency_seconds_count{route="/x"} 4',
+        ]
+        with histogram.time("/y"):
+            pass
+        assert histogram.count("/y") == 1
+
+
+class TestMetricsEndpoint:
+    """Test request instrumentation and /api/metrics"""
+
+    @pytest.fixture
+    def client(self):
+        app = Flask(__name__)
+        metrics.init_app(app)
+
+        @app.get("/items/<int:item_id>")
+        def item(item_id):
+            return jsonify({"id": item_id})
+
+        with app.test_client() as client:
+            yield client
+
+    def test_requests_are_counted_by_route_template(self, client):
+        """Test that requests are labelled with the route template and status"""
+        labels = ("/items/<int:item_id>", "GET", "200")
+        before = metrics.REQUEST_COUNT.value(*labels)
+        unmatched = metrics.REQUEST_COUNT.value("unmatched", "GET", "404")
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/missing")
+        assert metrics.REQUEST_COUNT.value(*labels) == before + 2
+        assert metrics.REQUEST_LATENCY.count(*labels) == before + 2
+        assert metrics.REQUEST_COUNT.value("unmatched", "GET", "404") == unmatched + 1
+
+    def test_metrics_endpoint_serves_text_exposition(self, client):
+        """Test the content type, request metrics and process memory gauges"""
+        client.get("/items/1")
+        response = client.get("/api/metrics")
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == metrics.CONTENT_TYPE
+        text = response.get_data(as_text=True)
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        assert (
+            'http_requests_total{route="/items/<int:item_id>",'
+            'method="GET",status="200"}' in text
+        )
+        assert "process_max_resident_memory_bytes " in text
+        assert metrics.process_memory()["max_resident"] > 0
+
+    def test_memory_gauges_without_resource_module(self, client, monkeypatch):
+        """Test that platforms without the resource module just omit the peak gauge"""
+        monkeypatch.setattr(metrics, "resource", None)
+        assert metrics.process_memory()["max_resident"] is None
+        text = client.get("/api/metrics").get_data(as_text=True)
+        assert "process_max_resident_memory_bytes" not in text
+        assert "# TYPE http_requests_total counter" in text
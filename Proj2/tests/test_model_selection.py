@@ -0,0 +1,143 @@
+"""
+Test suite for Cross-Validated Regularized Regression (model_selection.py)
+Tests: 6 test cases
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis.model_selection import (
+    _enet_path,
+    _ridge_path,
+    _standardized_moments,
+    load_selected_models,
+    save_selected_models,
+    select_regularized_models,
+)
+
+
+def _frame(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "avg_delivery_time": rng.uniform(10, 40, n),
+            "on_time_rate": rng.uniform(60, 100, n),
+            "avg_distance": rng.uniform(1, 10, n),
+            "cuisine": rng.choice(["Italian", "Asian", "BBQ", "Deli"], n),
+        }
+    )
+    df["total_waste_lb"] = 5 + 2.0 * df["avg_delivery_time"] + rng.normal(0, 1, n)
+    df["total_waste_cost_usd"] = rng.normal(100, 10, n)
+    return df
+
+
+class TestRegularizationPaths:
+    """Test the Gram-matrix path solvers"""
+
+    def test_paths_match_closed_forms(self):
+        """Test ridge against the normal equations and lasso against soft thresholds"""
+        rng = np.random.default_rng(1)
+        X = rng.normal(size=(50, 3))
+        Y = X @ np.array([[1.0], [-0.5], [0.0]]) + rng.normal(0, 0.3, (50, 1))
+        moments = _standardized_moments(X, Y)
+        alphas = np.array([1.0, 0.1, 0.01])
+
+        ridge = _ridge_path(moments["gram"], moments["xy"], alphas)
+        for a, alpha in enumerate(alphas):
+            expected = np.linalg.solve(
+                moments["gram"] + alpha * np.eye(3), moments["xy"]
+            )
+            assert ridge[a] == pytest.approx(expected)
+
+        # With an orthonormal design the lasso solution is the soft-thresholded X'y/n
+        identity = np.eye(3)
+        xy = np.array([[0.8], [-0.3], [0.05]])
+        lasso = _enet_path(identity, xy, np.ones(1), alphas, l1_ratio=1.0)
+        for a, alpha in enumerate(alphas):
+            expected = np.sign(xy) * np.maximum(np.abs(xy) - alpha, 0)
+            assert lasso[a] == pytest.approx(expected, abs=1e-6)
+
+
+class TestSelectRegularizedModels:
+    """Test cross-validated model selection"""
+
+    def test_select_models_reports_out_of_sample_error(self):
+        """Test that a real signal validates well and pure noise does not"""
+        result = select_regularized_models(_frame(), seed=0)
+        signal = result["models"]["total_waste_lb"]
+        noise = result["models"]["total_waste_cost_usd"]
+        assert signal["cv_r2"] > 0.95
+        assert signal["coefficients"]["avg_delivery_time"] == pytest.approx(
+            2.0, rel=0.05
+        )
+        assert noise["cv_r2"] < 0.05
+        assert noise["in_sample_r2"] >= noise["cv_r2"]
+        assert signal["cv_rmse"] == pytest.approx(np.sqrt(signal["cv_mse"]))
+        assert signal["model_type"] in ("ridge", "lasso", "elastic_net")
+        assert set(result["cv_results"].columns) == {
+            "l1_ratio",
+            "alpha",
+            "target",
+            "cv_mse",
+        }
+
+    def test_select_models_shrinks_noise_coefficients(self):
+        """Test that the model chosen for a noise target is heavily regularized"""
+        result = select_regularized_models(_frame(), seed=0)
+        noise = result["models"]["total_waste_cost_usd"]
+        ols = np.linalg.lstsq(
+            np.column_stack(
+                [
+                    np.ones(60),
+                    _frame()[["avg_delivery_time", "on_time_rate", "avg_distance"]],
+                ]
+            ),
+            _frame()["total_waste_cost_usd"],
+            rcond=None,
+        )[0]
+        assert (
+            sum(abs(c) for c in noise["coefficients"].values()) < np.abs(ols[1:]).sum()
+        )
+
+    def test_select_models_leave_one_group_out(self):
+        """Test that group CV holds out one cuisine per fold"""
+        result = select_regularized_models(_frame(), group_col="cuisine")
+        model = result["models"]["total_waste_lb"]
+        assert model["n_folds"] == 4
+        assert model["cv_method"] == "leave_one_cuisine_out"
+        with pytest.raises(ValueError):
+            select_regularized_models(
+                _frame().assign(cuisine="Italian"), group_col="cuisine"
+            )
+
+    def test_select_models_parallel_matches_serial(self):
+        """Test that running the fold grid on a process pool gives the same models"""
+        serial = select_regularized_models(_frame(), seed=3, n_jobs=1)
+        parallel = select_regularized_models(_frame(), seed=3, n_jobs=2)
+        assert serial["models"] == parallel["models"]
+
+    def test_save_and_load_selected_models(self, tmp_path):
+        """Test that the selected models round-trip through a stored bundle"""
+        models = select_regularized_models(_frame(), seed=0)["models"]
+        path = save_selected_models(
+            models, _frame(), str(tmp_path / "models" / "selected.json")
+        )
+        bundle = load_selected_models(path)
+        assert bundle["kind"] == "regularized"
+        assert bundle["features"] == [
+            "avg_delivery_time",
+            "on_time_rate",
+            "avg_distance",
+        ]
+        stored = bundle["models"]["total_waste_lb"]
+        assert stored["coefficients"] == [
+            models["total_waste_lb"]["coefficients"][f] for f in bundle["features"]
+        ]
+        assert stored["alpha"] == models["total_waste_lb"]["alpha"]
+        assert stored["cv_rmse"] == models["total_waste_lb"]["cv_rmse"]
@@ -0,0 +1,125 @@
+"""
+Test suite for Persisted Regression Models (model_store.py)
+Tests: 5 test cases
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis import model_store
+from analysis.correlate_efficiency_waste import fit_regression_batch
+from analysis.model_store import (
+    RegressionPredictor,
+    build_model_bundle,
+    load_models,
+    load_predictor,
+    save_models,
+    training_fingerprint,
+)
+
+
+def _training_frame():
+    rng = np.random.default_rng(2)
+    n = 25
+    df = pd.DataFrame(
+        {
+            "avg_delivery_time": rng.uniform(10, 40, n),
+            "on_time_rate": rng.uniform(60, 100, n),
+            "avg_distance": rng.uniform(1, 10, n),
+        }
+    )
+    df["total_waste_lb"] = 5 + 0.8 * df["avg_delivery_time"] + rng.normal(0, 1, n)
+    df["total_waste_cost_usd"] = 3 * df["avg_distance"] + rng.normal(0, 2, n)
+    return df
+
+
+class TestModelBundle:
+    """Test packaging and storing fitted models"""
+
+    def test_bundle_records_feature_order_and_fingerprint(self):
+        """Test that the bundle keeps feature order, targets and a stable fingerprint"""
+        df = _training_frame()
+        bundle = build_model_bundle(fit_regression_batch(df), df)
+        assert bundle["features"] == [
+            "avg_delivery_time",
+            "on_time_rate",
+            "avg_distance",
+        ]
+        assert bundle["targets"] == ["total_waste_lb", "total_waste_cost_usd"]
+        assert bundle["models"]["total_waste_lb"]["n_samples"] == 25
+        assert len(bundle["models"]["total_waste_lb"]["coefficients"]) == 3
+        assert bundle["training_fingerprint"] == training_fingerprint(
+            df.sample(frac=1, random_state=0), bundle["features"] + bundle["targets"]
+        )
+        changed = df.assign(total_waste_lb=df["total_waste_lb"] + 1)
+        assert (
+            build_model_bundle(fit_regression_batch(changed), changed)[
+                "training_fingerprint"
+            ]
+            != bundle["training_fingerprint"]
+        )
+
+    def test_save_models_defaults_to_store_path(self, isolated_model_store):
+        """Test that bundles are written under the model directory and read back"""
+        df = _training_frame()
+        bundle = build_model_bundle(fit_regression_batch(df), df)
+        path = save_models(bundle)
+        assert path == model_store.REGRESSION_MODEL_FILE
+        assert os.path.dirname(path) == str(isolated_model_store)
+        assert load_models() == bundle
+        # Written through a temp file, but readable like any other data file
+        assert os.stat(path).st_mode & 0o777 == 0o644
+
+
+class TestRegressionPredictor:
+    """Test vectorized predictions from stored models"""
+
+    def test_predictions_match_fitted_models(self):
+        """Test that batch predictions equal intercept + coefficients . profile"""
+        df = _training_frame()
+        fits = fit_regression_batch(df)
+        predictor = RegressionPredictor(build_model_bundle(fits, df))
+        profiles = df[["avg_delivery_time", "on_time_rate", "avg_distance"]].head(5)
+        predictions = predictor.predict(profiles.to_dict("records"))
+        for j, target in enumerate(predictor.targets):
+            expected = fits[target]["intercept"] + sum(
+                profiles[p] * c for p, c in fits[target]["coefficients"].items()
+            )
+            assert predictions[:, j] == pytest.approx(expected.to_numpy())
+        assert predictor.predict(profiles) == pytest.approx(predictions)
+        assert predictor.predict(profiles.to_numpy()) == pytest.approx(predictions)
+
+    def test_predict_rejects_incomplete_profiles(self):
+        """Test that missing or empty features raise ValueError"""
+        df = _training_frame()
+        predictor = RegressionPredictor(
+            build_model_bundle(fit_regression_batch(df), df)
+        )
+        with pytest.raises(ValueError):
+            predictor.predict([{"avg_delivery_time": 20, "on_time_rate": 90}])
+        with pytest.raises(ValueError):
+            predictor.predict(
+                [{"avg_delivery_time": 20, "on_time_rate": None, "avg_distance": 3}]
+            )
+        with pytest.raises(ValueError):
+            predictor.predict(np.ones((2, 4)))
+
+    def test_load_predictor_reloads_when_file_changes(self):
+        """Test that the cached predictor is reused until the bundle is rewritten"""
+        df = _training_frame()
+        bundle = build_model_bundle(fit_regression_batch(df), df)
+        path = save_models(bundle)
+        first = load_predictor(path)
+        assert load_predictor(path) is first
+        bundle["models"]["total_waste_lb"]["intercept"] += 100.0
+        save_models(bundle, path)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+        assert load_predictor(path).intercept[0] == pytest.approx(
+            first.intercept[0] + 100.0
+        )
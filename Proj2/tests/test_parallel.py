@@ -0,0 +1,64 @@
+"""
+Test suite for Chunked Process-Pool Execution (parallel.py)
+Tests: 4 test cases
+"""
+
+import sys
+import os
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis.parallel import (
+    map_chunks,
+    n_chunks_for,
+    resolve_workers,
+    spawn_seeds,
+    split_evenly,
+)
+
+
+def _draw(task):
+    """Draw task[1] numbers from the stream task[0] (module level so it pickles)."""
+    seed_seq, size = task
+    return np.random.default_rng(seed_seq).random(size)
+
+
+class TestChunking:
+    """Test chunk sizes and worker counts"""
+
+    def test_split_evenly(self):
+        """Test that sizes sum to the total and differ by at most one"""
+        sizes = split_evenly(10, 3)
+        assert sizes.sum() == 10
+        assert sizes.max() - sizes.min() <= 1
+        assert split_evenly(0, 2).tolist() == [0, 0]
+
+    def test_chunk_and_worker_counts(self):
+        """Test the number of chunks and the n_jobs convention"""
+        assert n_chunks_for(10, 4) == 3
+        assert n_chunks_for(8, 4) == 2
+        assert n_chunks_for(0, 4) == 1
+        assert n_chunks_for(5, 0) == 5
+        assert resolve_workers(1) == 1
+        assert resolve_workers(-1) == (os.cpu_count() or 1)
+
+
+class TestMapChunks:
+    """Test running chunks serially and in a pool"""
+
+    def test_results_do_not_depend_on_n_jobs(self):
+        """Test that the pool returns the serial results in task order"""
+        tasks = list(zip(spawn_seeds(7, 4), split_evenly(10, 4)))
+        serial = map_chunks(_draw, tasks, n_jobs=1)
+        parallel = map_chunks(_draw, tasks, n_jobs=2)
+        assert [len(chunk) for chunk in serial] == split_evenly(10, 4).tolist()
+        np.testing.assert_array_equal(np.concatenate(serial), np.concatenate(parallel))
+
+    def test_chunk_streams_are_reproducible_and_independent(self):
+        """Test that the same seed gives the same streams and chunks differ"""
+        first = [_draw((seed_seq, 3)) for seed_seq in spawn_seeds(1, 2)]
+        again = [_draw((seed_seq, 3)) for seed_seq in spawn_seeds(1, 2)]
+        np.testing.assert_array_equal(first[0], again[0])
+        assert not np.array_equal(first[0], first[1])
@@ -0,0 +1,161 @@
+"""
+Test suite for Background Precompute Worker (precompute.py)
+Tests: 6 test cases
+"""
+
+import pytest
+import sys
+import os
+import time
+import subprocess
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from api import result_cache
+from api.precompute import PrecomputeWorker, fcntl
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    """A single input file for the worker to watch."""
+    path = tmp_path / "input.csv"
+    path.write_text("a\n1\n")
+    return path
+
+
+class TestRefresh:
+    """Test one refresh cycle"""
+
+    def test_refresh_recomputes_only_on_change(self, input_file):
+        """Test that unchanged inputs are not recomputed and changed ones are"""
+        calls = []
+        worker = PrecomputeWorker(
+            "report", [str(input_file)], lambda: calls.append(1) or {"n": len(calls)}
+        )
+        assert worker.refresh() is True
+        assert worker.refresh() is False
+        assert result_cache.get("report").payload == {"n": 1}
+        input_file.write_text("a\n2\n")
+        assert worker.refresh() is True
+        assert result_cache.get("report").payload == {"n": 2}
+
+    def test_failed_refresh_keeps_last_good_payload(self, input_file):
+        """Test that a failed computation or missing input keeps the cached payload"""
+        outcomes = iter([{"n": 1}, ValueError("bad data")])
+
+        def compute():
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        worker = PrecomputeWorker("report", [str(input_file)], compute)
+        worker.refresh()
+        input_file.write_text("a\n2\n")
+        assert worker.refresh() is False
+        assert worker.last_error == "bad data"
+        assert result_cache.get("report").payload == {"n": 1}
+        input_file.unlink()
+        assert worker.refresh() is False
+        assert result_cache.get("report").payload == {"n": 1}
+
+
+def _fail():
+    raise AssertionError("computed in a follower")
+
+
+class TestSharedWorkers:
+    """Test leader election between server processes"""
+
+    def test_followers_load_the_published_payload(self, input_file, tmp_path):
+        """Test that a second process loads the leader's payload instead of computing"""
+        shared_dir = str(tmp_path / "shared")
+        leader = PrecomputeWorker(
+            "report", [str(input_file)], lambda: {"n": 1}, shared_dir=shared_dir
+        )
+        try:
+            assert leader.refresh() is True
+            computed_at = result_cache.get("report").computed_at
+            result_cache.clear()
+            # The published file is checked before leadership, so this never computes
+            follower = PrecomputeWorker(
+                "report", [str(input_file)], _fail, shared_dir=shared_dir
+            )
+            assert follower.refresh() is True
+            entry = result_cache.get("report")
+            assert entry.payload == {"n": 1}
+            assert entry.computed_at == computed_at
+        finally:
+            leader.stop()
+
+    @pytest.mark.skipif(fcntl is None, reason="lock files need fcntl")
+    def test_only_the_lock_holder_computes(self, input_file, tmp_path):
+        """Test that a worker waits while another process leads, then takes over"""
+        shared_dir = tmp_path / "shared"
+        shared_dir.mkdir()
+        holder = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "import fcntl, sys\n"
+                f'f = open({str(shared_dir / "report.lock")!r}, "w")\n'
+                "fcntl.lockf(f, fcntl.LOCK_EX)\n"
+                'print("locked", flush=True)\n'
+                "sys.stdin.read()\n",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        worker = PrecomputeWorker(
+            "report", [str(input_file)], lambda: {"n": 1}, shared_dir=str(shared_dir)
+        )
+        try:
+            assert holder.stdout.readline().strip() == "locked"
+            assert worker.refresh() is False
+            assert not worker.is_leader
+            assert result_cache.get("report") is None
+            holder.communicate("")
+            assert worker.refresh() is True
+            assert worker.is_leader
+        finally:
+            holder.kill()
+            holder.wait()
+            worker.stop()
+        assert not worker.is_leader
+
+    def test_unshared_workers_always_compute(self, input_file):
+        """Test that without a shared directory the worker leads on its own"""
+        worker = PrecomputeWorker("report", [str(input_file)], lambda: {"n": 1})
+        assert worker.is_leader
+        assert worker.refresh() is True
+
+
+class TestWorkerThread:
+    """Test the background thread"""
+
+    def test_worker_picks_up_changes(self, input_file):
+        """Test that a running worker recomputes after the input changes"""
+        worker = PrecomputeWorker(
+            "report",
+            [str(input_file)],
+            lambda: {"text": input_file.read_text()},
+            interval=0.01,
+        ).start()
+        try:
+            assert worker.running
+            deadline = time.time() + 5
+            while result_cache.get("report") is None and time.time() < deadline:
+                time.sleep(0.01)
+            assert result_cache.get("report").payload == {"text": "a\n1\n"}
+            input_file.write_text("a\n22\n")
+            while (
+                result_cache.get("report").payload["text"] != "a\n22\n"
+                and time.time() < deadline
+            ):
+                time.sleep(0.01)
+            assert result_cache.get("report").payload == {"text": "a\n22\n"}
+        finally:
+            worker.stop()
+        assert not worker.running
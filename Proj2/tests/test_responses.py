@@ -0,0 +1,105 @@
+"""
+Test suite for Shared Response Layer (responses.py)
+Tests: 4 test cases
+"""
+
+import pytest
+import sys
+import os
+import gzip
+import json
+import numpy as np
+import pandas as pd
+from flask import Flask, jsonify
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from api import responses
+from api.result_cache import CachedResponse
+
+
+@pytest.fixture
+def client():
+    """A small app using the response layer."""
+    app = Flask(__name__)
+    responses.init_app(app)
+
+    @app.get("/big")
+    def big():
+        return jsonify(
+            {"values": np.arange(2000, dtype=float), "score": np.float64(np.nan)}
+        )
+
+    @app.get("/small")
+    def small():
+        return jsonify({"n": np.int64(3)})
+
+    with app.test_client() as client:
+        yield client
+
+
+class TestDumps:
+    """Test JSON serialization"""
+
+    def test_dumps_serializes_numpy_and_pandas(self):
+        """Test NumPy scalars/arrays, DataFrames, timestamps, NaN and NumPy keys"""
+        payload = {
+            "int": np.int64(4),
+            "float": np.float32(1.5),
+            "nan": np.nan,
+            "flag": np.bool_(True),
+            "matrix": np.arange(6.0).reshape(2, 3).T,
+            "frame": pd.DataFrame({"a": [1.0, np.nan]}, index=["x", "y"]),
+            "when": pd.Timestamp("2025-10-06"),
+            "missing": pd.NaT,
+        }
+        assert json.loads(responses.dumps(payload)) == {
+            "int": 4,
+            "float": 1.5,
+            "nan": None,
+            "flag": True,
+            "matrix": [[0.0, 3.0], [1.0, 4.0], [2.0, 5.0]],
+            "frame": {"index": ["x", "y"], "columns": ["a"], "data": [[1.0], [None]]},
+            "when": "2025-10-06T00:00:00",
+            "missing": None,
+        }
+        assert json.loads(responses.dumps({np.int64(2): "b"})) == {"2": "b"}
+
+
+class TestCompression:
+    """Test content negotiation and compression"""
+
+    def test_large_responses_are_compressed_when_accepted(self, client):
+        """Test gzip for large bodies, identity otherwise, and Vary on both"""
+        plain = client.get("/big")
+        assert "Content-Encoding" not in plain.headers
+        assert "Accept-Encoding" in plain.headers["Vary"]
+        assert json.loads(plain.data)["score"] is None
+
+        compressed = client.get("/big", headers={"Accept-Encoding": "gzip"})
+        assert compressed.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(compressed.data) == plain.data
+        assert len(compressed.data) < len(plain.data)
+
+        refused = client.get("/big", headers={"Accept-Encoding": "gzip;q=0"})
+        assert "Content-Encoding" not in refused.headers
+        small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in small.headers
+        assert json.loads(small.data) == {"n": 3}
+
+    def test_brotli_is_preferred_when_available(self, client, monkeypatch):
+        """Test that br is only offered when the brotli package is installed"""
+        monkeypatch.setattr(responses, "brotli", None)
+        assert responses.available_encodings() == ("gzip",)
+        response = client.get("/big", headers={"Accept-Encoding": "br, gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+
+    def test_cached_responses_compress_once_per_encoding(self):
+        """Test that cached renderings keep one compressed body and ETag per encoding"""
+        entry = CachedResponse(("abc",), {"values": list(range(1000))})
+        body, etag = entry.render()
+        compressed, compressed_etag = entry.render(encoding="gzip")
+        assert gzip.decompress(compressed) == body
+        assert compressed_etag == f"{etag}-gzip"
+        assert entry.render(encoding="gzip")[0] is compressed
@@ -0,0 +1,104 @@
+"""
+Test suite for In-Memory Restaurant Directory (restaurant_store.py)
+Tests: 5 test cases
+"""
+
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from api.restaurant_store import RestaurantStore, build_restaurant_records
+
+
+class TestBuildRestaurantRecords:
+    """Test joining the restaurant sources"""
+
+    def test_records_join_all_sources(self, sources):
+        """Test metadata order, joined metrics, rating aggregates and rescue meals"""
+        taco, noodle = build_restaurant_records(**sources)
+        assert taco == {
+            "id": 1,
+            "name": "Taco Spot",
+            "cuisine": "Mexican",
+            "capacity": 40,
+            "seating_type": "Indoor",
+            "avg_daily_orders": 120,
+            "has_sustainability_program": True,
+            "zip_code": "27606",
+            "efficiency_score": 61.5,
+            "avg_delivery_time": 20.5,
+            "on_time_rate": 90.0,
+            "avg_distance": 4.2,
+            "deliveries_per_day": 6,
+            "rating": 4.0,
+            "avg_delivery_rating": 4.5,
+            "avg_food_quality_rating": 3.5,
+            "review_count": 2,
+            "rescue_meals": [],
+        }
+        assert noodle["id"] == 2
+        assert noodle["efficiency_score"] is None and noodle["rating"] is None
+        assert noodle["review_count"] == 0
+        assert noodle["rescue_meals"] == [
+            {
+                "name": "Veggie Ramen",
+                "original_price": 12.49,
+                "rescue_price": 7.49,
+                "quantity": 4,
+                "expires_in": "1 hour",
+            }
+        ]
+
+    def test_missing_optional_sources_leave_fields_empty(self, sources, tmp_path):
+        """Test that only the metadata file is required"""
+        for name in ("efficiency_file", "feedback_file", "rescue_meals_file"):
+            sources[name] = str(tmp_path / "missing.csv")
+        records = build_restaurant_records(**sources)
+        assert [r["name"] for r in records] == ["Taco Spot", "Noodle Bar"]
+        assert all(r["rating"] is None and r["rescue_meals"] == [] for r in records)
+        with pytest.raises(OSError):
+            build_restaurant_records(
+                **dict(sources, metadata_file=str(tmp_path / "missing.csv"))
+            )
+
+    def test_blank_zip_code_keeps_the_others_as_text(self, sources):
+        """Test that a blank zip code does not turn the others into '27606.0'"""
+        with open(sources["metadata_file"], "a") as f:
+            f.write("Pizza Place,Italian,30,Indoor,80,False,\n")
+        records = build_restaurant_records(**sources)
+        assert [r["zip_code"] for r in records] == ["27606", "27607", None]
+        store = RestaurantStore(sources)
+        assert [r["id"] for r in store.filter()] == [1, 2, 3]
+        assert [r["id"] for r in store.filter(zip_code="27606")] == [1]
+
+
+class TestRestaurantStore:
+    """Test lookups and refreshing"""
+
+    def test_lookups_by_id_name_cuisine_and_zip(self, sources):
+        """Test the indexes, case-insensitive matching and unknown keys"""
+        store = RestaurantStore(sources)
+        assert store.get(2)["name"] == "Noodle Bar"
+        assert store.get(3) is None
+        assert store.find(" taco spot ")["id"] == 1
+        assert store.find("Pizza Place") is None
+        assert [r["id"] for r in store.filter()] == [1, 2]
+        assert [r["id"] for r in store.filter(cuisine="asian")] == [2]
+        assert [r["id"] for r in store.filter(zip_code="27606")] == [1]
+        assert store.filter(cuisine="Mexican", zip_code="27607") == ()
+
+    def test_refresh_on_file_change_keeps_last_good(self, sources):
+        """Test that changed files are picked up and failed rebuilds keep the records"""
+        store = RestaurantStore(sources, refresh_interval=0)
+        assert store.filter(cuisine="Mexican")[0]["efficiency_score"] == 61.5
+        assert store.refresh() is False
+        with open(sources["efficiency_file"], "w") as f:
+            f.write("restaurant,efficiency_score\nTaco Spot,70.25\n")
+        assert store.get(1)["efficiency_score"] == 70.25
+        os.remove(sources["metadata_file"])
+        assert store.refresh() is False
+        assert store.last_error is not None
+        assert store.get(1)["name"] == "Taco Spot"
@@ -0,0 +1,66 @@
+"""
+Test suite for Restaurant Directory API (restaurants_api.py)
+Tests: 4 test cases
+"""
+
+import pytest
+import sys
+import os
+import json
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from api.app import app
+from api.restaurant_store import RestaurantStore
+
+
+@pytest.fixture
+def client(sources, monkeypatch):
+    """Test client with the directory built from the test source files."""
+    monkeypatch.setattr(
+        "api.restaurants_api.restaurant_store", RestaurantStore(sources)
+    )
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+class TestRestaurantsEndpoint:
+    """Test /api/restaurants"""
+
+    def test_list_and_filter(self, client):
+        """Test listing all restaurants and filtering by cuisine and zip"""
+        data = json.loads(client.get("/api/restaurants").data)
+        assert data["count"] == 2
+        assert [r["name"] for r in data["data"]] == ["Taco Spot", "Noodle Bar"]
+        data = json.loads(client.get("/api/restaurants?cuisine=ASIAN&zip=27607").data)
+        assert [r["id"] for r in data["data"]] == [2]
+        data = json.loads(client.get("/api/restaurants?zip=99999").data)
+        assert data == {"status": "success", "count": 0, "data": []}
+
+    def test_lookup_by_id_and_name(self, client):
+        """Test single-restaurant lookups and 404s for unknown ones"""
+        response = client.get("/api/restaurants/1")
+        assert response.status_code == 200
+        assert json.loads(response.data)["data"]["name"] == "Taco Spot"
+        response = client.get("/api/restaurants?name=noodle bar")
+        assert json.loads(response.data)["data"]["id"] == 2
+        assert client.get("/api/restaurants/5").status_code == 404
+        assert client.get("/api/restaurants?name=Nowhere").status_code == 404
+
+    def test_missing_metadata_returns_503(self, client, sources):
+        """Test that a directory that cannot be built is reported as unavailable"""
+        os.remove(sources["metadata_file"])
+        response = client.get("/api/restaurants")
+        assert response.status_code == 503
+        assert json.loads(response.data)["status"] == "error"
+
+    def test_malformed_metadata_returns_503(self, client, sources):
+        """Test that metadata missing a required column is reported as unavailable"""
+        with open(sources["metadata_file"], "w") as f:
+            f.write("cuisine,zip_code\nMexican,27606\n")
+        for url in ("/api/restaurants", "/api/restaurants/1"):
+            response = client.get(url)
+            assert response.status_code == 503
+            assert "Restaurant data unavailable" in json.loads(response.data)["message"]
@@ -0,0 +1,72 @@
+"""
+Test suite for File-Change-Aware Response Cache (result_cache.py)
+Tests: 4 test cases
+"""
+
+import pytest
+import sys
+import os
+import json
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from api import result_cache
+
+
+class TestInputSignature:
+    """Test file fingerprints"""
+
+    def test_signature_tracks_contents_not_timestamps(self, tmp_path):
+        """Test that identical bytes keep the signature and new bytes change it"""
+        path = tmp_path / "input.csv"
+        path.write_text("a,b\n1,2\n")
+        before = result_cache.input_signature([str(path)])
+        path.write_text("a,b\n1,2\n")
+        os.utime(path, ns=(0, 10**9))
+        assert result_cache.input_signature([str(path)]) == before
+        path.write_text("a,b\n1,3\n")
+        assert result_cache.input_signature([str(path)]) != before
+        with pytest.raises(OSError):
+            result_cache.input_signature([str(tmp_path / "missing.csv")])
+
+
+class TestCachedResponses:
+    """Test storing and looking up responses"""
+
+    def test_get_requires_matching_signature(self):
+        """Test that a signature lookup only returns entries with that signature"""
+        entry = result_cache.put("report", ("abc",), {"x": 1})
+        assert result_cache.get("report", ("abc",)) is entry
+        assert result_cache.get("report", ("def",)) is None
+        assert result_cache.get("report") is entry
+        assert result_cache.get("other", ("abc",)) is None
+        result_cache.clear()
+        assert result_cache.get("report") is None
+
+    def test_put_evicts_oldest_entries(self, monkeypatch):
+        """Test that the cache keeps at most MAX_ENTRIES responses"""
+        monkeypatch.setattr(result_cache, "MAX_ENTRIES", 2)
+        result_cache.put("a", (), {})
+        result_cache.put("b", (), {})
+        result_cache.put("a", (), {"again": True})
+        result_cache.put("c", (), {})
+        assert result_cache.get("b") is None
+        assert result_cache.get("a").payload == {"again": True}
+        assert result_cache.get("c") is not None
+
+    def test_render_adds_metadata_and_etags(self):
+        """Test that fresh and stale renderings differ and are built once"""
+        entry = result_cache.CachedResponse(
+            ("abc",), {"x": 1}, computed_at="2025-10-12T00:00:00+00:00"
+        )
+        body, etag = entry.render()
+        assert json.loads(body) == {
+            "x": 1,
+            "computed_at": "2025-10-12T00:00:00+00:00",
+            "stale": False,
+        }
+        stale_body, stale_etag = entry.render(stale=True)
+        assert json.loads(stale_body)["stale"] is True
+        assert stale_etag != etag
+        assert entry.render()[0] is body
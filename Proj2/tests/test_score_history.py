@@ -0,0 +1,96 @@
+"""
+Test suite for Score History Store (score_history.py)
+Tests: 7 test cases
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from score_history import ScoreHistoryStore, period_key
+
+
+def make_scores(scores):
+    """Build a scored frame with one row per restaurant."""
+    return pd.DataFrame(
+        {
+            "restaurant": list(scores),
+            "efficiency_score": list(scores.values()),
+            "on_time_rate": [90.0] * len(scores),
+            "avg_delivery_time": [20.0] * len(scores),
+            "avg_distance": [4.0] * len(scores),
+            "deliveries_per_day": [10.0] * len(scores),
+        }
+    )
+
+
+@pytest.fixture
+def store():
+    """Create a store in a temporary directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield ScoreHistoryStore(temp_dir)
+
+
+class TestScoreHistoryStore:
+    """Test score history appends and queries"""
+
+    def test_period_key_uses_iso_week(self):
+        """Test that period keys are ISO weeks"""
+        assert period_key("2025-10-07") == "2025-W41"
+        assert period_key("2021-01-01") == "2020-W53"
+
+    def test_append_and_load_round_trip(self, store):
+        """Test that an appended period can be loaded back"""
+        store.append(make_scores({"R1": 50.0, "R2": 75.5}), period="2025-W41")
+        loaded = store.load("2025-W41")
+        assert list(loaded["restaurant"]) == ["R1", "R2"]
+        assert loaded["efficiency_score"].tolist() == [50.0, 75.5]
+        assert store.periods() == ["2025-W41"]
+
+    def test_append_same_period_replaces_it(self, store):
+        """Test that re-appending a period overwrites only that period"""
+        store.append(make_scores({"R1": 50.0}), period="2025-W41")
+        store.append(make_scores({"R1": 60.0}), period="2025-W41")
+        assert store.periods() == ["2025-W41"]
+        assert store.load("2025-W41")["efficiency_score"].iloc[0] == 60.0
+
+    def test_trend_returns_last_n_periods(self, store):
+        """Test that trend only covers the requested recent periods"""
+        for week, score in [(40, 10.0), (41, 20.0), (42, 30.0)]:
+            store.append(make_scores({"R1": score, "R2": 5.0}), period=f"2025-W{week}")
+        trend = store.trend("R1", last_n=2)
+        assert trend["period"].tolist() == ["2025-W41", "2025-W42"]
+        assert trend["efficiency_score"].tolist() == [20.0, 30.0]
+
+    def test_trend_shows_missing_weeks(self, store):
+        """Test that trend counts calendar weeks, not stored periods"""
+        store.append(make_scores({"R1": 10.0}), period="2025-W30")
+        store.append(make_scores({"R2": 5.0}), period="2025-W41")
+        store.append(make_scores({"R1": 30.0}), period="2025-W42")
+        trend = store.trend("R1", last_n=3)
+        assert trend["period"].tolist() == ["2025-W40", "2025-W41", "2025-W42"]
+        assert trend["efficiency_score"].isna().tolist() == [True, True, False]
+        trend = store.trend("R1", last_n=2, end="2025-W01")
+        assert trend["period"].tolist() == ["2024-W52", "2025-W01"]
+
+    def test_biggest_movers_sorts_by_absolute_change(self, store):
+        """Test that movers are ranked by absolute score change"""
+        store.append(
+            make_scores({"R1": 50.0, "R2": 50.0, "R3": 50.0}), period="2025-W41"
+        )
+        store.append(
+            make_scores({"R1": 55.0, "R2": 20.0, "R3": 60.0}), period="2025-W42"
+        )
+        movers = store.biggest_movers(top_n=2)
+        assert movers["restaurant"].tolist() == ["R2", "R3"]
+        assert movers["change"].tolist() == [-30.0, 10.0]
+
+    def test_invalid_period_raises(self, store):
+        """Test that malformed period keys are rejected"""
+        with pytest.raises(ValueError):
+            store.append(make_scores({"R1": 50.0}), period="week 41")
@@ -0,0 +1,92 @@
+"""
+Test suite for Single-Flight Request Coalescing (single_flight.py)
+Tests: 3 test cases
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from api.single_flight import Overloaded, SingleFlight
+
+
+def _run_concurrently(flight, key, fn, n_callers):
+    """Start n_callers threads calling flight.do(key, fn); return their outcomes."""
+    outcomes = [None] * n_callers
+
+    def call(i):
+        try:
+            outcomes[i] = flight.do(key, fn)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n_callers)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+class TestSingleFlight:
+    """Test request coalescing and load shedding"""
+
+    def test_concurrent_calls_share_one_computation(self):
+        """Test that callers arriving while a call is in flight get its result"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"value": 42}
+
+        threads, outcomes = _run_concurrently(flight, "report", compute, 6)
+        while flight.in_flight() == 0:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        assert len(calls) == 1
+        assert all(outcome is outcomes[0] for outcome in outcomes)
+        assert flight.in_flight() == 0
+        # Later calls start a new computation
+        assert flight.do("report", lambda: "again") == "again"
+
+    def test_errors_reach_every_waiting_caller(self):
+        """Test that a failing computation raises for all coalesced callers"""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def compute():
+            release.wait(5)
+            raise ValueError("bad data")
+
+        threads, outcomes = _run_concurrently(flight, "report", compute, 3)
+        while flight.in_flight() == 0:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+        assert flight.in_flight() == 0
+
+    def test_distinct_calls_beyond_bound_are_refused(self):
+        """Test that new keys are shed while max_concurrent calls run; joins are not"""
+        flight = SingleFlight(max_concurrent=1)
+        release = threading.Event()
+        threads, outcomes = _run_concurrently(
+            flight, "a", lambda: release.wait(5) and "a", 2
+        )
+        while flight.in_flight() == 0:
+            pass
+        with pytest.raises(Overloaded):
+            flight.do("b", lambda: "b")
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        assert outcomes == ["a", "a"]
+        assert flight.do("b", lambda: "b") == "b"
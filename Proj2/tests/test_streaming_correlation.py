@@ -0,0 +1,129 @@
+"""
+Test suite for Streaming Correlation (streaming_correlation.py)
+Tests: 6 test cases
+"""
+
+import pytest
+import sys
+import os
+import json
+import pandas as pd
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis.streaming_correlation import CoMomentAccumulator
+from analysis.correlate_efficiency_waste import (
+    compute_correlations,
+    fit_regression_batch,
+)
+
+EFFICIENCY = ["avg_delivery_time", "on_time_rate"]
+WASTE = ["total_waste_lb", "total_waste_cost_usd"]
+
+
+def make_frame(n=60, seed=0):
+    """Build correlated efficiency and waste columns."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "avg_delivery_time": rng.uniform(10, 40, n),
+            "on_time_rate": rng.uniform(60, 100, n),
+        }
+    )
+    df["total_waste_lb"] = 2 + 0.5 * df["avg_delivery_time"] + rng.normal(0, 2, n)
+    df["total_waste_cost_usd"] = 90 - 0.4 * df["on_time_rate"] + rng.normal(0, 3, n)
+    return df
+
+
+class TestCoMomentAccumulator:
+    """Test online co-moment accumulation"""
+
+    def test_batched_updates_match_full_computation(self):
+        """Test that chunked updates give the batch Pearson results"""
+        df = make_frame()
+        accumulator = CoMomentAccumulator(EFFICIENCY, WASTE)
+        for start in range(0, len(df), 9):
+            chunk = df.iloc[start : start + 9]
+            accumulator.update(chunk)
+        expected = compute_correlations(df)
+        streamed = accumulator.correlation_results()
+        for key, values in expected.items():
+            assert streamed[key]["pearson_correlation"] == pytest.approx(
+                values["pearson_correlation"]
+            )
+            assert streamed[key]["pearson_p_value"] == pytest.approx(
+                values["pearson_p_value"]
+            )
+        assert accumulator.n == 60
+
+    def test_single_row_adds_match_batch_update(self):
+        """Test that Welford single-row adds equal one batch update"""
+        df = make_frame(20)
+        one_by_one = CoMomentAccumulator(EFFICIENCY, WASTE)
+        for row in df.to_dict("records"):
+            one_by_one.add(row)
+        batch = CoMomentAccumulator(EFFICIENCY, WASTE)
+        batch.update(df)
+        assert np.allclose(one_by_one.mean, batch.mean)
+        assert np.allclose(one_by_one.comoment, batch.comoment)
+        assert np.allclose(
+            batch.covariance().to_numpy(), df[EFFICIENCY + WASTE].cov().to_numpy()
+        )
+
+    def test_merge_of_shards_equals_single_pass(self):
+        """Test that merging shard states is exact"""
+        df = make_frame(90, seed=1)
+        shards = []
+        for start in range(0, len(df), 30):
+            chunk = df.iloc[start : start + 30]
+            shard = CoMomentAccumulator(EFFICIENCY, WASTE)
+            shard.update(chunk)
+            # States travel between processes as JSON
+            shards.append(
+                CoMomentAccumulator.from_state(json.loads(json.dumps(shard.to_state())))
+            )
+        merged = shards[0].merge(shards[1]).merge(shards[2])
+        single = CoMomentAccumulator(EFFICIENCY, WASTE)
+        single.update(df)
+        assert merged.n == single.n
+        assert np.allclose(merged.pearson(), single.pearson())
+
+    def test_regressions_match_batch_solver(self):
+        """Test that co-moment regressions equal the least-squares fit"""
+        df = make_frame()
+        accumulator = CoMomentAccumulator(EFFICIENCY, WASTE)
+        accumulator.update(df)
+        expected = fit_regression_batch(df, EFFICIENCY, WASTE)
+        streamed = accumulator.regressions()
+        for target in WASTE:
+            assert streamed[target]["intercept"] == pytest.approx(
+                expected[target]["intercept"]
+            )
+            assert streamed[target]["r2_score"] == pytest.approx(
+                expected[target]["r2_score"]
+            )
+            for pred in EFFICIENCY:
+                assert streamed[target]["coefficients"][pred] == pytest.approx(
+                    expected[target]["coefficients"][pred]
+                )
+
+    def test_simple_regressions_give_pairwise_slopes(self):
+        """Test single-predictor slopes against numpy polyfit"""
+        df = make_frame()
+        accumulator = CoMomentAccumulator(EFFICIENCY, WASTE)
+        accumulator.update(df)
+        slope, intercept = np.polyfit(df["avg_delivery_time"], df["total_waste_lb"], 1)
+        result = accumulator.simple_regressions()["avg_delivery_time_vs_total_waste_lb"]
+        assert result["slope"] == pytest.approx(slope)
+        assert result["intercept"] == pytest.approx(intercept)
+
+    def test_incomplete_rows_are_skipped(self):
+        """Test that rows with missing metrics are not accumulated"""
+        df = make_frame(10)
+        df.loc[0, "total_waste_lb"] = np.nan
+        accumulator = CoMomentAccumulator(EFFICIENCY, WASTE)
+        assert accumulator.update(df) == 9
+        with pytest.raises(KeyError):
+            accumulator.update(df[EFFICIENCY])
@@ -0,0 +1,71 @@
+"""
+Test suite for Production WSGI Entry Point (wsgi.py)
+Tests: 3 test cases
+"""
+
+import pytest
+import sys
+import os
+import gc
+import json
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from api import app as app_module
+from api.wsgi import create_app
+
+
+@pytest.fixture(autouse=True)
+def restore_preload(monkeypatch):
+    """Drop preloaded data and unfreeze the collector after each test."""
+    monkeypatch.setattr(app_module, "_preloaded_data", None)
+    yield
+    gc.unfreeze()
+
+
+class TestCreateApp:
+    """Test the production application factory"""
+
+    def test_create_app_serves_from_preloaded_data(self):
+        """Test that requests after preloading never re-read the input files"""
+        app = create_app()
+        assert app is app_module.app
+        assert gc.get_freeze_count() > 0
+        with patch(
+            "api.app.load_and_merge_data", side_effect=AssertionError("reloaded")
+        ):
+            client = app.test_client()
+            full = client.get("/api/efficiency-waste-correlation")
+            selected = client.get(
+                "/api/efficiency-waste-correlation?method=pearson&sections=correlations"
+            )
+        assert full.status_code == selected.status_code == 200
+        assert json.loads(full.data)["data"]["restaurants_analyzed"] > 0
+        assert "pearson_correlation" in next(
+            iter(json.loads(selected.data)["data"]["correlations"].values())
+        )
+
+    def test_preload_failure_still_returns_app(self, tmp_path, monkeypatch):
+        """Test that missing inputs are reported and left to the request path"""
+        monkeypatch.setattr(
+            app_module, "ANALYSIS_INPUT_FILES", [str(tmp_path / "missing.csv")]
+        )
+        assert create_app() is app_module.app
+        assert app_module._preloaded_data is None
+
+    def test_changed_inputs_are_loaded_again(self, tmp_path, monkeypatch):
+        """Test that the preloaded dataset is only used while the inputs match"""
+        path = tmp_path / "efficiency.csv"
+        path.write_text("restaurant,value\nR1,1\n")
+        monkeypatch.setattr(app_module, "ANALYSIS_INPUT_FILES", [str(path)])
+        with (
+            patch("api.app.load_and_merge_data", return_value="first"),
+            patch("api.app._compute_correlation_entry"),
+        ):
+            app_module.preload()
+        with patch("api.app.load_and_merge_data", return_value="second"):
+            assert app_module._load_merged_data() == "first"
+            path.write_text("restaurant,value\nR1,22\n")
+            assert app_module._load_merged_data() == "second"